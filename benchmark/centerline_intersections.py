@@ -0,0 +1,173 @@
+"""
+Compares the intersection test of centerlines of Lanelet2 (geo.intersectCenterlines2d, one call per pair of lanelets)
+with a vectorized kernel (intersect_polylines) for every pair of conflicting lanelets of a map. The kernel tests many
+pairs of centerlines at once: pairs are rejected by their bounding boxes first, then every combination of segments of
+the remaining pairs is tested in one batch with orientation predicates. Touching and collinear overlapping segments
+count as intersecting, as in Lanelet2. Since Lanelet2 caches the centerlines of lanelets, the kernel is slower than
+Lanelet2 on the available maps and isn't used by the framework.
+
+Usage: python benchmark/centerline_intersections.py [map] [repetitions]
+"""
+import sys
+import timeit
+
+import numpy as np
+import lanelet2.geometry as geo
+
+from BSSD_derivation_for_Lanelet2.io_handler import IoHandler
+from BSSD_derivation_for_Lanelet2.preprocessing import Preprocessing
+
+
+def centerline_polyline(lanelet):
+    """ Returns the x- and y-coordinates of the points of the centerline of a lanelet (shape (n, 2)).  """
+    return np.array([(point.x, point.y) for point in lanelet.centerline], dtype=float)
+
+
+def intersecting(lanelet, candidates, polylines):
+    """ Returns the candidates whose centerlines intersect with the centerline of the lanelet (polylines by ID).  """
+    if not candidates:
+        return []
+    for candidate in [lanelet] + candidates:
+        if candidate.id not in polylines:
+            polylines[candidate.id] = centerline_polyline(candidate)
+    result = intersect_polylines([polylines[lanelet.id]] * len(candidates), [polylines[ll.id] for ll in candidates])
+    return [candidate for candidate, intersects in zip(candidates, result) if intersects]
+
+
+def intersect_polylines(polylines_1, polylines_2):
+    """
+    Tests pairs of 2D polylines for intersection, i.e. whether any segment of the first polyline touches or crosses any
+    segment of the second polyline. Pairs whose bounding boxes don't overlap are rejected first. For the remaining
+    pairs, every combination of their segments is tested at once with the orientations of the segment endpoints.
+
+    Parameters:
+        polylines_1 (list):First polyline of every pair, each an array of x- and y-coordinates (shape (n, 2), n > 0).
+        polylines_2 (list):Second polyline of every pair.
+
+    Returns:
+        intersects (ndarray):True for every pair of polylines that intersect (shape (number of pairs,)).
+    """
+    result = np.zeros(len(polylines_1), dtype=bool)
+    if not len(polylines_1):
+        return result
+
+    points_1, offsets_1, lengths_1, boxes_1 = stack_polylines(polylines_1)
+    points_2, offsets_2, lengths_2, boxes_2 = stack_polylines(polylines_2)
+
+    # Bounding box prefilter for the pairs of polylines. Polylines with a single point have no segments.
+    pairs = np.flatnonzero((boxes_1[:, 0] <= boxes_2[:, 2]) & (boxes_2[:, 0] <= boxes_1[:, 2]) &
+                           (boxes_1[:, 1] <= boxes_2[:, 3]) & (boxes_2[:, 1] <= boxes_1[:, 3]) &
+                           (lengths_1 > 1) & (lengths_2 > 1))
+    if not len(pairs):
+        return result
+
+    # Indices of the startpoints of every combination of a segment of the first and a segment of the second polyline
+    counts_1, counts_2 = lengths_1[pairs] - 1, lengths_2[pairs] - 1
+    products = counts_1 * counts_2
+    pair_of_test = np.repeat(np.arange(len(pairs)), products)
+    local = np.arange(products.sum()) - np.repeat(np.cumsum(products) - products, products)
+    index_1 = offsets_1[pairs][pair_of_test] + local // counts_2[pair_of_test]
+    index_2 = offsets_2[pairs][pair_of_test] + local % counts_2[pair_of_test]
+
+    hits = intersect_segments(points_1[index_1], points_1[index_1 + 1], points_2[index_2], points_2[index_2 + 1])
+    result[pairs[pair_of_test[hits]]] = True
+    return result
+
+
+def stack_polylines(polylines):
+    """
+    Stacks the points of polylines into a single array.
+
+    Parameters:
+        polylines (list):Polylines, each an array of x- and y-coordinates (shape (n, 2), n > 0).
+
+    Returns:
+        points (ndarray):Points of all polylines (shape (total number of points, 2)).
+        offsets (ndarray):Index of the first point of every polyline.
+        lengths (ndarray):Number of points of every polyline.
+        boxes (ndarray):min x, min y, max x and max y of every polyline (shape (number of polylines, 4)).
+    """
+    points = np.concatenate(polylines)
+    lengths = np.fromiter((len(polyline) for polyline in polylines), dtype=np.intp, count=len(polylines))
+    offsets = np.cumsum(lengths) - lengths
+    boxes = np.concatenate([np.minimum.reduceat(points, offsets), np.maximum.reduceat(points, offsets)], axis=1)
+    return points, offsets, lengths, boxes
+
+
+def intersect_segments(starts_1, ends_1, starts_2, ends_2):
+    """
+    Tests pairs of 2D segments for intersection including touching and overlapping segments.
+
+    Parameters:
+        starts_1 (ndarray):Startpoints of the first segment of every pair (shape (n, 2)).
+        ends_1 (ndarray):Endpoints of the first segment of every pair.
+        starts_2 (ndarray):Startpoints of the second segment of every pair.
+        ends_2 (ndarray):Endpoints of the second segment of every pair.
+
+    Returns:
+        intersects (ndarray):True for every pair of segments that intersect (shape (n,)).
+    """
+    # Orientations of the endpoints of each segment relative to the other segment
+    orientation_1 = orientation(starts_1, ends_1, starts_2)
+    orientation_2 = orientation(starts_1, ends_1, ends_2)
+    orientation_3 = orientation(starts_2, ends_2, starts_1)
+    orientation_4 = orientation(starts_2, ends_2, ends_1)
+
+    # If all points lie on one line, the segments intersect if their projections overlap
+    collinear = (orientation_1 == 0) & (orientation_2 == 0) & (orientation_3 == 0) & (orientation_4 == 0)
+    overlapping = np.all((np.minimum(starts_1, ends_1) <= np.maximum(starts_2, ends_2)) &
+                         (np.minimum(starts_2, ends_2) <= np.maximum(starts_1, ends_1)), axis=1)
+    # Otherwise, the endpoints of each segment must lie on different sides of the other segment (or on it)
+    crossing = (np.sign(orientation_1) * np.sign(orientation_2) <= 0) & \
+        (np.sign(orientation_3) * np.sign(orientation_4) <= 0)
+    return np.where(collinear, overlapping, crossing)
+
+
+def orientation(points_1, points_2, points_3):
+    """ Returns the z-component of the cross product (points_2 - points_1) x (points_3 - points_1) for every row. """
+    return (points_2[:, 0] - points_1[:, 0]) * (points_3[:, 1] - points_1[:, 1]) - \
+        (points_2[:, 1] - points_1[:, 1]) * (points_3[:, 0] - points_1[:, 0])
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else 'test/DA_Nieder-Ramst-Mühlstr-Hochstr.osm'
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    map_lanelet = IoHandler(path).load_map()
+    graph = Preprocessing(map_lanelet).get_topology_index()
+    pairs = [(lanelet, other) for lanelet in map_lanelet.laneletLayer for other in graph.conflicting(lanelet)]
+    if not pairs:
+        print('The map contains no conflicting lanelets.')
+        return
+
+    def lanelet2_per_pair():
+        return [bool(geo.intersectCenterlines2d(lanelet, other)) for lanelet, other in pairs]
+
+    polylines = {lanelet.id: centerline_polyline(lanelet) for lanelet in map_lanelet.laneletLayer}
+    polylines_1 = [polylines[lanelet.id] for lanelet, _ in pairs]
+    polylines_2 = [polylines[other.id] for _, other in pairs]
+
+    def kernel_batch():
+        return list(intersect_polylines(polylines_1, polylines_2))
+
+    def kernel_with_centerlines():
+        return list(intersect_polylines([centerline_polyline(lanelet) for lanelet, _ in pairs],
+                                        [centerline_polyline(other) for _, other in pairs]))
+
+    def kernel_per_lanelet():
+        cache = {}
+        return [intersecting(lanelet, graph.conflicting(lanelet), cache) for lanelet in map_lanelet.laneletLayer]
+
+    expected = lanelet2_per_pair()
+    assert kernel_batch() == expected and kernel_with_centerlines() == expected
+
+    print(f'{len(pairs)} pairs of conflicting lanelets, {sum(expected)} with intersecting centerlines')
+    for name, function in [('Lanelet2 per pair', lanelet2_per_pair), ('kernel, all pairs at once', kernel_batch),
+                           ('kernel incl. centerline extraction', kernel_with_centerlines),
+                           ('kernel per lanelet', kernel_per_lanelet)]:
+        seconds = min(timeit.repeat(function, number=repetitions, repeat=3)) / repetitions
+        print(f'{name:<40}{seconds * 1e3:8.3f} ms{seconds / len(pairs) * 1e6:10.2f} us/pair')
+
+
+if __name__ == '__main__':
+    main()
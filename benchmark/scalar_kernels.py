@@ -0,0 +1,92 @@
+"""
+Compares the scalar geometry kernels of util and geometry_derivation, which work on tuples with the math module, with
+the previous implementations based on NumPy arrays and objects of Lanelet2.
+
+Usage: python benchmark/scalar_kernels.py [number of calls]
+"""
+import sys
+import math
+import timeit
+
+import numpy as np
+from lanelet2.core import LaneletMap, LineString3d, Point3d, BoundingBox2d, BasicPoint2d, getId
+from lanelet2.geometry import distance as dist
+
+from BSSD_derivation_for_Lanelet2 import util
+from BSSD_derivation_for_Lanelet2.geometry_derivation import make_orthogonal_bounding_box, orthogonal_box
+
+
+def angle_between_numpy(v1, v2):
+    """ Previous implementation of util.angle_between.  """
+    v1_u = np.array(v1) / np.linalg.norm(v1)
+    v2_u = np.array(v2) / np.linalg.norm(v2)
+    return np.arccos(np.clip(np.dot(v1_u, v2_u), -1.0, 1.0)) * 360 / (2 * math.pi)
+
+
+def are_linestrings_orthogonal_lanelet2(map_lanelet, linestring_1, linestring_2, points_to_link_linestrings):
+    """ Previous implementation of DataHandler.are_linestrings_orthogonal.  """
+    points_to_link_linestrings = [map_lanelet.pointLayer[pt.id] for pt in points_to_link_linestrings]
+    connect_lateral_boundaries = LineString3d(getId(), points_to_link_linestrings)
+    angle_1 = angle_between_numpy([linestring_1[-1].x - linestring_1[0].x, linestring_1[-1].y - linestring_1[0].y],
+                                  [connect_lateral_boundaries[-1].x - connect_lateral_boundaries[0].x,
+                                   connect_lateral_boundaries[-1].y - connect_lateral_boundaries[0].y])
+    angle_2 = angle_between_numpy([linestring_2[-1].x - linestring_2[0].x, linestring_2[-1].y - linestring_2[0].y],
+                                  [connect_lateral_boundaries[-1].x - connect_lateral_boundaries[0].x,
+                                   connect_lateral_boundaries[-1].y - connect_lateral_boundaries[0].y])
+    return 80 < angle_1 < 100 and 80 < angle_2 < 100
+
+
+def are_linestrings_orthogonal_math(linestring_1, linestring_2, points_to_link_linestrings):
+    """ Current implementation of DataHandler.are_linestrings_orthogonal.  """
+    connect_lateral_boundaries = util.vector_between(*points_to_link_linestrings)
+    return util.are_vectors_orthogonal(util.linestring_to_vector(linestring_1), connect_lateral_boundaries) and \
+        util.are_vectors_orthogonal(util.linestring_to_vector(linestring_2), connect_lateral_boundaries)
+
+
+def make_orthogonal_bounding_box_lanelet2(pt_left, pt_right):
+    """ Previous implementation of make_orthogonal_bounding_box.  """
+    v_orth = [pt_right.y - pt_left.y, -(pt_right.x - pt_left.x)]
+    length_v = math.sqrt(v_orth[0] * v_orth[0] + v_orth[1] * v_orth[1])
+    v_orth = [el / length_v for el in v_orth]
+    min_pt = BasicPoint2d(min(pt_left.x + v_orth[0], pt_right.x - v_orth[0]),
+                          min(pt_left.y + v_orth[1], pt_right.y - v_orth[1]))
+    max_pt = BasicPoint2d(max(pt_left.x + v_orth[0], pt_right.x - v_orth[0]),
+                          max(pt_left.y + v_orth[1], pt_right.y - v_orth[1]))
+    return BoundingBox2d(min_pt, max_pt)
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    points = [Point3d(getId(), x, y, 0) for x, y in [(0, 0), (10, 0), (0, 5), (10, 5)]]
+    linestring_1 = LineString3d(getId(), points[:2])
+    linestring_2 = LineString3d(getId(), points[2:])
+    map_lanelet = LaneletMap()
+    map_lanelet.add(linestring_1)
+    map_lanelet.add(linestring_2)
+    coordinates_1, coordinates_2 = util.coordinates(points[0]), util.coordinates(points[3])
+
+    cases = [
+        ('angle', lambda: angle_between_numpy((1.0, 2.0), (2.0, -1.0)),
+         lambda: util.angle_between((1.0, 2.0), (2.0, -1.0))),
+        ('distance of points', lambda: dist(points[0], points[3]),
+         lambda: util.distance(util.coordinates(points[0]), util.coordinates(points[3]))),
+        ('distance of tuples', lambda: dist(points[0], points[3]), lambda: util.distance(coordinates_1, coordinates_2)),
+        ('orthogonality', lambda: are_linestrings_orthogonal_lanelet2(map_lanelet, linestring_1, linestring_2,
+                                                                       [points[0], points[2]]),
+         lambda: are_linestrings_orthogonal_math(linestring_1, linestring_2, [points[0], points[2]])),
+        ('orthogonal box', lambda: make_orthogonal_bounding_box_lanelet2(points[0], points[2]),
+         lambda: orthogonal_box((points[0].x, points[0].y), (points[2].x, points[2].y))),
+        ('orthogonal box (BoundingBox2d)', lambda: make_orthogonal_bounding_box_lanelet2(points[0], points[2]),
+         lambda: make_orthogonal_bounding_box(points[0], points[2])),
+    ]
+
+    print(f'{"":<32}{"previous":>12}{"kernel":>12}{"speedup":>10}')
+    for name, previous, kernel in cases:
+        time_previous = min(timeit.repeat(previous, number=number, repeat=3)) / number
+        time_kernel = min(timeit.repeat(kernel, number=number, repeat=3)) / number
+        print(f'{name:<32}{time_previous * 1e6:9.2f} us{time_kernel * 1e6:9.2f} us{time_previous / time_kernel:9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -154,6 +154,8 @@ class BssdElement:
             It sets an unique ID and by OSM required information like visible and version.
         assign_to_attributes():
             assigns the attributes ID, visible and version to the BSSD Core object that is aggregated as attributes.
+        from_attributes(attributes):
+            Creates an element of this class for an existing BSSD Core object without assigning a new ID.
     """
 
     def __init__(self):
@@ -167,6 +169,17 @@ class BssdElement:
         self.attributes.version = self.version
         self.attributes.id = self.id
 
+    @classmethod
+    def from_attributes(cls, attributes):
+        # Creates an element for a BSSD Core object that has been derived in another process. Only the BSSD Core
+        # object is restored, references to other BSSD elements and Lanelet2 objects are not available.
+        element = cls.__new__(cls)
+        element.attributes = attributes
+        element.id = attributes.id
+        element.visible = attributes.visible
+        element.version = attributes.version
+        return element
+
 
 class BehaviorSpace(BssdElement):
     """
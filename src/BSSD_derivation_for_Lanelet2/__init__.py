@@ -1,8 +1,12 @@
 from BSSD_derivation_for_Lanelet2 import preprocessing
 from BSSD_derivation_for_Lanelet2 import behavior_derivation
 from BSSD_derivation_for_Lanelet2 import BSSD_elements
+from BSSD_derivation_for_Lanelet2 import cache
+from BSSD_derivation_for_Lanelet2 import centerlines
 from BSSD_derivation_for_Lanelet2 import constants
 from BSSD_derivation_for_Lanelet2 import data_handler
 from BSSD_derivation_for_Lanelet2 import geometry_derivation
 from BSSD_derivation_for_Lanelet2 import io_handler
+from BSSD_derivation_for_Lanelet2 import osm_writer
+from BSSD_derivation_for_Lanelet2 import topology
 from BSSD_derivation_for_Lanelet2 import util
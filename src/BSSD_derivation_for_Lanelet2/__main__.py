@@ -1,7 +1,11 @@
+import sys
 import time
 import argparse
 
+from BSSD_derivation_for_Lanelet2.batch import find_maps, run_batch
+from BSSD_derivation_for_Lanelet2.cache import DerivationCache, DEFAULT_CACHE_SIZE
 from BSSD_derivation_for_Lanelet2.io_handler import IoHandler
+from BSSD_derivation_for_Lanelet2.parallel import derive_parallel
 from BSSD_derivation_for_Lanelet2.data_handler import DataHandler
 from BSSD_derivation_for_Lanelet2.preprocessing import Preprocessing
 from BSSD_derivation_for_Lanelet2.util import edit_log_file, setup_logger
@@ -10,7 +14,8 @@ from BSSD_derivation_for_Lanelet2.util import edit_log_file, setup_logger
 This framework automatically derives the BSSD extension for Lanelet2 maps. In this module, the submodules are called to
 run through the necessary steps of the BSSD derivation.
 1. Loading a given Lanelet2 map
-2. Preprocessing of the map which includes identification of relevant lanelets and creation of a RoutingGraph
+2. Preprocessing of the map which includes identification of relevant lanelets and creation of a topology index or a
+RoutingGraph
 3. Loop through all the detected relevant lanelets, create BSSD elements and derive the behavioral demand.
 4. Save the Lanelet2 and BSSD elements to a new output map file.
 """
@@ -18,17 +23,56 @@ run through the necessary steps of the BSSD derivation.
 
 def main():
     parser = argparse.ArgumentParser(description="Run BSSD-derivation framework")
-    parser.add_argument("-m", "--map", help="Lanelet2 map file", dest="filepath", type=str, required=True)
+    maps = parser.add_mutually_exclusive_group(required=True)
+    maps.add_argument("-m", "--map", help="Lanelet2 map file", dest="filepath", type=str)
+    maps.add_argument("-b", "--batch", help="directory or glob pattern of Lanelet2 map files that are converted in a "
+                                            "batch", dest="batch", type=str)
+    parser.add_argument("-w", "--workers", help="number of worker processes for the batch mode (default: number of "
+                                                "CPUs)", dest="workers", type=int, required=False)
     parser.add_argument("-lat", "--latitude_coordinate", help="latitude origin coordinate for projection",
                         dest="latitude", type=float, required=False)
     parser.add_argument("-lon", "--longitude_coordinate", help="longitude origin coordinate for projection",
                         dest="longitude", type=float, required=False)
+    parser.add_argument("-p", "--patch", help="copy the input map unchanged and only append the new elements instead "
+                                              "of rewriting the whole map with Lanelet2",
+                        dest="patch", action="store_true")
+    parser.add_argument("-f", "--filter", help="remove every element that is not used by Lanelet2 (e.g. buildings) "
+                                               "before the map is loaded", dest="prefilter", action="store_true")
+    parser.add_argument("-j", "--jobs", help="number of worker processes that derive independent parts of a map in "
+                                             "parallel", dest="jobs", type=int, default=1)
+    parser.add_argument("--routing_graph", help="use a RoutingGraph of Lanelet2 for the relations between lanelets "
+                                                "instead of the faster topology index",
+                        dest="routing_graph", action="store_true")
+    parser.add_argument("-c", "--cache", help="directory in which results of the derivation are cached to skip the "
+                                              "derivation for unchanged maps", dest="cache", type=str, required=False)
+    parser.add_argument("--cache_size", help="maximum size of the cache directory in MB",
+                        dest="cache_size", type=float, default=DEFAULT_CACHE_SIZE)
     parser.set_defaults(func=framework)
     args = parser.parse_args()
+    if args.batch:
+        sys.exit(batch(args))
     args.func(args)
 
 
-def framework(args):
+def batch(args):
+    """
+    Runs the framework for every map of a directory or glob pattern in a pool of worker processes.
+
+    Parameters:
+        args (Namespace):Arguments of the command line.
+
+    Returns:
+        exit_code (int):1 if the derivation failed for at least one map, otherwise 0.
+    """
+    paths = find_maps(args.batch)
+    if not paths:
+        sys.exit(f'No map files found for {args.batch}')
+
+    results = run_batch(framework, args, paths)
+    return 1 if any(result['error'] for result in results) else 0
+
+
+def framework(args, stream=True):
     # Process Lanelet2 map and derive behavior spaces
 
     # --------------------------------
@@ -38,13 +82,28 @@ def framework(args):
     file = args.filepath
 
     # Setup the logging module
-    logger, log_file = setup_logger(file)
+    logger, log_file = setup_logger(file, stream)
 
     # Load the Lanelet2 map using the IO module
     if args.latitude and args.longitude:
-        io = IoHandler(file, [args.latitude, args.longitude])
+        io = IoHandler(file, [args.latitude, args.longitude], prefilter=args.prefilter)
     else:
-        io = IoHandler(file)
+        io = IoHandler(file, prefilter=args.prefilter)
+
+    # If a cache directory is given, check whether the output for this input map and these options already exists.
+    # In this case, the cached output is copied and the derivation is skipped entirely.
+    cache = None
+    options = {'patch': args.patch, 'origin': io.origin_coordinates, 'parallel': args.jobs > 1,
+               'routing_graph': args.routing_graph, 'prefilter': args.prefilter}
+    if args.cache:
+        cache = DerivationCache(args.cache, file, int(args.cache_size * 2 ** 20))
+        statistics = cache.restore_output(io.output_path, options)
+        if statistics:
+            logger.info(f'Input map {file} is unchanged. Output restored from cache {args.cache}')
+            log_statistics(logger, statistics)
+            edit_log_file(log_file)
+            return statistics
+
     map_lanelet = io.load_map()
 
     # Save the amount of linestrings existing in this map to determine the number of newly created linestrings at
@@ -60,25 +119,41 @@ def framework(args):
     start_preprocessing = time.perf_counter()
     logger.info(f'Start preprocessing. Finding relevant lanelets and distinguishing bicycle_lanes')
 
-    # Perform preprocessing steps using the Preprocessing module: Create RoutingGraph and find relevant lanelets
+    # Perform preprocessing steps using the Preprocessing module: Create topology index (or RoutingGraph) and find
+    # relevant lanelets
     preprocessor = Preprocessing(map_lanelet)
-    relevant_lanelets = preprocessor.find_relevant_lanelets()
-    routing_graph = preprocessor.get_routing_graph_all()
+    # IDs of maps with negative IDs depend on the pre-filter, thus the results are cached separately
+    preprocessing_name = 'preprocessing_filtered' if args.prefilter else 'preprocessing'
+    preprocessing_cached = cache.load(preprocessing_name) if cache else None
+    if preprocessing_cached:
+        relevant_lanelets = preprocessor.restore_relevant_lanelets(**preprocessing_cached)
+    else:
+        relevant_lanelets = preprocessor.find_relevant_lanelets()
+        if cache:
+            cache.store(preprocessing_name, preprocessor.get_relevant_lanelets_data(relevant_lanelets))
+    if args.routing_graph:
+        routing_graph = preprocessor.get_routing_graph_all()
+    else:
+        routing_graph = preprocessor.get_topology_index()
 
     # Setup main data handler to perform behavior space derivation for the given Lanelet2 map
-    data_handler = DataHandler(preprocessor.map_lanelet, relevant_lanelets, routing_graph)
+    data_handler = DataHandler(preprocessor.map_lanelet, relevant_lanelets, routing_graph, preprocessor.lanelet_table,
+                               preprocessor.usages)
     end_preprocessing = time.perf_counter()
-    logger.info(f"Preprocessing completed, relevant lanelets detected and RoutingGraph created."
+    logger.info(f"Preprocessing completed, relevant lanelets detected and topology created."
                 f"\nElapsed time: {round(end_preprocessing - start_preprocessing, 2)}")
 
     # -------------------------------------
     # ----------- PROCESSING --------------
     # -------------------------------------
-    # Recursively loop through all lanelets to perform desired actions for each (e.g. derive long. boundary)
+    # Loop through all lanelets to perform desired actions for each (e.g. derive long. boundary)
     start_processing = time.perf_counter()
-    logger.info(f'Start recursive loop through relevant lanelets')
-    while data_handler.relevant_lanelets:
-        data_handler.recursive_loop(data_handler.relevant_lanelets[0])
+    logger.info(f'Start loop through relevant lanelets')
+    if args.jobs > 1:
+        # Derive the components of lanelets that are connected via successor/predecessor relations in parallel
+        derive_parallel(data_handler, args.jobs)
+    else:
+        data_handler.loop_all()
     end_processing = time.perf_counter()
     logger.info(f"Loop for relevant lanelets completed.\nElapsed time: {round(end_processing - start_processing, 2)}")
 
@@ -88,31 +163,49 @@ def framework(args):
     # Save edited .osm-map to desired filepath
     start_output = time.perf_counter()
 
-    # Save the Lanelet2 elements to an osm-file
-    io.save_map(data_handler.map_lanelet)
-    # Save the BSSD elements to an osm-file
-    io.write_bssd_elements(data_handler.map_bssd)
-    # Merge the above created osm-files to one output file
-    io.merge_files(file)
+    if args.patch:
+        # Copy the input file and append the new linestrings and BSSD elements
+        io.patch_map(data_handler.new_linestrings, data_handler.map_bssd)
+    else:
+        # Save the Lanelet2 and BSSD elements in a single pass to the output file
+        io.write_map(data_handler.map_lanelet, data_handler.map_bssd)
     end_output = time.perf_counter()
     logger.info(f'Saved map {file} with BSSD extension in output directory. '
                 f'\nElapsed time: {round(end_output - start_output, 2)}')
     lc = logger.handlers[0].levelcount
-    logger.info(f"\n------ Statistics ------"
-                f"\nBehavior Spaces: {len(data_handler.map_bssd.BehaviorSpaceLayer)}"
-                f"\nBehaviors:       {len(data_handler.map_bssd.BehaviorLayer)}"
-                f"\nBoundary Lat:    {len(data_handler.map_bssd.BoundaryLatLayer)}"
-                f"\nBoundary Long:   {len(data_handler.map_bssd.BoundaryLongLayer)}"
-                f"\nReservations:    {len(data_handler.map_bssd.ReservationLayer)}"
-                f"\nNew Linestrings: {len(data_handler.map_lanelet.lineStringLayer) - orig_nr_ls}"
-                f"\nWarnings:        {lc['WARNING']}"
-                f"\nCritical Logs:   {lc['CRITICAL']}"
-                f"\nErrors:          {lc['ERROR']}"
-                f"\n------------------------")
+    statistics = {'Behavior Spaces': len(data_handler.map_bssd.BehaviorSpaceLayer),
+                  'Behaviors': len(data_handler.map_bssd.BehaviorLayer),
+                  'Boundary Lat': len(data_handler.map_bssd.BoundaryLatLayer),
+                  'Boundary Long': len(data_handler.map_bssd.BoundaryLongLayer),
+                  'Reservations': len(data_handler.map_bssd.ReservationLayer),
+                  'New Linestrings': len(data_handler.map_lanelet.lineStringLayer) - orig_nr_ls,
+                  'Warnings': lc['WARNING'],
+                  'Critical Logs': lc['CRITICAL'],
+                  'Errors': lc['ERROR']}
+    log_statistics(logger, statistics)
+
+    # Store the output map in the cache so that the next run for the unchanged map can skip the derivation
+    if cache:
+        cache.store_output(io.output_path, options, statistics)
 
     # Edit the log-file so that the statistics (see above) are placed at the beginning of the file
     edit_log_file(log_file)
 
+    return statistics
+
+
+def log_statistics(logger, statistics):
+    """
+    Logs the statistics of a derivation as a section that is placed at the top of the log file afterwards.
+
+    Parameters:
+        logger (logging):Logger of the framework.
+        statistics (dict):Number of elements and log messages for each category.
+    """
+    logger.info(f"\n------ Statistics ------"
+                + ''.join(f"\n{(category + ':').ljust(17)}{value}" for category, value in statistics.items())
+                + f"\n------------------------")
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,185 @@
+import os
+import glob
+import time
+import logging
+import argparse
+import traceback
+import threading
+import multiprocessing
+
+from .util import split_map_path
+from .constants import MAP_EXTENSIONS
+
+logger = logging.getLogger('framework.batch')
+
+# Size of the chunks in which the next input files are read ahead
+PREFETCH_CHUNK_SIZE = 1 << 20
+
+
+def find_maps(pattern):
+    """
+    Finds the map files for a batch run. If a directory is given, every map file in this directory is used. Otherwise,
+    the argument is interpreted as glob pattern. Output maps of previous runs (ending with '_BSSD') are skipped.
+
+    Parameters:
+        pattern (str):Directory or glob pattern.
+
+    Returns:
+        paths (list):Sorted list of paths of map files.
+    """
+    if os.path.isdir(pattern):
+        paths = [os.path.join(pattern, name) for name in os.listdir(pattern)
+                 if any(name.lower().endswith(extension) for extension in MAP_EXTENSIONS)]
+    else:
+        paths = glob.glob(pattern)
+
+    return sorted(path for path in paths if os.path.isfile(path) and not split_map_path(path)[0].endswith('_BSSD'))
+
+
+def run_batch(framework, args, paths):
+    """
+    Runs the framework for every map of a batch in a pool of worker processes. The modules of the framework are
+    already imported in this process, so that forked workers start with warm imports. Every worker process handles a
+    single map, because Lanelet2 assigns IDs from a global counter. Thus, the output of every map is identical to the
+    output of a single run. While the workers process maps, the next input files are read ahead in a background thread.
+
+    Parameters:
+        framework (function):Function that runs the framework for the arguments of a single map.
+        args (Namespace):Arguments of the batch run, which are used for every map.
+        paths (list):Paths of the map files.
+
+    Returns:
+        results (list):Result of every map in the order of the given paths.
+    """
+    setup_batch_logger()
+    workers = max(1, min(args.workers or os.cpu_count() or 1, len(paths)))
+    logger.info(f'Start batch run for {len(paths)} maps with {workers} worker processes')
+
+    # Start the prefetching of the inputs for the first maps. Afterwards, one more input is prefetched for every
+    # finished map, so that the input of the next map is read ahead while the current ones are processed.
+    prefetcher = Prefetcher(paths)
+    prefetcher.advance(2 * workers)
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    tasks = [(framework, argparse.Namespace(**{**vars(args), 'filepath': path})) for path in paths]
+    results = []
+    with context.Pool(workers, maxtasksperchild=1) as pool:
+        for result in pool.imap_unordered(run_map, tasks):
+            prefetcher.advance(1)
+            results.append(result)
+            status = 'failed' if result['error'] else 'done'
+            logger.info(f'[{len(results)}/{len(paths)}] {result["map"]} {status} ({result["time"]:.2f} s)')
+
+    results.sort(key=lambda result: paths.index(result['map']))
+    log_summary(results)
+    return results
+
+
+def run_map(task):
+    """
+    Runs the framework for a single map and catches all errors, so that a failing map doesn't stop the batch.
+
+    Parameters:
+        task (tuple):Function of the framework and the arguments for this map.
+
+    Returns:
+        result (dict):Path, statistics, elapsed time and error message (None if successful) of the map.
+    """
+    framework, args = task
+    start = time.perf_counter()
+    try:
+        statistics = framework(args, stream=False)
+        error = None
+    except Exception as e:
+        statistics = {}
+        error = f'{type(e).__name__}: {e}'
+        logging.getLogger('framework').error(traceback.format_exc())
+
+    return {'map': args.filepath, 'statistics': statistics, 'time': time.perf_counter() - start, 'error': error}
+
+
+class Prefetcher:
+    """
+    This class reads input files ahead in a background thread so that they are already in the page cache of the
+    operating system when a worker loads them.
+
+    Attributes
+    ----------
+        paths : list
+            Paths of the files in the order in which they are needed.
+        index : int
+            Number of files that have been requested for prefetching.
+
+    Methods
+    -------
+        advance(n):
+            Starts the prefetching of the next n files.
+    """
+
+    def __init__(self, paths):
+        self.paths = paths
+        self.index = 0
+
+    def advance(self, n):
+        """
+        Starts the prefetching of the next n files in a daemon thread.
+
+        Parameters:
+            n (int):Number of files.
+        """
+        paths = self.paths[self.index:self.index + n]
+        self.index += n
+        if paths:
+            threading.Thread(target=prefetch_files, args=(paths,), daemon=True).start()
+
+
+def prefetch_files(paths):
+    """ Reads files in chunks and discards their content to load them into the page cache.  """
+    for path in paths:
+        try:
+            with open(path, 'rb') as file:
+                while file.read(PREFETCH_CHUNK_SIZE):
+                    pass
+        except OSError:
+            pass
+
+
+def log_summary(results):
+    """
+    Logs an aggregated summary of a batch run with the statistics of every map.
+
+    Parameters:
+        results (list):Results of the maps as returned by run_map.
+    """
+    width = max([len('Map')] + [len(result['map']) for result in results])
+    lines = [f"{'Map'.ljust(width)}  Behavior Spaces  Warnings  Errors  Time [s]  Status"]
+    for result in results:
+        statistics = result['statistics']
+        lines.append(f"{result['map'].ljust(width)}  "
+                     f"{str(statistics.get('Behavior Spaces', '-')).rjust(15)}  "
+                     f"{str(statistics.get('Warnings', '-')).rjust(8)}  "
+                     f"{str(statistics.get('Errors', '-')).rjust(6)}  "
+                     f"{result['time']:8.2f}  "
+                     f"{'failed: ' + result['error'] if result['error'] else 'ok'}")
+
+    failed = sum(1 for result in results if result['error'])
+    logger.info(f"\n------ Batch Summary ------\n"
+                + '\n'.join(lines)
+                + f"\nMaps:            {len(results)}"
+                f"\nFailed:          {failed}"
+                f"\nBehavior Spaces: {sum(result['statistics'].get('Behavior Spaces', 0) for result in results)}"
+                f"\nWarnings:        {sum(result['statistics'].get('Warnings', 0) for result in results)}"
+                f"\nTotal time:      {sum(result['time'] for result in results):.2f} s"
+                f"\n---------------------------")
+
+
+def setup_batch_logger():
+    """ Sets up the logger of the batch run, which streams the progress and the summary to the terminal.  """
+    if not logger.handlers:
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter("%(levelname)s:%(message)s"))
+        logger.addHandler(stream)
+    logger.setLevel(logging.INFO)
+    # The logger of the framework is set up separately for every map
+    logger.propagate = False
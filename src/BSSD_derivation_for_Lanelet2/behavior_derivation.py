@@ -62,7 +62,7 @@ def derive_crossing_type_for_lat_boundary(linestring_attributes: AttributeMap, s
     return crossing_type
 
 
-def is_zebra_and_intersecting(lanelet, ref_lanelet):
+def is_zebra_and_intersecting(lanelet, ref_lanelet, lanelet_data=None):
     """
     Returns boolean variable after checking whether two lanelets are having intersecting
     centerlines. Furthermore, another criteria is that one of the lanelets is a zebra crossing.
@@ -70,18 +70,166 @@ def is_zebra_and_intersecting(lanelet, ref_lanelet):
     Parameters:
         lanelet (lanelet):The lanelet that is being checked.
         ref_lanelet (lanelet):The lanelet on which the behavior spaced is based.
+        lanelet_data (LaneletData):Optional data of the lanelet table that contains the relevance of the lanelet.
 
     Returns:
         Bool (bool):True if conditions are met, otherwise False.
     """
 
-    if geo.intersectCenterlines2d(lanelet, ref_lanelet) and not is_lanelet_relevant(lanelet.attributes) and \
-            lanelet.leftBound.attributes['type'] == lanelet.rightBound.attributes['type'] == 'zebra_marking':
+    # The relevance is checked first, because it is cheaper than the intersection of the centerlines
+    if is_zebra(lanelet, lanelet_data) and geo.intersectCenterlines2d(lanelet, ref_lanelet):
         return True
     else:
         return False
 
 
+def is_zebra(lanelet, lanelet_data=None):
+    """
+    Returns True if a lanelet is a zebra crossing, i.e. it is not relevant and both lateral boundaries are zebra
+    markings.
+
+    Parameters:
+        lanelet (lanelet):The lanelet that is being checked.
+        lanelet_data (LaneletData):Optional data of the lanelet table that contains the relevance of the lanelet.
+    """
+    relevant = lanelet_data.relevant if lanelet_data is not None else is_lanelet_relevant(lanelet.attributes)
+    return not relevant and all('type' in bound.attributes and bound.attributes['type'] == 'zebra_marking'
+                                for bound in (lanelet.leftBound, lanelet.rightBound))
+
+
+class Crossing:
+    """
+    This class stores the data of a lanelet that can be crossed by pedestrians (e.g. a zebra crossing), which is needed
+    for the derivation of behavioral demands of every relevant lanelet that crosses it.
+
+    Attributes
+    ----------
+        zebra : bool
+            True, if the lanelet is a zebra crossing (see is_zebra).
+        pedestrian : bool
+            True, if the lanelet can be passed by pedestrians.
+        road_lanelets : list
+            Relevant lanelets that conflict with the lanelet and whose centerlines intersect with its centerline.
+        road_lanelet_ids : set
+            IDs of the road lanelets.
+        walkway_areas : dict
+            IDs of the walkway areas next to every road lanelet (only for zebra crossings).
+        walkway_lanelets : list
+            Predecessors and successors of the lanelet that model the walkway (only for zebra crossings).
+    """
+
+    def __init__(self, zebra, pedestrian):
+        self.zebra = zebra
+        self.pedestrian = pedestrian
+        self.road_lanelets = []
+        self.road_lanelet_ids = set()
+        self.walkway_areas = {}
+        self.walkway_lanelets = []
+
+
+class CrossingTable:
+    """
+    This class contains the crossings of pedestrians over the roadway. For every lanelet that is a zebra crossing or can
+    be passed by pedestrians, the relevant lanelets that cross it are determined once via the conflicting lanelets and
+    the intersection of the centerlines. For zebra crossings, the walkway areas and lanelets that are linked in the
+    reservation of the crossing lanelets are determined as well. Every road lanelet that crosses the same lanelet uses
+    the same entry, so that the rules for reservations and no_stagnant_traffic become lookups. Entries are created when
+    a lanelet is requested for the first time.
+
+    Attributes
+    ----------
+        graph : TopologyIndex | RoutingGraph
+            Relations (following, previous, conflicting) between all the lanelets of a map.
+        lanelet_table : defaultdict
+            LaneletData for every lanelet ID, which contains the classification of the lanelets.
+        usages : UsageIndex
+            Inverse index of the map that contains the areas next to every linestring.
+        crossings : dict
+            Crossing for every lanelet ID (None for lanelets that are no zebra crossing and can't be passed by
+            pedestrians).
+
+    Methods
+    -------
+        __init__(graph, lanelet_table, usages):
+            Creates an empty crossing table.
+        crossing(lanelet):
+            Returns the crossing of a lanelet and creates it if it is requested for the first time.
+        find_zebra_crossing(road_lanelet):
+            Returns the first zebra crossing that the road lanelet crosses.
+        find_pedestrian_crossing(road_lanelet):
+            Returns the first lanelet passable by pedestrians that the road lanelet crosses.
+    """
+
+    def __init__(self, graph, lanelet_table, usages):
+        self.graph = graph
+        self.lanelet_table = lanelet_table
+        self.usages = usages
+        self.crossings = {}
+
+    def crossing(self, lanelet):
+        """
+        Returns the crossing of a lanelet. At the first request, the relevant lanelets with intersecting centerlines
+        and (for zebra crossings) the walkway areas and lanelets are determined.
+
+        Parameters:
+            lanelet (Lanelet):Lanelet that may be crossed by relevant lanelets.
+
+        Returns:
+            crossing (Crossing):Data of the crossing (None if the lanelet is no zebra crossing and isn't passable by
+                                pedestrians).
+        """
+        if lanelet.id in self.crossings:
+            return self.crossings[lanelet.id]
+
+        lanelet_data = self.lanelet_table[lanelet.id]
+        zebra = is_zebra(lanelet, lanelet_data)
+        crossing = None
+        if zebra or lanelet_data.can_pass_pedestrian:
+            crossing = Crossing(zebra, lanelet_data.can_pass_pedestrian)
+            crossing.road_lanelets = [road_lanelet for road_lanelet in self.graph.conflicting(lanelet)
+                                      if self.lanelet_table[road_lanelet.id].relevant
+                                      and geo.intersectCenterlines2d(road_lanelet, lanelet)]
+            crossing.road_lanelet_ids = {road_lanelet.id for road_lanelet in crossing.road_lanelets}
+
+            if zebra:
+                # Walkway areas next to the lateral boundaries of every lanelet that crosses the zebra crossing
+                for road_lanelet in crossing.road_lanelets:
+                    crossing.walkway_areas[road_lanelet.id] = \
+                        [area.id for area in set(self.usages.areas_using(road_lanelet.leftBound, 'walkway')) |
+                         set(self.usages.areas_using(road_lanelet.rightBound, 'walkway'))]
+                # Lanelets that model the walkway space next to the roadway are predecessors/successors of the zebra
+                crossing.walkway_lanelets = self.graph.previous(lanelet) + self.graph.following(lanelet)
+                logger.debug(f'Zebra crossing {lanelet.id} is crossed by lanelets {sorted(crossing.road_lanelet_ids)}')
+
+        self.crossings[lanelet.id] = crossing
+        return crossing
+
+    def find_zebra_crossing(self, road_lanelet):
+        """
+        Returns the first conflicting zebra crossing whose centerline intersects with the given relevant lanelet.
+
+        Parameters:
+            road_lanelet (Lanelet):Relevant lanelet.
+
+        Returns:
+            zebra (tuple):Zebra lanelet and its crossing (None, None if no zebra crossing is found).
+        """
+        for lanelet in self.graph.conflicting(road_lanelet):
+            crossing = self.crossing(lanelet)
+            if crossing and crossing.zebra and road_lanelet.id in crossing.road_lanelet_ids:
+                return lanelet, crossing
+        return None, None
+
+    def find_pedestrian_crossing(self, road_lanelet):
+        """
+        Returns the first conflicting lanelet that can be passed by pedestrians and whose centerline intersects with the
+        given relevant lanelet (None if not found).
+        """
+        return next((lanelet for lanelet in self.graph.conflicting(road_lanelet)
+                     if self.lanelet_table[lanelet.id].can_pass_pedestrian
+                     and road_lanelet.id in self.crossing(lanelet).road_lanelet_ids), None)
+
+
 def get_item(dictionary, key):
     """
     Retrieves value using get function, but checks first whether the requested item exists. Returns None if not.
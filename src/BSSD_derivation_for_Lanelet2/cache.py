@@ -0,0 +1,255 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile as tf
+from contextlib import contextmanager
+from importlib import metadata
+
+try:
+    import fcntl
+except ImportError:  # Windows, the cache is only locked between processes on POSIX systems
+    fcntl = None
+
+from .util import split_map_path
+
+logger = logging.getLogger('framework.cache')
+
+# Size of the chunks in which files are read for hashing
+HASH_CHUNK_SIZE = 1 << 20
+# Default upper bound of the total size of the cache directory in MB
+DEFAULT_CACHE_SIZE = 1024
+# Name of the lock file in the cache directory
+LOCK_FILE = '.lock'
+
+
+class DerivationCache:
+    """
+    This class manages a content-addressed cache directory for the results of the BSSD derivation. Every map gets an
+    entry that is named after the hash of the input file and the version of the converter. Thus, an entry is only
+    found again for an unchanged input that is processed by the same version of the converter. An entry contains
+    intermediate results of the derivation as JSON files as well as the output maps. Since the output depends on the
+    options of a run, output maps are additionally distinguished by a signature of these options.
+    The total size of the cache directory is bounded. If it is exceeded, the least recently used entries are evicted.
+    Several processes (e.g. the workers of the batch mode) can use the same cache directory. Reading and writing an
+    entry holds a shared lock on a lock file in the cache directory, while the eviction holds an exclusive lock. Thus,
+    no entry is removed while another process writes or restores it. An entry that has been evicted in the meantime
+    is created again when a result is stored.
+
+    Attributes
+    ----------
+        directory : path
+            Path of the cache directory.
+        max_size : int
+            Maximum total size of the cache directory in bytes.
+        key : str
+            Hash of the input file and the version of the converter that identifies the entry of the map.
+        entry : path
+            Path of the directory of the entry.
+
+    Methods
+    -------
+        __init__(directory, input_path, max_size):
+            Computes the key of the input file and marks the entry as recently used.
+        load(name):
+            Returns an intermediate result that has been stored in the entry.
+        store(name, data):
+            Stores an intermediate result as JSON in the entry.
+        lock(exclusive=False):
+            Context manager that locks the cache directory against the eviction by other processes.
+        restore_output(file_path, options):
+            Copies a cached output map to the given path and returns the statistics of the run that created it.
+        store_output(file_path, options, statistics):
+            Copies an output map and the statistics of its run into the entry.
+        evict():
+            Removes the least recently used entries until the cache directory fits into the maximum size.
+    """
+
+    def __init__(self, directory, input_path, max_size=DEFAULT_CACHE_SIZE * 2 ** 20):
+        self.directory = directory
+        self.max_size = max_size
+        self.key = hash_file(input_path, converter_version())
+        self.entry = os.path.join(directory, self.key)
+        os.makedirs(directory, exist_ok=True)
+        with self.lock():
+            os.makedirs(self.entry, exist_ok=True)
+            # Mark the entry as recently used for the LRU eviction
+            os.utime(self.entry)
+
+    @contextmanager
+    def lock(self, exclusive=False):
+        """
+        Locks the cache directory via its lock file. Any number of processes can hold the shared lock at the same
+        time, the exclusive lock waits until no other process holds a lock.
+
+        Parameters:
+            exclusive (bool):True for the exclusive lock of the eviction, False for the shared lock of reading and
+                             writing entries.
+        """
+        with open(os.path.join(self.directory, LOCK_FILE), 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self, name):
+        """
+        Returns an intermediate result that has been stored in the entry.
+
+        Parameters:
+            name (str):Name of the intermediate result.
+
+        Returns:
+            data (dict):Stored data or None if no data is stored under this name.
+        """
+        try:
+            with self.lock(), open(os.path.join(self.entry, name + '.json'), 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, name, data):
+        """
+        Stores an intermediate result as JSON in the entry. The file is replaced atomically so that concurrent or
+        interrupted runs never leave an incomplete file in the cache. If the entry has been evicted by another
+        process, it is created again.
+
+        Parameters:
+            name (str):Name of the intermediate result.
+            data (dict):JSON-serializable data.
+        """
+        with self.lock():
+            self._write_json(name, data)
+        self.evict()
+
+    def _write_json(self, name, data):
+        """ Writes JSON data atomically into the entry. The caller has to hold the lock.  """
+        os.makedirs(self.entry, exist_ok=True)
+        with tf.NamedTemporaryFile('w', dir=self.entry, delete=False) as file:
+            json.dump(data, file)
+        os.replace(file.name, os.path.join(self.entry, name + '.json'))
+        os.utime(self.entry)
+
+    def restore_output(self, file_path, options):
+        """
+        Copies a cached output map to the given path, if an output for the given options exists.
+
+        Parameters:
+            file_path (path):Path to which the output map is copied.
+            options (dict):Options of the run that influence the output.
+
+        Returns:
+            statistics (dict):Statistics of the run that created the output or None if no output is cached.
+        """
+        name = 'output_' + hash_options(options)
+        path_cached = os.path.join(self.entry, name + split_map_path(file_path)[1])
+        with self.lock():
+            try:
+                with open(os.path.join(self.entry, name + '.json'), 'r') as file:
+                    statistics = json.load(file)
+            except (OSError, ValueError):
+                return None
+            if not os.path.isfile(path_cached):
+                return None
+            shutil.copyfile(path_cached, file_path)
+
+        logger.debug(f'Output map restored from cache entry {self.key}')
+        return statistics
+
+    def store_output(self, file_path, options, statistics):
+        """
+        Copies an output map and the statistics of the run that created it into the entry.
+
+        Parameters:
+            file_path (path):Path of the output map.
+            options (dict):Options of the run that influence the output.
+            statistics (dict):Statistics of the run.
+        """
+        name = 'output_' + hash_options(options)
+        with self.lock():
+            os.makedirs(self.entry, exist_ok=True)
+            with tf.NamedTemporaryFile('wb', dir=self.entry, delete=False) as file:
+                with open(file_path, 'rb') as file_output:
+                    shutil.copyfileobj(file_output, file)
+            os.replace(file.name, os.path.join(self.entry, name + split_map_path(file_path)[1]))
+            # The statistics are stored last, because they mark the output as complete
+            self._write_json(name, statistics)
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the total size of the cache directory is smaller than the
+        maximum size. The entry of the current map is never removed. The exclusive lock ensures that no other process
+        reads or writes an entry in the meantime.
+        """
+        with self.lock(exclusive=True):
+            entries = []
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if os.path.isdir(path):
+                    entries.append((os.path.getmtime(path), directory_size(path), path))
+
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_size <= self.max_size:
+                    break
+                if path != self.entry:
+                    shutil.rmtree(path, ignore_errors=True)
+                    total_size -= size
+                    logger.debug(f'Evicted cache entry {os.path.basename(path)}')
+
+
+def converter_version():
+    """
+    Returns the version of the converter. Besides the version of the package, the content of its modules is included
+    so that changes of the source code during the development invalidate the cache as well.
+
+    Returns:
+        version (str):Version of the converter.
+    """
+    try:
+        version = metadata.version('lanelet2-bssd-converter')
+    except metadata.PackageNotFoundError:
+        version = 'unknown'
+
+    digest = hashlib.sha256(version.encode())
+    package_directory = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(package_directory)):
+        if name.endswith('.py'):
+            with open(os.path.join(package_directory, name), 'rb') as file:
+                digest.update(file.read())
+
+    return digest.hexdigest()[:16]
+
+
+def hash_file(path, version):
+    """
+    Hashes the content of a file in chunks together with the version of the converter.
+
+    Parameters:
+        path (path):Path of the file.
+        version (str):Version of the converter.
+
+    Returns:
+        key (str):Hexadecimal hash.
+    """
+    digest = hashlib.sha256(version.encode())
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def hash_options(options):
+    """ Returns a short hash of the options of a run that influence the output.  """
+    return hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def directory_size(path):
+    """ Returns the total size of all files in a directory in bytes.  """
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
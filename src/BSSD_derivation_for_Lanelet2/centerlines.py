@@ -0,0 +1,78 @@
+import logging
+
+import numpy as np
+
+logger = logging.getLogger('framework.centerlines')
+
+
+class CenterlineIndex:
+    """
+    This class stores the endpoints of the centerlines of lanelets and the unit vectors from their first to their last
+    point in arrays with one row per lanelet. They are computed in batches for the lanelets whose headings are needed
+    (e.g. the lanelets next to keepout areas) and serve as the heading of the lanelets for angle calculations.
+
+    Attributes
+    ----------
+        positions : dict
+            Row of every lanelet ID in the arrays endpoints and directions.
+        endpoints : ndarray
+            x- and y-coordinates of the first and the last point of the centerline of every lanelet (shape (n, 4)).
+        directions : ndarray
+            Unit vector from the first to the last point of the centerline of every lanelet (shape (n, 2)).
+
+    Methods
+    -------
+        __init__():
+            Creates an empty centerline index.
+        add_headings(lanelets):
+            Computes the endpoints and directions of the centerlines of lanelets in a batch.
+        direction(lanelet):
+            Returns the unit vector in the direction of a lanelet.
+    """
+
+    def __init__(self):
+        self.positions = {}
+        self.endpoints = np.empty((0, 4))
+        self.directions = np.empty((0, 2))
+
+    def add_headings(self, lanelets):
+        """
+        Computes the endpoints of the centerlines and the unit vectors from their first to their last point for
+        lanelets that aren't indexed yet. The vectors are normalized for all lanelets at once.
+
+        Parameters:
+            lanelets (iterable):Lanelets whose headings are needed.
+        """
+        new_lanelets = {}
+        for lanelet in lanelets:
+            if lanelet.id not in self.positions and lanelet.id not in new_lanelets:
+                # The index contains the lanelets in their reference direction
+                new_lanelets[lanelet.id] = lanelet.invert() if lanelet.inverted() else lanelet
+        if not new_lanelets:
+            return
+
+        endpoints = np.array([(centerline[0].x, centerline[0].y, centerline[-1].x, centerline[-1].y)
+                              for centerline in (lanelet.centerline for lanelet in new_lanelets.values())], dtype=float)
+        vectors = endpoints[:, 2:] - endpoints[:, :2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            directions = vectors / np.sqrt(vectors[:, 0] * vectors[:, 0] + vectors[:, 1] * vectors[:, 1])[:, np.newaxis]
+
+        self.positions.update(zip(new_lanelets, range(len(self.endpoints), len(self.endpoints) + len(endpoints))))
+        self.endpoints = np.concatenate([self.endpoints, endpoints])
+        self.directions = np.concatenate([self.directions, directions])
+
+    def direction(self, lanelet):
+        """
+        Returns the unit vector from the first to the last point of the centerline of a lanelet. Lanelets that aren't
+        indexed yet are added to the index.
+
+        Parameters:
+            lanelet (Lanelet):Lanelet whose direction is requested (inverted lanelets have the opposite direction).
+
+        Returns:
+            direction (tuple):Unit vector with x- and y-component.
+        """
+        if lanelet.id not in self.positions:
+            self.add_headings([lanelet])
+        x, y = self.directions[self.positions[lanelet.id]].tolist()
+        return (-x, -y) if lanelet.inverted() else (x, y)
@@ -12,6 +12,14 @@ OVERRIDE_TAGS = ["pedestrian",
                  "bicycle"
                  ]
 
+MAP_EXTENSIONS = ['.osm.pbf',
+                  '.pbf',
+                  '.osm.gz',
+                  '.osm.bz2',
+                  '.osm.xz',
+                  '.osm'
+                  ]
+
 LONG_BDR_TAGS = ['stop_line',
                  'pedestrian_marking',
                  'zebra_marking'
@@ -1,19 +1,22 @@
 import logging
-from collections import defaultdict
 from typing import Dict, Any
 
-from lanelet2.geometry import distance as dist
-from lanelet2.core import LineString3d, getId, SpeedLimit
+from lanelet2.core import LineString3d, getId
 from lanelet2 import traffic_rules
 import lanelet2.geometry as geo
 from bssd.core import _types as tp
 
-from .preprocessing import is_lanelet_relevant
+from .preprocessing import classify_lanelets
 from . import BSSD_elements
-from .geometry_derivation import make_orthogonal_bounding_box, find_flush_bdr, find_line_insufficient
-from .behavior_derivation import derive_crossing_type_for_lat_boundary, is_zebra_and_intersecting
+from .geometry_derivation import find_flush_bdr, find_line_insufficient
+from .behavior_derivation import derive_crossing_type_for_lat_boundary, CrossingTable
 from . import util
-from .constants import LONG_BDR_TAGS, LONG_BDR_DICT
+from .lanelet_data import create_lanelet_table
+from .topology import UsageIndex, BoundaryIndex, endpoint_key
+from .segments import SegmentIndex
+from .speed_limits import SpeedLimitResolver
+from .centerlines import CenterlineIndex
+from .constants import LONG_BDR_DICT
 
 logger = logging.getLogger('framework.data_handler')
 
@@ -32,18 +35,53 @@ class DataHandler:
             Layered bssd map that contains all bssd objects.
         relevant_lanelets : list
             List of lanelets of a Lanelet2 map that are considered relevant (see preprocessing for more info)
-        graph : RoutingGraph
-            Graph for the lanelet map that is adjusted to contain all the lanelets of a map.
+        pending_lanelets : set
+            IDs of the relevant lanelets that haven't been processed yet.
+        new_linestrings : list
+            Linestrings that have been created as longitudinal boundaries and added to the Lanelet2 map.
+        long_boundaries : dict
+            Identified longitudinal boundary (linestring and ID of its reference linestring) for every pair of
+            start-/endpoints of lateral boundaries (see topology.endpoint_key).
+        lanelet_table : defaultdict
+            LaneletData for every lanelet ID, which stores the classification of the lanelets (e.g. relevance) as well
+            as derived data such as speed limits outside of the map.
+        graph : TopologyIndex | RoutingGraph
+            Relations (following, previous, conflicting) between all the lanelets of a map.
+        usages : UsageIndex
+            Inverse index of the map that contains the usages of points and linestrings, including new linestrings.
+        boundaries : BoundaryIndex
+            Index of the linestrings that are potential longitudinal boundaries (e.g. stop lines) for their points.
+            Contains the candidates between the start-/endpoints of every relevant lanelet.
+        area_surroundings : dict
+            Relevant lanelets that surround a keepout area for every area ID, each together with the boundary of the
+            area in the direction in which the lanelet uses it.
+        segment_memberships : dict
+            Cached results of filter_for_segment_membership for every pair of a surrounding and a reference lanelet.
+        centerlines : CenterlineIndex
+            Endpoints and directions of the centerlines of lanelets, e.g. of the lanelets surrounding keepout areas.
+        segments : SegmentIndex
+            Segments of the relevant lanelets including their lateral levels and the opposing driving direction.
+        crossings : CrossingTable
+            Relevant lanelets crossing every zebra crossing and pedestrian lanelet as well as the walkway areas and
+            lanelets to link at zebra crossings.
         traffic_rules : traffic_rules
             traffic rules object from lanelet2 for participant = vehicle
+        speed_limits : SpeedLimitResolver
+            Resolves the speed limits of lanelets with the traffic rules once per distinct lanelet signature.
 
     Methods
     -------
         __init__(map_lanelet):
             Initiates class instance by getting lanelet map object. Creates empty bssd map object.
             Creates RoutingGraph and also calls function to find relevant lanelets.
-        recursive_loop(lanelet_id, direction=None, linestring=None):
-            Recursively loops through lanelets in a map. Function is called from framework.py
+        find_lanelet_ends():
+            Returns the pairs of start-/endpoints of the lateral boundaries of every relevant lanelet.
+        loop_all():
+            Loops through every relevant lanelet of a map. Function is called from framework.py
+        loop(lanelet_id):
+            Loops through every lanelet that can be reached from a lanelet via successors and predecessors.
+        process_lanelet(lanelet_id, direction=None, linestring=None):
+            Derives the behavior space of a lanelet and returns its neighbors for the loop.
         identify_longitudinal_boundary(point_left, point_right, use_previous, previous):
             For end-/startpoints of lateral boundaries of lanelet this function searches for potential
             linestrings that can be used to determine the linestring of the correspondent behavior space.
@@ -59,16 +97,15 @@ class DataHandler:
         derive_segment_speed_limit(lanelet):
             Starting from one lanelet this function auto detects all lanelets of the same segment and
             cross assigns speed limits for behaviors against reference direction.
-        find_adjacent(current_lanelet, level, previous_lanelet=None):
-            Recursively searches for every lanelet of the same segment but for the same reference
-            driving direction. Returns dictionary with lanelets assigned to a respective level on the roadway.
         assign_speed_limit_along(segment):
-            Temporarily assigns lanelet speed limit to lanelet attributes for every lanelet in a segment.
+            Stores the lanelet speed limit in the lanelet table for every lanelet in a segment.
         assign_speed_limit_against(segment, other_ll=None):
-            Temporarily assigns lanelet speed limit for behavior against reference direction distinguishing between
-            structurally divided driving directions.
+            Stores the lanelet speed limit for behavior against reference direction in the lanelet table distinguishing
+            between structurally divided driving directions.
         find_one_sided_neighbors(lanelet, linestring, orientation):
             Searches for neighbors of a lanelet either through direct neighborhood or next to a keepout area.
+        find_area_surroundings():
+            Stores the relevant lanelets surrounding every keepout area of the map.
         neighbor_next_to_area(linestring):
             Searches for keepout areas and returns every lanelet surrounding this area.
         filter_for_segment_membership(sourrounding_lanelets, ref_lanelet, ref_linestring, orientation):
@@ -81,40 +118,101 @@ class DataHandler:
             Finds direct neighbors of an area to set the reservation links at a zebra crossing.
     """
 
-    def __init__(self, map_lanelet, relevant_lanelets, routing_graph):
+    def __init__(self, map_lanelet, relevant_lanelets, routing_graph, lanelet_table=None, usages=None):
         self.map_lanelet = map_lanelet
         self.map_bssd = BSSD_elements.BssdMap()
         self.relevant_lanelets = relevant_lanelets
+        self.pending_lanelets = set(relevant_lanelets)
+        self.new_linestrings = []
+        self.long_boundaries = {}
+        if lanelet_table is None:
+            lanelet_table = create_lanelet_table()
+            classify_lanelets(map_lanelet, lanelet_table)
+        self.lanelet_table = lanelet_table
         self.traffic_rules = traffic_rules.create(traffic_rules.Locations.Germany,
                                                   traffic_rules.Participants.Vehicle)
         self.graph = routing_graph
+        self.speed_limits = SpeedLimitResolver(map_lanelet, self.traffic_rules)
+        self.usages = usages if usages is not None else UsageIndex(map_lanelet)
+        self.boundaries = BoundaryIndex(map_lanelet)
+        self.boundaries.add_free_candidates(self.find_lanelet_ends())
+        self.area_surroundings = {}
+        self.segment_memberships = {}
+        self.centerlines = CenterlineIndex()
+        self.find_area_surroundings()
+        self.segments = SegmentIndex(self.lanelet_table, self.find_one_sided_neighbors)
+        self.segments.add_segments(map_lanelet.laneletLayer[lanelet_id] for lanelet_id in relevant_lanelets)
+        self.crossings = CrossingTable(self.graph, self.lanelet_table, self.usages)
+
+    def find_lanelet_ends(self):
+        """
+        Returns the pairs of start-/endpoints of the left and right lateral boundaries of every relevant lanelet, for
+        which a longitudinal boundary might be searched during the loop.
+        """
+        lanelet_layer = self.map_lanelet.laneletLayer
+        return [(lanelet.leftBound[index], lanelet.rightBound[index])
+                for lanelet in (lanelet_layer[lanelet_id] for lanelet_id in self.relevant_lanelets)
+                for index in [0, -1] if lanelet.leftBound[index].id != lanelet.rightBound[index].id]
 
     # -----------------------------------------------
     # -------------------- loop ---------------------
     # -----------------------------------------------
-    def recursive_loop(self, lanelet_id, direction=None, linestring=None):
+    def loop_all(self):
         """
-        Starting at any given lanelet of a map, this function loop through all lanelets that can be reached via
-        successor/predecessor connections. To achieve this, this function calls itself for every successor and
-        predecessor of a lanelet. For the next lanelets, it will repeat this process. Removing a processed lanelet
-        from a list of relevant lanelets assures that no lanelet will be touched twice. As soon as the end of every
-        possible path is reached, the loop ends. To make sure every other lanelet of a map is considered as well
-        a while-loop in framework.py makes sure that the loop is started again for the remaining lanelets.
+        Loops through every relevant lanelet of the map. Starting at the first relevant lanelet that hasn't been
+        processed yet, every lanelet that can be reached via successor/predecessor connections is processed. This is
+        repeated until every relevant lanelet has been processed.
+        """
+        for lanelet_id in self.relevant_lanelets:
+            if lanelet_id in self.pending_lanelets:
+                self.loop(lanelet_id)
 
-        During the processing of a lanelet, this function calls other functions that create BSSD elements and link
-        the behavior space to the lanelet. Furthermore, longitudinal boundaries are identified an derivations
+    def loop(self, lanelet_id):
+        """
+        Starting at any given lanelet of a map, this function loops through all lanelets that can be reached via
+        successor/predecessor connections. Instead of recursive calls for every successor and predecessor, the
+        traversal uses an explicit stack. For every processed lanelet, the stack contains an iterator over its
+        successors and predecessors together with the boundary that is handed over to them. The next lanelet is always
+        taken from the iterator at the top of the stack, which results in the same depth-first order as a recursive
+        traversal, but is not limited by the recursion limit of Python. Removing a processed lanelet from the set of
+        pending lanelets assures that no lanelet will be touched twice. As soon as the end of every possible path is
+        reached, the loop ends.
+
+        Parameters:
+            lanelet_id (int):The id of the lanelet at which the traversal starts.
+        """
+        stack = [self.process_lanelet(lanelet_id)]
+        while stack:
+            # Continue with the next pending neighbor of the lanelet at the top of the stack. The check happens only
+            # now, because the lanelet might have been processed in the meantime via another path.
+            for neighbor_id, direction, linestring in stack[-1]:
+                if neighbor_id in self.pending_lanelets:
+                    stack.append(self.process_lanelet(neighbor_id, direction, linestring))
+                    break
+            else:
+                # Every neighbor has been processed
+                stack.pop()
+
+    def process_lanelet(self, lanelet_id, direction=None, linestring=None):
+        """
+        Processes a single lanelet during the loop. This function calls other functions that create BSSD elements and
+        link the behavior space to the lanelet. Furthermore, longitudinal boundaries are identified an derivations
         of behavioral demand are being performed.
 
         Parameters:
             lanelet_id (int):The id of the lanelet that is being processed.
-            direction (str):The direction from which the previous lanelet called the function for this lanelet.
+            direction (str):The direction from which the previous lanelet reached this lanelet.
             linestring (LineString3d | LineString3d):Longitudinal boundary of previous lanelet (if exists).
+
+        Returns:
+            neighbors (iterator):ID, direction and longitudinal boundary to hand over for every successor and
+            predecessor of the lanelet.
         """
 
         # Retrieve lanelet object from lanelet map via ID
         lanelet = self.map_lanelet.laneletLayer[lanelet_id]
-        # Remove current lanelet from list of relevant lanelets to keep track which lanelets still have to be done
-        self.relevant_lanelets.remove(lanelet_id)
+        # Remove current lanelet from set of pending lanelets to keep track which lanelets still have to be done
+        self.pending_lanelets.discard(lanelet_id)
 
         logger.debug(f'----------------------------------------------------------------------------------------------')
         logger.debug(f'Derivation for Lanelet {lanelet_id}')
@@ -146,15 +244,13 @@ class DataHandler:
         # Call function for behavior derivation for the behavior space that was created for the current lanelet
         self.derive_behavior(new_behavior_space, lanelet)
 
-        # Call function in itself for the succeeding and preceding lanelet(s) and hand over information
-        # about already derived boundaries. Check if the following lanelet is relevant to avoid deriving
-        # behavior spaces for irrelevant lanelets.
-        for successor in self.graph.following(lanelet):
-            if successor.id in self.relevant_lanelets:
-                self.recursive_loop(successor.id, 'along', linestring_against_boundary_long)
-        for predecessor in self.graph.previous(lanelet):
-            if predecessor.id in self.relevant_lanelets:
-                self.recursive_loop(predecessor.id, 'against', linestring_along_boundary_long)
+        # Hand over information about already derived boundaries to the succeeding and preceding lanelet(s).
+        # Whether they are still pending is checked in the loop, when they are reached.
+        neighbors = [(successor.id, 'along', linestring_against_boundary_long)
+                     for successor in self.graph.following(lanelet)]
+        neighbors += [(predecessor.id, 'against', linestring_along_boundary_long)
+                      for predecessor in self.graph.previous(lanelet)]
+        return iter(neighbors)
 
     # -----------------------------------------------
     # ----------- longitudinal boundary -------------
@@ -183,12 +279,21 @@ class DataHandler:
         # Check different possible cases
         # First case is that the linestring information are given from the previous lanelet. In that case, the same
         # linestring will be used to represent the longitudinal boundary of the current behavior space (at one side)
+        key = endpoint_key(point_left, point_right)
         if use_previous:
             # Use previously created linestring
             linestring = id_previous_linestring
             ref_line = linestring.id
             logger.debug(f'Using linestring from successor/predecessor (ID: {linestring.id})')
 
+        # Second case is that the longitudinal boundary between these points has already been identified for another
+        # lanelet, regardless of the order in which the lanelets are reached. Like a linestring of the previous
+        # lanelet, the same linestring will be used and referenced for the current behavior space.
+        elif key in self.long_boundaries:
+            linestring = self.long_boundaries[key][0]
+            ref_line = linestring.id
+            logger.debug(f'Using identified linestring with ID {linestring.id}')
+
         # If the start-/endpoints of this side of a lanelet are identical, no longitudinal boundary exists
         elif point_left.id == point_right.id:
             # No longitudinal boundary exists
@@ -201,28 +306,16 @@ class DataHandler:
             # Setup a dictionary to store linestrings for each possible case.
             lines = LONG_BDR_DICT
 
-            # Find every usage of the left and right point
-            linestring_list_point_left = set(self.map_lanelet.lineStringLayer.findUsages(point_left))
-            linestring_list_point_right = set(self.map_lanelet.lineStringLayer.findUsages(point_right))
-
-            # Determine the linestrings that contain the left and the right point
-            mutual_linestring = set.intersection(linestring_list_point_left, linestring_list_point_right)
-
-            # Remove the mutual linestrings from the lists of each point to make sure that in the functions no
-            # wrong derivations will be made.
-            linestring_list_point_left = linestring_list_point_left - mutual_linestring
-            linestring_list_point_right = linestring_list_point_right - mutual_linestring
-
             # FIRST CASE: linestring contains both points
-            # This gives two options: The linestring is fitting exactly OR is overarching.
-            lines.update(find_flush_bdr(point_left, point_right, mutual_linestring))
+            # This gives two options: The linestring is fitting exactly (endpoints are the left and right point) OR
+            # is overarching. Both are found via the indices of the endpoints and of the points of the candidates.
+            lines.update(find_flush_bdr(point_left, point_right,
+                                        self.usages.linestrings_between(point_left, point_right), self.boundaries))
 
             # SECOND CASE: linestrings that contain only one point
             # The linestring is therefore covering the lanelet insufficiently
-            lines['insufficient_half_left'] = \
-                find_line_insufficient(linestring_list_point_left, point_left, point_right)
-            lines['insufficient_half_right'] = \
-                find_line_insufficient(linestring_list_point_right, point_right, point_left)
+            lines['insufficient_half_left'] = find_line_insufficient(self.boundaries, point_left, point_right)
+            lines['insufficient_half_right'] = find_line_insufficient(self.boundaries, point_right, point_left)
 
             # THIRD CASE: linestrings that do not contain one of the points
             # linestrings will be searched using a BoundingBox
@@ -266,6 +359,10 @@ class DataHandler:
                 linestring = LineString3d(getId(), points_for_new_linestring, {'type': 'BSSD', 'subtype': 'boundary'})
                 logger.debug(f'Created new linestring as longitudinal boundary with ID {linestring.id}')
                 self.map_lanelet.add(linestring)
+                self.usages.add_linestring(linestring)
+                self.new_linestrings.append(linestring)
+
+            self.long_boundaries[key] = (linestring, ref_line)
 
         return linestring, ref_line
 
@@ -282,37 +379,27 @@ class DataHandler:
             result (list):list with two items: 1 ref ls id and 2 points for the creation of a new linestring
         """
 
-        # Create a bounding box that is created so that it finds linestrings that don't exceed the lanelet borders
-        search_box = make_orthogonal_bounding_box(point_left, point_right)
-
-        # Use bounding box to search for linestrings in the area of a potential long boundary
-        # do not consider any linestring that contain either the left or the right start-/endpoint of the lat boundaries
-        # With this method every linestring that at least overlaps a bit with the bounding box will be found. Because
-        # of that, another condition is checked later within the for-loop-
-        nearby_linestrings = [linestring for linestring in self.map_lanelet.lineStringLayer.search(search_box)
-                              if point_left not in linestring or point_right not in linestring]
-
-        # For-loop through the lines that were found to check further conditions
-        for linestring in nearby_linestrings:
-            # Distinguish inside and outside of lanelet
-            # This is achieved by checking whether the two endpoints of the linestring ly within the bounding box
-            # First, the type of the linestring is checked, if it generally could be considered for a long boundary
-            if 'type' in linestring.attributes and linestring.attributes['type'] in LONG_BDR_TAGS and \
-                    all(x in self.map_lanelet.pointLayer.search(search_box) for x in [linestring[0], linestring[-1]]):
-
-                # If conditions are met, the linestring will be used to derive the actual longitudinal boundary
-                # Store the points of the linestring in a list
-                points_for_new_linestring = [point for point in linestring]
-
-                # Check the orientation of the linestring to append point_left and point_right at the right place
-                if dist(linestring[0], point_left) < dist(linestring[0], point_right):
-                    points_for_new_linestring.insert(0, point_left)
-                    points_for_new_linestring.append(point_right)
-                else:
-                    points_for_new_linestring.insert(0, point_right)
-                    points_for_new_linestring.append(point_left)
-                logger.debug(f'Found inside line with ID {linestring.id}')
-                return [linestring.id, points_for_new_linestring]
+        # The candidates whose endpoints lie inside the orthogonal bounding box between the two points have been
+        # determined for every lanelet in a batch (see BoundaryIndex). Linestrings that contain both points are
+        # not considered.
+        for id_line in self.boundaries.free_candidates(point_left, point_right):
+            pt_list = self.boundaries.points[id_line]
+
+            # If conditions are met, the linestring will be used to derive the actual longitudinal boundary
+            # Store the points of the linestring in a list
+            points_for_new_linestring = list(pt_list)
+
+            # Check the orientation of the linestring to append point_left and point_right at the right place
+            first_point = util.coordinates(pt_list[0])
+            if util.distance(first_point, util.coordinates(point_left)) < \
+                    util.distance(first_point, util.coordinates(point_right)):
+                points_for_new_linestring.insert(0, point_left)
+                points_for_new_linestring.append(point_right)
+            else:
+                points_for_new_linestring.insert(0, point_right)
+                points_for_new_linestring.append(point_left)
+            logger.debug(f'Found inside line with ID {id_line}')
+            return [id_line, points_for_new_linestring]
 
         # If nothing was found, return a list with two empty items
         return [None, None]
@@ -325,7 +412,7 @@ class DataHandler:
         This is the main function for actual derivations of behavioral demands. It integrates calls for other functions
         that are deriving specific behavior attributes and properties. Therefore, it is possible to extend the behavior
         derivations by adding more subfunctions in the future. The derivation is started after creating a behavior space
-        placeholder element for a lanelet in "recursive_loop".
+        placeholder element for a lanelet in "process_lanelet".
 
         Parameters:
             behavior_space (BehaviorSpace):Behavior space object that is supposed to be filled within this function.
@@ -366,31 +453,32 @@ class DataHandler:
         # To do so, check first whether the speed limits have already been derived for this segment.
         # If not, the segmentwise derivation will be started.
         logger.debug(f'_______ Deriving speed limits _______')
-        if 'along_speed_limit' not in lanelet.attributes and 'against_speed_limit' not in lanelet.attributes:
+        lanelet_data = self.lanelet_table[lanelet.id]
+        if lanelet_data.along_speed_limit is None and lanelet_data.against_speed_limit is None:
             logger.debug(f'Derive speed limit for the segment the current lanelet belongs to.')
             self.derive_segment_speed_limit(lanelet)
         else:
             logger.debug(f'Segmentwise speed limit derivation has already been done for this lanelet.')
 
-        # If speed limit already has been derived for the current lanelet, get the values that are temporarily 
-        # stored in the lanelet attributes to save them in the respective behaviors. If existing, add a reference
-        # to the speed indicator
-        speed_limit = lanelet.attributes['along_speed_limit']
+        # If speed limit already has been derived for the current lanelet, get the values that are stored in the
+        # lanelet table to save them in the respective behaviors. If existing, add a reference to the speed indicator.
+        # Since the values of OSM tags are strings, the speed limits are converted.
+        speed_limit = str(lanelet_data.along_speed_limit)
         behavior_space.alongBehavior.attributes.speed_max = speed_limit
         logger.debug(f'For behavior along (ID: {behavior_space.alongBehavior.id}) '
                      f'speed limit {speed_limit} extracted from lanelet')
-        if 'along_speed_limit_link' in lanelet.attributes:
-            speed_ind_id = int(lanelet.attributes['along_speed_limit_link'])
+        if lanelet_data.along_speed_limit_link is not None:
+            speed_ind_id = lanelet_data.along_speed_limit_link
             logger.debug(f'Referencing regulatory element {speed_ind_id} as speed indicator for alongBehavior')
             behavior_space.alongBehavior.attributes.add_speed_indicator(speed_ind_id)
 
-        speed_limit = lanelet.attributes['against_speed_limit']
+        speed_limit = str(lanelet_data.against_speed_limit)
         behavior_space.againstBehavior.attributes.speed_max = speed_limit
         logger.debug(
             f'For behavior against (ID: {behavior_space.againstBehavior.id})'
             f'speed limit {speed_limit} extracted from lanelet')
-        if 'against_speed_limit_link' in lanelet.attributes:
-            speed_ind_id = int(lanelet.attributes['against_speed_limit_link'])
+        if lanelet_data.against_speed_limit_link is not None:
+            speed_ind_id = lanelet_data.against_speed_limit_link
             logger.debug(f'Referencing regulatory element {speed_ind_id} as speed indicator for againstBehavior')
             behavior_space.againstBehavior.attributes.add_speed_indicator(speed_ind_id)
 
@@ -453,10 +541,6 @@ class DataHandler:
             motor_lanelet (Lanelet):Lanelet for motorized vehicles on which the behavior spaced is mapped.
         """
 
-        # Create a traffic rules object for pedestrians
-        traffic_rules_pedestrian = traffic_rules.create(traffic_rules.Locations.Germany,
-                                                        traffic_rules.Participants.Pedestrian)
-
         # Check, if the longitudinal boundary of the given behavior object is referencing to a linestring
         # The is based on the assumption that a zebra crossing linestring was found for the derivation of the
         # longitudinal boundary
@@ -469,10 +553,9 @@ class DataHandler:
             if linestring_long_boundary.attributes['type'] in ['zebra_marking']:
 
                 # If condition is met, search for all lanelets that conflict with the lanelet that this behavior is
-                # derived for. Check these lanelets for conflicting centerline and passability for pedestrians.
-                zebra_lanelet = next((pedestrian_lanelet for pedestrian_lanelet in self.graph.conflicting(motor_lanelet)
-                                      if geo.intersectCenterlines2d(pedestrian_lanelet, motor_lanelet)
-                                      and traffic_rules_pedestrian.canPass(pedestrian_lanelet)), None)
+                # derived for. Check these lanelets for passability for pedestrians and conflicting centerline. The
+                # intersecting lanelets are determined once per pedestrian lanelet in the crossing table.
+                zebra_lanelet = self.crossings.find_pedestrian_crossing(motor_lanelet)
 
                 # If a lanelet has been found that meets these conditions, the conclusion is made, that the current
                 # lanelet overlaps with a zebra crossing lanelet. Thus, the property no_stagnant_traffic will be set.
@@ -489,11 +572,10 @@ class DataHandler:
     def derive_segment_speed_limit(self, start_lanelet):
         """
         Starting from one lanelet, this function derives the speed limit along and against reference direction for every
-        lanelet of the segment. To achieve this, the first step is to find every lanelet of the same reference
-        direction. Second, for the outer left lanelet neighbors for the opposing driving direction of the roadway are
-        being searched. If no neighbor is found, structural separation is assumed. If a neighbor is found, a search for
-        all lanelets of that driving direction will be started. Depending on the type of linestring inbetween the two
-        driving directions, structural separation is assumed or not.
+        lanelet of the segment. The lanelets of the same reference direction and the segment of the opposing driving
+        direction, which is searched from the outer left lanelets, are taken from the segment index. If no opposing
+        segment has been found, structural separation is assumed. Otherwise, depending on the type of linestring
+        inbetween the two driving directions, structural separation is assumed or not.
 
         For every lanelet of a segment the speed limit along reference direction is derived using the traffic rules
         module of Lanelet2. If regulatory elements for speed limits are referenced within the lanelet, their IDs will be
@@ -502,9 +584,9 @@ class DataHandler:
         the speed limits against reference direction are used from lanelets of the opposing driving direction of the
         roadway.
 
-        The information about speed limit values and potential regulatory elements are stored in the attributes of
-        lanelets, because at the moment of the derivation there doesn't exist a behavior space element for each lanelet
-        of the map. As soon as the recursive loop processes a lanelet with already determined speed limit information,
+        The information about speed limit values and potential regulatory elements are stored in the lanelet table,
+        because at the moment of the derivation there doesn't exist a behavior space element for each lanelet
+        of the map. As soon as the loop processes a lanelet with already determined speed limit information,
         those will be assigned to the behavior elements of the behavior space.
 
         Parameters:
@@ -513,111 +595,52 @@ class DataHandler:
 
         logger.debug(f'-.-.-.-.-.-.-.-.-.-.-.-')
 
-        # First, identify lanelets of the same driving direction within the same segment.
+        # The lanelets of the same driving direction within the same segment have been identified by the segment index.
         # The search is based on direct neighbors and neighbors next to keepout areas.
-        logger.debug(f'Searching for lanelets of the same segment and driving direction for lanelet {start_lanelet.id}')
-        lanelets_of_same_direction = self.find_adjacent(start_lanelet, 0)
-        logger.debug(f'Found lanelets '
-                     f'{[[key, [ll.id for ll in value]] for key, value in lanelets_of_same_direction.items()]}')
-        first_opposing_lanelets = None
+        segment = self.segments.segment_of(start_lanelet)
+        logger.debug(f'Using segment {segment.id} of lanelet {start_lanelet.id}')
 
         # Derive and assign information about the speed limit for the
-        # identified lanelets and store them in their attributes
-        self.assign_speed_limit_along(lanelets_of_same_direction)
-
-        # Search for lanelets of the opposing driving direction for the outerleft lanelet of the identified lanelets
-        # Using a for loop, because there may be multiple lanelets assigned to the same level
-        logger.debug(f'Searching for lanelets of the same segment but in the opposing driving direction.')
-        for lanelet in lanelets_of_same_direction[max(lanelets_of_same_direction.keys())]:
-            # Search for a direct neighbor of the opposing direction through direct neighborhood or next to a keepout
-            first_opposing_lanelets = self.find_one_sided_neighbors(lanelet, lanelet.leftBound.invert(), 'against')
-
-            # If a lanelet is found, check whether structural separation is dividing the roadway
-            if first_opposing_lanelets:
-                
-                # Identify every lanelet of the opposing direction of the segment
-                lanelets_of_opposing_direction = self.find_adjacent(next(iter(first_opposing_lanelets)), 0)
-                logger.debug(f'Found lanelets'
-                             f'{[[key, [lanelet.id for lanelet in value]] for key, value in lanelets_of_opposing_direction.items()]} '
-                             f'for opposing driving direction.')
-                # derive speed limit for lanelets_of_opposing_direction along their reference direction
-                self.assign_speed_limit_along(lanelets_of_opposing_direction)
-
-                # distinguish passability between driving directions
-                if not derive_crossing_type_for_lat_boundary(lanelet.leftBound.attributes, 'left') == 'not_possible':
-                    # no structural separation
-                    logger.debug(f'Driving directions for this segment are not structurally separated.'
-                                 f' Cross assign speed limits to lanelets.')
-                    outer_left_opposing_lanelet =\
-                        list(lanelets_of_opposing_direction[max(lanelets_of_opposing_direction.keys())])[0]
-                    self.assign_speed_limit_against(lanelets_of_opposing_direction, lanelet)
-                    self.assign_speed_limit_against(lanelets_of_same_direction, outer_left_opposing_lanelet)
-                else:
-                    # driving directions are structurally separated
-                    logger.debug(f'Driving directions for this segment are structurally separated.'
-                                 f' Use along behavior speed limit for against behavior.')
-                    self.assign_speed_limit_against(lanelets_of_opposing_direction)
-                    self.assign_speed_limit_against(lanelets_of_same_direction)
-
-                break
+        # identified lanelets and store them in the lanelet table
+        self.assign_speed_limit_along(segment.levels)
+
+        # If a lanelet of the opposing direction has been found next to the outer left lanelets, check whether
+        # structural separation is dividing the roadway
+        if segment.opposing is not None:
+            opposing_segment = self.segments.segments[segment.opposing]
+            lanelet = segment.lanelet_left
+            logger.debug(f'Using segment {opposing_segment.id} for opposing driving direction.')
+            # derive speed limit for lanelets of the opposing direction along their reference direction
+            self.assign_speed_limit_along(opposing_segment.levels)
+
+            # distinguish passability between driving directions
+            if not derive_crossing_type_for_lat_boundary(lanelet.leftBound.attributes, 'left') == 'not_possible':
+                # no structural separation
+                logger.debug(f'Driving directions for this segment are not structurally separated.'
+                             f' Cross assign speed limits to lanelets.')
+                self.assign_speed_limit_against(opposing_segment.levels, lanelet)
+                self.assign_speed_limit_against(segment.levels, segment.opposing_lanelet)
+            else:
+                # driving directions are structurally separated
+                logger.debug(f'Driving directions for this segment are structurally separated.'
+                             f' Use along behavior speed limit for against behavior.')
+                self.assign_speed_limit_against(opposing_segment.levels)
+                self.assign_speed_limit_against(segment.levels)
 
         # if no lanelet of the opposing direction is found, it is assumed that the driving directions
         # of the roadway are structurally separated
-        if not first_opposing_lanelets:
+        else:
             logger.debug(f'Driving directions for this segment are structurally separated.'
                          f' Use along behavior speed limit for against behavior.')
-            self.assign_speed_limit_against(lanelets_of_same_direction)
+            self.assign_speed_limit_against(segment.levels)
 
         logger.debug(f'-.-.-.-.-.-.-.-.-.-.-.-')
 
-    def find_adjacent(self, current_lanelet, level, previous_lanelet=None):
-        """
-        Find all lanelets of the same segment that have the same reference direction. Search direct neighbors as well
-        as neighbors next to a keepout area. To find these, recursively call this function for the neighbors of a
-        lanelet. Pass up information to earlier calls of the function and through this, build up a dictionary with
-        all the lanelets and there respective level in the street.
-
-        Parameters:
-            current_lanelet (Point2d | Point3d):The lanelet that is being checked.
-            level (Point2d | Point3d):The number for the current lanelet for the position on the roadway.
-            previous_lanelet (Lanelet): The previously considered lanelet to avoid infinite recursive loops.
-
-        Returns:
-            lanelets_for_direction (dict):Contains lanelets assigned to their lateral level in the roadway.
-        """
-
-        # Find all lanelets that are lying right next to each other
-        # condition is that they share there lateral boundary or that they are lying next to a keepout area
-        lefts = self.find_one_sided_neighbors(current_lanelet, current_lanelet.leftBound, 'along')
-        rights = self.find_one_sided_neighbors(current_lanelet, current_lanelet.rightBound, 'along')
-
-        # Remove the previously considered lanelet to avoid recursive loops
-        lefts.discard(previous_lanelet)
-        rights.discard(previous_lanelet)
-
-        # Create a defaultdict to store the lanelets, because this allows to insert items for keys that don't exist yet
-        lanelets_for_direction = defaultdict(set)
-        # Making use of that, add the current lanelet for the current level as key
-        lanelets_for_direction[level].add(current_lanelet)
-
-        # For both sides call this function recursivly again. Consequentially, the later function calls will report the
-        # information back to the earlier function calls so that eventually the first function call includes every
-        # lanelet that met the conditions for being part of the segment. The dictionaries are therefore concatenated
-        for lanelet in lefts:
-            sub_set = self.find_adjacent(lanelet, level + 1, current_lanelet)
-            util.join_dictionaries(lanelets_for_direction, sub_set)
-
-        for lanelet in rights:
-            sub_set = self.find_adjacent(lanelet, level - 1, current_lanelet)
-            util.join_dictionaries(lanelets_for_direction, sub_set)
-
-        return lanelets_for_direction
-
     def assign_speed_limit_along(self, lanelets_of_same_direction):
         """
         For a given dictionary of lanelets of the same reference direction of a segment, this function stores the speed
-        limit value in the attributes of the lanelet. In case a regulatory element is indicating this limit, the
-        function will determine its ID and also store it in the lanelets attributes.
+        limit value in the lanelet table. In case a regulatory element is indicating this limit, the
+        function will determine its ID and also store it in the lanelet table.
 
         Parameters:
             lanelets_of_same_direction (dict):Contains lanelets assigned to their lateral level in the roadway.
@@ -627,22 +650,20 @@ class DataHandler:
         for level in lanelets_of_same_direction.keys():
             # Loop through every lanelet of the level
             for lanelet in lanelets_of_same_direction[level]:
-                # Use the traffic rules function of lanelet to
-                # derive the speed limit and save it to the lanelets attributes
-                speed_limit = str(round(self.traffic_rules.speedLimit(lanelet).speedLimit))
-                lanelet.attributes['along_speed_limit'] = speed_limit
+                # Use the traffic rules function of lanelet (via the resolver, which calls it once per distinct
+                # signature of lanelets) to derive the speed limit and save it to the lanelet table
+                speed_limit, speed_limit_link = self.speed_limits.speed_limit(lanelet)
+                lanelet_data = self.lanelet_table[lanelet.id]
+                lanelet_data.along_speed_limit = speed_limit
                 logger.debug(f'Saving speed limit {speed_limit} for along behavior in lanelet {lanelet.id}')
 
-                # Extract every regulatory element that is referenced in this lanelt of type SpeedLimit
-                speed_limit_objects =\
-                    [regelem for regelem in lanelet.regulatoryElements if isinstance(regelem, SpeedLimit)]
-                # If a speed limit item was found, save the ID in the lanelets attributes
-                if speed_limit_objects:
-                    logger.debug(f'Found regulatory element {speed_limit_objects[0].id} that indicates the speed limit')
-                    lanelet.attributes['along_speed_limit_link'] = str(speed_limit_objects[0].id)
+                # If a regulatory element of type SpeedLimit is referenced in this lanelet, save the ID in the
+                # lanelet table
+                if speed_limit_link is not None:
+                    logger.debug(f'Found regulatory element {speed_limit_link} that indicates the speed limit')
+                    lanelet_data.along_speed_limit_link = speed_limit_link
 
-    @staticmethod
-    def assign_speed_limit_against(lanelets_of_same_direction, opposing_lanelet=None):
+    def assign_speed_limit_against(self, lanelets_of_same_direction, opposing_lanelet=None):
         """
         Similarly to the function assign_speed_limit_along, this function instead assigns the speed limits against
         reference direction for the lanelets of a given segment (=only from one driving direction of the roadway). Two
@@ -669,14 +690,16 @@ class DataHandler:
                 # Depending on whether an opposing lanelet is given, either assign the speed limit information of this
                 # opposing lanelet as the speed limit information against reference direction or use the lanelets own
                 # information for along reference direction
+                lanelet_data = self.lanelet_table[ll.id]
                 if opposing_lanelet:
-                    ll.attributes['against_speed_limit'] = opposing_lanelet.attributes['along_speed_limit']
-                    if 'along_speed_limit_link' in ll.attributes:
-                        ll.attributes['against_speed_limit_link'] = opposing_lanelet.attributes['along_speed_limit_link']
+                    opposing_data = self.lanelet_table[opposing_lanelet.id]
+                    lanelet_data.against_speed_limit = opposing_data.along_speed_limit
+                    if lanelet_data.along_speed_limit_link is not None:
+                        lanelet_data.against_speed_limit_link = opposing_data.along_speed_limit_link
                 else:
-                    ll.attributes['against_speed_limit'] = ll.attributes['along_speed_limit']
-                    if 'along_speed_limit_link' in ll.attributes:
-                        ll.attributes['against_speed_limit_link'] = ll.attributes['along_speed_limit_link']
+                    lanelet_data.against_speed_limit = lanelet_data.along_speed_limit
+                    if lanelet_data.along_speed_limit_link is not None:
+                        lanelet_data.against_speed_limit_link = lanelet_data.along_speed_limit_link
 
     def find_one_sided_neighbors(self, start_lanelet, linestring_start_lanelet, orientation):
         """
@@ -693,10 +716,9 @@ class DataHandler:
             neighbor_lanelets (set):Set of all lanelets that are considered as neighbors.
         """
 
-        # 1. Use the lanelet layer to find every usage of the linestring in lanelets that are relevant
-        lanelet_layer = self.map_lanelet.laneletLayer
-        neighbor_lanelets = {lanelet for lanelet in lanelet_layer.findUsages(linestring_start_lanelet)
-                             if is_lanelet_relevant(lanelet.attributes)}
+        # 1. Use the usage index to find every usage of the linestring in lanelets that are relevant
+        neighbor_lanelets = {lanelet for lanelet in self.usages.lanelets_using(linestring_start_lanelet)
+                             if self.lanelet_table[lanelet.id].relevant}
         # Discard the lanelet the search has been started from, since it is not its own neighbor
         neighbor_lanelets.discard(start_lanelet)
         # Remove lanelets from the set that are having an overlap with the starting lanelet
@@ -729,8 +751,6 @@ class DataHandler:
             surrounding_lanelets (dict):True if conditions are met, otherwise False.
         """
 
-        lanelet_layer = self.map_lanelet.laneletLayer
-
         # Search for keepout areas that use the given linestring
         neighbor_areas = self.find_neighbor_areas(linestring, 'keepout')
         # Write a warning message if more than one area is found
@@ -743,23 +763,13 @@ class DataHandler:
         surrounding_lanelets: Dict[Any, Any] = dict()
         if neighbor_areas:
             area = neighbor_areas.pop()
-            # Get set of all linestrings in area
-            linestrings_of_area_boundary = {area_boundary for area_boundary in area.outerBound}
-            # Remove linestring of current lanelet from this list
-            linestrings_of_area_boundary.discard(linestring)
-            linestrings_of_area_boundary.discard(linestring.invert())
-            # Search for all usages of those linestrings in other lanelets and collect them in a dictionary
+            # Use the lanelets that surround the area, which have been stored for every keepout area beforehand.
             # Use the lanelet as a key (every lanelet should only appear once as a neighbor of an area) and store
-            # the linestring as the value. Save the linestring in the way that it is used (normal or inverted)
-            for area_boundary in linestrings_of_area_boundary:
-                for lanelet in lanelet_layer.findUsages(area_boundary):
-                    # Filter list of lanelets for ones that are relevant
-                    if is_lanelet_relevant(lanelet.attributes):
-                        surrounding_lanelets[lanelet] = area_boundary
-                for lanelet in lanelet_layer.findUsages(area_boundary.invert()):
-                    # Filter list of lanelets for ones that are relevant
-                    if is_lanelet_relevant(lanelet.attributes):
-                        surrounding_lanelets[lanelet] = area_boundary.invert()
+            # the linestring as the value in the way that it is used (normal or inverted). Lanelets next to the
+            # linestring of the current lanelet are not considered.
+            for lanelet, area_boundary in self.area_surroundings.get(area.id, []):
+                if area_boundary.id != linestring.id:
+                    surrounding_lanelets[lanelet] = area_boundary
 
             # If more than one lanelet has been found, write a warning to log
             if len(surrounding_lanelets) > 1:
@@ -768,6 +778,29 @@ class DataHandler:
 
         return surrounding_lanelets
 
+    def find_area_surroundings(self):
+        """
+        Stores the relevant lanelets that surround a keepout area for every keepout area of the map, so that the
+        lanelets next to an area are only searched once and not for every lanelet that borders the area. Together with
+        every lanelet, the boundary of the area is stored in the way that it is used in the lanelet (normal or
+        inverted).
+        """
+        for area in self.map_lanelet.areaLayer:
+            if 'subtype' not in area.attributes or area.attributes['subtype'] != 'keepout':
+                continue
+            surroundings = []
+            for area_boundary in area.outerBound:
+                for directed_boundary in [area_boundary, area_boundary.invert()]:
+                    # Filter the usages of the linestring in lanelets for ones that are relevant
+                    surroundings.extend((lanelet, directed_boundary)
+                                        for lanelet in self.usages.lanelets_using(directed_boundary)
+                                        if self.lanelet_table[lanelet.id].relevant)
+            self.area_surroundings[area.id] = surroundings
+
+        # The headings of the surrounding lanelets are compared in filter_for_segment_membership
+        self.centerlines.add_headings(lanelet for surroundings in self.area_surroundings.values()
+                                      for lanelet, _ in surroundings)
+
     def filter_for_segment_membership(self, surrounding_lanelets, ref_lanelet, ref_linestring, orientation):
         """
         This function is used to check, if lanelets that surround an area belong to the same segment as another
@@ -786,18 +819,30 @@ class DataHandler:
 
         belonging_to_segment = []
         for lanelet, linestring in surrounding_lanelets.items():
-            angle = util.angle_between_lanelets(lanelet, ref_lanelet)
-            if (orientation == 'along' and angle < 45) \
-                    and (linestring[0] == ref_linestring[0] or linestring[-1] == ref_linestring[-1]
-                         or self.are_linestrings_orthogonal(linestring, ref_linestring,
-                                                            [linestring[0], ref_linestring[0]])):
-                belonging_to_segment.append(lanelet)
-            elif orientation == 'against' and 135 < angle < 225 \
-                    and (linestring[0] == ref_linestring[-1] or linestring[-1] == ref_linestring[0]
-                         or self.are_linestrings_orthogonal(linestring, ref_linestring,
-                                                            [linestring[-1], ref_linestring[0]])):
+            # The verdict for a pair of lanelets only depends on the lanelets, their linestrings at the area and the
+            # orientation. Thus, it is computed once and reused for further requests of the same pair.
+            key = (lanelet.id, linestring.id, linestring.inverted(),
+                   ref_lanelet.id, ref_linestring.id, ref_linestring.inverted(), orientation)
+            if key not in self.segment_memberships:
+                angle = util.angle_between_lanelets(lanelet, ref_lanelet, self.centerlines)
+                if (orientation == 'along' and angle < 45) \
+                        and (linestring[0] == ref_linestring[0] or linestring[-1] == ref_linestring[-1]
+                             or self.are_linestrings_orthogonal(linestring, ref_linestring,
+                                                                [linestring[0], ref_linestring[0]])):
+                    self.segment_memberships[key] = 'member'
+                elif orientation == 'against' and 135 < angle < 225 \
+                        and (linestring[0] == ref_linestring[-1] or linestring[-1] == ref_linestring[0]
+                             or self.are_linestrings_orthogonal(linestring, ref_linestring,
+                                                                [linestring[-1], ref_linestring[0]])):
+                    self.segment_memberships[key] = 'member'
+                elif 45 < angle < 135:
+                    self.segment_memberships[key] = 'angle'
+                else:
+                    self.segment_memberships[key] = None
+
+            if self.segment_memberships[key] == 'member':
                 belonging_to_segment.append(lanelet)
-            elif 45 < angle < 135:
+            elif self.segment_memberships[key] == 'angle':
                 logger.warning(f'Lanelet {lanelet.id} and {ref_lanelet.id} border the same area and '
                                f'cannot be assigned to the same segment. Reason: Angle too large')
 
@@ -824,17 +869,12 @@ class DataHandler:
             linestrings_orthogonal (bool):True if conditions are met, otherwise False.
         """
 
-        # Retrieve mutable point objects from the point layer
-        points_to_link_linestrings = [self.map_lanelet.pointLayer[pt.id] for pt in points_to_link_linestrings]
-        # Create a Linestring object with the two points
-        connect_lateral_boundaries = LineString3d(getId(), points_to_link_linestrings)
+        # Vector of the connecting line between the two points
+        connect_lateral_boundaries = util.vector_between(*points_to_link_linestrings)
 
-        # Calculate the angles between each linestring and the connecting linestring
-        angle_1 = util.angle_between_linestrings(linestring_1, connect_lateral_boundaries)
-        angle_2 = util.angle_between_linestrings(linestring_2, connect_lateral_boundaries)
-
-        # return a bool through checking whether the two angles are within the specified range of 80° to 100°
-        return 80 < angle_1 < 100 and 80 < angle_2 < 100
+        # Check whether the angles between each linestring and the connecting line are within the range of 80° to 100°
+        return util.are_vectors_orthogonal(util.linestring_to_vector(linestring_1), connect_lateral_boundaries) and \
+            util.are_vectors_orthogonal(util.linestring_to_vector(linestring_2), connect_lateral_boundaries)
 
     # ---------------------------------------------------------------------------------
     # ------------ behavior derivation of reservation at zebra crossings --------------
@@ -844,72 +884,50 @@ class DataHandler:
         For a given behavior space, use the referenced lanelet to derive conflicting lanelets in the Lanelet2 map.
         Derive behavioral demands based on these identified conflicts. Currently, only zebra crossings are identified
         and external reservation is therefore determined. Furthermore, reservation links are set for lanelets and areas
-        where pedestrians may come from.
+        where pedestrians may come from. The lanelets and areas to link are determined once per zebra crossing in the
+        crossing table and shared by every behavior space that crosses it.
 
         Parameters:
             behavior_space (BehaviorSpace):Behavior space object for which derivation is performed.
         """
 
-        # find all conflicting lanelets in RoutingGraph for lanelet of this behavior space
-        for lanelet in self.graph.conflicting(behavior_space.ref_lanelet):
-            # filter this list for lanelets whose centerline are intersecting with the behavior spaces lanelet
-            if is_zebra_and_intersecting(lanelet, behavior_space.ref_lanelet):
-
-                # If an intersecting zebra crossing is found, set the external reservation for both behaviors of this
-                # behavior space and set the reservation to pedestrian
-                logger.debug(f'Conflicting zebra crossing with lanelet ID {lanelet.id} has been found. Setting'
-                             f' reservation for behavior space {behavior_space} for both behaviors to externally')
-                behavior_space.alongBehavior.reservation[0].attributes.reservation = tp.ReservationType.EXTERNALLY
-                behavior_space.againstBehavior.reservation[0].attributes.reservation = tp.ReservationType.EXTERNALLY
-                behavior_space.alongBehavior.reservation[0].attributes.pedestrian = True
-                behavior_space.againstBehavior.reservation[0].attributes.pedestrian = True
-
-                # Identify lanelets and areas that need to be referenced as reservation links in the
-                # given behavior space. To do so, identify every conflict with the zebra crossing lanelet.
-                logger.debug(f'Searching for lanelets and areas that need to be referenced via reservation links.')
-                for link_lanelet in self.graph.conflicting(lanelet):
-                    # Check lanelet for being relevant and for intersecting centerlines
-                    if is_lanelet_relevant(link_lanelet.attributes)\
-                            and geo.intersectCenterlines2d(link_lanelet, lanelet):
-
-                        # Avoid setting a reservation link to the lanelet that the behavior space is referencing
-                        # For every other lanelet that met the previous conditions, set an reservation link in both
-                        # behaviors.
-                        if not link_lanelet == behavior_space.ref_lanelet:
-                            logger.debug(f'Found lanelet {link_lanelet.id}, '
-                                         f'which conflicts with crosswalk lanelet {lanelet.id}')
-                            behavior_space.alongBehavior.reservation[0].attributes.add_link(link_lanelet.id)
-                            behavior_space.againstBehavior.reservation[0].attributes.add_link(link_lanelet.id)
-
-                        # For every lanelet that conflicts with the zebra crossing lanelet, search for neighbor areas
-                        # of type 'walkway'. If one is found, also set a reservation link for these.
-                        nbr_areas = self.find_neighbor_areas(link_lanelet.leftBound, 'walkway') | \
-                                    self.find_neighbor_areas(link_lanelet.rightBound, 'walkway')
-                        for area in nbr_areas:
-                            logger.debug(f'Found walkway area {area.id}, '
-                                         f'which lies next to crosswalk lanelet {lanelet.id}')
-                            behavior_space.alongBehavior.reservation[0].attributes.add_link(area.id)
-                            behavior_space.againstBehavior.reservation[0].attributes.add_link(area.id)
-
-                # As a third option for reservation links, check if a lanelet is used to model the walkway space next to
-                # the roadway. In this case, the zebra crossing lanelet has successors and/or predecessors
-                for link_lanelet in (self.graph.previous(lanelet) + self.graph.following(lanelet)):
-                    logger.debug(
-                        f'Found walkway lanelet {link_lanelet.id}, '
-                        f'which lies before/after to crosswalk lanelet {lanelet.id}')
-                    behavior_space.alongBehavior.reservation[0].attributes.add_link(link_lanelet.id)
-                    behavior_space.againstBehavior.reservation[0].attributes.add_link(link_lanelet.id)
-
-                # If a zebra lanelet was found and the above listed steps have been performed, break out of the loop
-                break
-
-        # If nothing was found, write a message to log with this information
-        logger.debug(f'No zebra crossing found.')
+        # find the first conflicting zebra crossing whose centerline intersects with the lanelet of this behavior space
+        lanelet, crossing = self.crossings.find_zebra_crossing(behavior_space.ref_lanelet)
+        if not crossing:
+            # If nothing was found, write a message to log with this information
+            logger.debug(f'No zebra crossing found.')
+            return
+
+        # If an intersecting zebra crossing is found, set the external reservation for both behaviors of this
+        # behavior space and set the reservation to pedestrian
+        logger.debug(f'Conflicting zebra crossing with lanelet ID {lanelet.id} has been found. Setting'
+                     f' reservation for behavior space {behavior_space} for both behaviors to externally')
+        behavior_space.alongBehavior.reservation[0].attributes.reservation = tp.ReservationType.EXTERNALLY
+        behavior_space.againstBehavior.reservation[0].attributes.reservation = tp.ReservationType.EXTERNALLY
+        behavior_space.alongBehavior.reservation[0].attributes.pedestrian = True
+        behavior_space.againstBehavior.reservation[0].attributes.pedestrian = True
+
+        # Set reservation links for every relevant lanelet crossing the zebra crossing and the walkway areas next to it
+        logger.debug(f'Setting reservation links for lanelets and areas of zebra crossing {lanelet.id}.')
+        for link_lanelet in crossing.road_lanelets:
+            # Avoid setting a reservation link to the lanelet that the behavior space is referencing. Like with the
+            # RoutingGraph, the inverted direction of a bidirectional lanelet is a different lanelet and is linked.
+            if link_lanelet != behavior_space.ref_lanelet:
+                behavior_space.alongBehavior.reservation[0].attributes.add_link(link_lanelet.id)
+                behavior_space.againstBehavior.reservation[0].attributes.add_link(link_lanelet.id)
+            for id_area in crossing.walkway_areas[link_lanelet.id]:
+                behavior_space.alongBehavior.reservation[0].attributes.add_link(id_area)
+                behavior_space.againstBehavior.reservation[0].attributes.add_link(id_area)
+
+        # As a third option for reservation links, lanelets that model the walkway space next to the roadway
+        for link_lanelet in crossing.walkway_lanelets:
+            behavior_space.alongBehavior.reservation[0].attributes.add_link(link_lanelet.id)
+            behavior_space.againstBehavior.reservation[0].attributes.add_link(link_lanelet.id)
 
     def find_neighbor_areas(self, linestring, subtype=None):
         """
-        Searches in the areaLayer of the lanelet map for usages of the given linestring. A subtype can be specified to
-        only find areas of this subtype. E.g. 'parking' or 'keepout'.
+        Searches in the usage index of the lanelet map for areas that use the given linestring. A subtype can be
+        specified to only find areas of this subtype. E.g. 'parking' or 'keepout'.
 
         Parameters:
             linestring (Linestring2d | Linestring3d):Linestring that is used to search for neighboring areas.
@@ -919,13 +937,6 @@ class DataHandler:
             neighbor_areas (set):Set of area elements that were found.
         """
 
-        # Search for areas in which the linestring is used as part of the boundary. To make sure every area will be
-        # found, include a search for the inverted linestring.
-        neighbor_areas = set.union(set(self.map_lanelet.areaLayer.findUsages(linestring)),
-                                   set(self.map_lanelet.areaLayer.findUsages(linestring.invert())))
-
-        # If a subtype-string was given, filter the set and only keep the areas of the specified subtype
-        if subtype:
-            neighbor_areas = {area for area in neighbor_areas if area.attributes['subtype'] == subtype}
-
-        return neighbor_areas
+        # Search for areas in which the linestring is used as part of the boundary. The index contains the areas that
+        # use the linestring in any direction grouped by their subtype, so that areas of a subtype are a single lookup.
+        return set(self.usages.areas_using(linestring, subtype))
@@ -1,15 +1,17 @@
 import logging
 import math
 
-from lanelet2.geometry import distance as dist
-from lanelet2.core import Point2d, Point3d, BoundingBox2d, BasicPoint2d
+import numpy as np
+
+from lanelet2.core import BoundingBox2d, BasicPoint2d
+
+from .util import coordinates, distance
 
-from .constants import LONG_BDR_TAGS
 
 logger = logging.getLogger('framework.geometry_derivation')
 
 
-def find_line_insufficient(ls_list, point_matching, point_free):
+def find_line_insufficient(boundary_index, point_matching, point_free):
     """
     Find the points for a new longitudinal boundary in case there is an existing linestring that doesn't contain
     BOTH of the given endpoints of the lanelets lateral boundaries. Instead, the linestring contains only one of the
@@ -19,9 +21,9 @@ def find_line_insufficient(ls_list, point_matching, point_free):
     each side of each lanelet.
 
     Parameters:
-        ls_list (list | set):List of linestrings that contain either the startpoint of the left or right lateral boundary
-        point_matching (Point2d | Point3d):A point that is part of the linestring in ls_list and of a lateral bdr.
-        point_free (Point2d | Point3d):The startpoint of the other lateral boundary that is not part of a ls in ls_list
+        boundary_index (BoundaryIndex):Index of the linestrings that are potential longitudinal boundaries.
+        point_matching (Point2d | Point3d):A point that is part of a candidate linestring and of a lateral bdr.
+        point_free (Point2d | Point3d):The startpoint of the other lateral boundary that is not part of the linestring
 
     Returns:
         lines (list):Pair of ID of found reference linestring and a list of points for the new linestring that is
@@ -29,42 +31,47 @@ def find_line_insufficient(ls_list, point_matching, point_free):
     """
 
     # Todo: Find better function name
-    # Check all linestring of this list whether their linestring type is in the list of potential long bdr types
-    for line in ls_list:
-        if 'type' in line.attributes and line.attributes['type'] in LONG_BDR_TAGS:
-
-            # extract all points of the current linestring and store them in a list, this enables easier access
-            pt_list = [el for el in line]
-
-            # Next, it needs to be determined which end of the linestring lies between the lateral boundaries of the
-            # lanelet. Furthermore, the condition that this point is closer to the free point than to the matching
-            # point needs to be met. This avoids that linestrings that barely reach into the lanelet are used for
-            # determining longitudinal boundaries.
-            # 1. case: The last point lies in the lanelet
-            if dist(line[-1], point_free) < dist(line[-1], point_matching):
-                # linestring can be used for deriving points for new linestring that will serve as long boundary
-
-                # select the points of the linestring from the point that coincides with the lateral boundary until
-                # the endpoint that lies inbetween the lateral boundaries of the lanelet
-                pts_for_ls = pt_list[pt_list.index(point_matching):]
-                pts_for_ls.append(point_free)
-                logger.debug(f'Found partially fitting line with ID {line.id}')
-
-                # return a list with the id of the reference linestring and the points for creating the new linestring
-                return [line.id, pts_for_ls]
-
-            # 2. case: The first point lies in the lanelet
-            elif dist(line[0], point_free) < dist(line[0], point_matching):
-                # linestring can be used for deriving points for new linestring that will serve as long boundary
-
-                # select the points of the linestring from the point that coincides with the lateral boundary until
-                # the endpoint that lies inbetween the lateral boundaries of the lanelet
-                pts_for_ls = pt_list[:pt_list.index(point_matching) + 1]
-                pts_for_ls.insert(0, point_free)
-                logger.debug(f'Found partially fitting line with ID {line.id}')
-
-                # return a list with the id of the reference linestring and the points for creating the new linestring
-                return [line.id, pts_for_ls]
+    # Check all candidate linestrings that contain the matching point. Linestrings that contain the free point as well
+    # are covered by find_flush_bdr.
+    positions_free = boundary_index.containing(point_free)
+    coordinates_free, coordinates_matching = coordinates(point_free), coordinates(point_matching)
+    for id_line, idx_matching in boundary_index.containing(point_matching).items():
+        if id_line in positions_free:
+            continue
+
+        # points of the current linestring, which are stored as tuple in the index
+        pt_list = boundary_index.points[id_line]
+
+        # Next, it needs to be determined which end of the linestring lies between the lateral boundaries of the
+        # lanelet. Furthermore, the condition that this point is closer to the free point than to the matching
+        # point needs to be met. This avoids that linestrings that barely reach into the lanelet are used for
+        # determining longitudinal boundaries.
+        # 1. case: The last point lies in the lanelet
+        coordinates_first, coordinates_last = coordinates(pt_list[0]), coordinates(pt_list[-1])
+        if distance(coordinates_last, coordinates_free) < distance(coordinates_last, coordinates_matching):
+            # linestring can be used for deriving points for new linestring that will serve as long boundary
+
+            # select the points of the linestring from the point that coincides with the lateral boundary until
+            # the endpoint that lies inbetween the lateral boundaries of the lanelet
+            pts_for_ls = list(pt_list[idx_matching:])
+            pts_for_ls.append(point_free)
+            logger.debug(f'Found partially fitting line with ID {id_line}')
+
+            # return a list with the id of the reference linestring and the points for creating the new linestring
+            return [id_line, pts_for_ls]
+
+        # 2. case: The first point lies in the lanelet
+        elif distance(coordinates_first, coordinates_free) < distance(coordinates_first, coordinates_matching):
+            # linestring can be used for deriving points for new linestring that will serve as long boundary
+
+            # select the points of the linestring from the point that coincides with the lateral boundary until
+            # the endpoint that lies inbetween the lateral boundaries of the lanelet
+            pts_for_ls = list(pt_list[:idx_matching + 1])
+            pts_for_ls.insert(0, point_free)
+            logger.debug(f'Found partially fitting line with ID {id_line}')
+
+            # return a list with the id of the reference linestring and the points for creating the new linestring
+            return [id_line, pts_for_ls]
 
     # In case the conditions haven't been met, return a list with two empty entries
     return [None, None]
@@ -82,26 +89,59 @@ def make_orthogonal_bounding_box(pt_left, pt_right):
     Returns:
         bounding_box (BoundingBox2d):Bounding box that can be used to search linestrings and points.
     """
+    min_x, min_y, max_x, max_y = orthogonal_box((pt_left.x, pt_left.y), (pt_right.x, pt_right.y))
+    return BoundingBox2d(BasicPoint2d(min_x, min_y), BasicPoint2d(max_x, max_y))
 
-    # create orthogonal vector based on the vector between the two points
-    v_orth = [pt_right.y - pt_left.y, -(pt_right.x - pt_left.x)]
-    # calculate length of vector v/v_orth
-    length_v = math.sqrt(v_orth[0] * v_orth[0] + v_orth[1] * v_orth[1])
-    # normalize vector v_orth
-    v_orth = [el / length_v for el in v_orth]
+
+def orthogonal_box(coordinates_left, coordinates_right):
+    """
+    Scalar version of make_orthogonal_bounding_box that works on tuples of coordinates.
+
+    Parameters:
+        coordinates_left (tuple):x- and y-coordinate of the point of the left lateral boundary.
+        coordinates_right (tuple):x- and y-coordinate of the point of the right lateral boundary.
+
+    Returns:
+        bounding_box (tuple):min x, min y, max x and max y of the bounding box.
+    """
+    (x_left, y_left), (x_right, y_right) = coordinates_left[:2], coordinates_right[:2]
+
+    # create orthogonal vector based on the vector between the two points and normalize it
+    x_orth, y_orth = y_right - y_left, -(x_right - x_left)
+    length_v = math.sqrt(x_orth * x_orth + y_orth * y_orth)
+    x_orth, y_orth = x_orth / length_v, y_orth / length_v
 
     # add orthogonal vector to coordinates of left point and substract from coordinates of the right point
-    # from new coordinates: find min and max x and y values and initalize new points
-    min_pt = BasicPoint2d(min(pt_left.x + v_orth[0], pt_right.x - v_orth[0]),
-                          min(pt_left.y + v_orth[1], pt_right.y - v_orth[1]))
-    max_pt = BasicPoint2d(max(pt_left.x + v_orth[0], pt_right.x - v_orth[0]),
-                          max(pt_left.y + v_orth[1], pt_right.y - v_orth[1]))
+    # from new coordinates: find min and max x and y values
+    return (min(x_left + x_orth, x_right - x_orth), min(y_left + y_orth, y_right - y_orth),
+            max(x_left + x_orth, x_right - x_orth), max(y_left + y_orth, y_right - y_orth))
 
-    # from previously created points initalize BoundingBox2d and return it
-    return BoundingBox2d(min_pt, max_pt)
 
+def make_orthogonal_bounding_boxes(points_left, points_right):
+    """
+    Vectorized version of make_orthogonal_bounding_box that creates the bounding boxes for many pairs of
+    start-/endpoints of lanelets at once.
+
+    Parameters:
+        points_left (ndarray):x- and y-coordinates of the points of the left lateral boundaries (shape (n, 2)).
+        points_right (ndarray):x- and y-coordinates of the points of the right lateral boundaries (shape (n, 2)).
 
-def find_flush_bdr(pt_left, pt_right, list_mutual):
+    Returns:
+        bounding_boxes (ndarray):min x, min y, max x and max y of every bounding box (shape (n, 4)).
+    """
+
+    # create orthogonal vectors based on the vectors between the points and normalize them
+    v_orth = np.stack([points_right[:, 1] - points_left[:, 1], -(points_right[:, 0] - points_left[:, 0])], axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        v_orth = v_orth / np.sqrt(v_orth[:, 0] * v_orth[:, 0] + v_orth[:, 1] * v_orth[:, 1])[:, np.newaxis]
+
+    # add orthogonal vectors to the left points and substract them from the right points
+    corner_left = points_left + v_orth
+    corner_right = points_right - v_orth
+    return np.concatenate([np.minimum(corner_left, corner_right), np.maximum(corner_left, corner_right)], axis=1)
+
+
+def find_flush_bdr(pt_left, pt_right, list_exact, boundary_index):
     """
     This function checks linestrings that contain the startpoint of the left and right lateral boundary linestrings
     of a lanelet for usability as longitudinal boundary. Two cases are possible: The linestring fits exact or
@@ -111,7 +151,8 @@ def find_flush_bdr(pt_left, pt_right, list_mutual):
     Parameters:
         pt_left (Point2d or Point3d): Startpoint of the left lateral boundary of a lanelet
         pt_right (Point2d or Point3d): Startpoint of the right lateral boundary of a lanelet
-        list_mutual (list | set): List of linestrings that contain pt_left and pt_right
+        list_exact (list): List of linestrings whose endpoints are pt_left and pt_right (see UsageIndex)
+        boundary_index (BoundaryIndex): Index of the linestrings that are potential longitudinal boundaries
 
     Returns:
         lines_local (dictionary):Pair of ID of found reference linestring and a list of points for the new linestring
@@ -122,33 +163,32 @@ def find_flush_bdr(pt_left, pt_right, list_mutual):
     lines_local = {'exact': [None],
                    'protruding': [None, None]}
 
-    # loop throught the linestrings of the list
-    for line in list_mutual:
-
-        # if left and right point are the endpoints of the current linestring, this linestring fits exactly as the
-        # longitudinal boundary
-        if points_are_endpoints(line, pt_left, pt_right):
-            lines_local['exact'] = [line.id]
-            logger.debug(f'Found exactly fitting line with ID {line.id}')
-
-        # If points are not the endpoints, the linestring exceeds the width of the lanelet
-        # Check, if this linestring type is among the types that are considered to be potential longitudinal boundaries
-        elif line.attributes['type'] in LONG_BDR_TAGS:
-
-            # extract the points of the linestring that are covering the width of the lanelet
-
-            # first, create list of points from current linestring
-            pt_list = [pt for pt in line]
-
-            # find indexes of left and right point
-            idx_l = pt_list.index(pt_left)
-            idx_r = pt_list.index(pt_right)
-            min_idx = min(idx_l, idx_r)
-            max_idx = max(idx_l, idx_r)
-
-            # extract the points and save them in lines_local
-            lines_local['protruding'] = [line.id, pt_list[min_idx:max_idx + 1]]
-            logger.debug(f'Found protrudingly fitting line with ID {line.id}')
+    # if left and right point are the endpoints of a linestring, this linestring fits exactly as the
+    # longitudinal boundary
+    for line in list_exact:
+        lines_local['exact'] = [line.id]
+        logger.debug(f'Found exactly fitting line with ID {line.id}')
+
+    # If points are not the endpoints, the linestring exceeds the width of the lanelet. Only the linestrings of the
+    # types that are considered to be potential longitudinal boundaries are checked.
+    positions_right = boundary_index.containing(pt_right)
+    for id_line, idx_l in boundary_index.containing(pt_left).items():
+        if id_line not in positions_right:
+            continue
+
+        # find indexes of left and right point
+        idx_r = positions_right[id_line]
+        min_idx = min(idx_l, idx_r)
+        max_idx = max(idx_l, idx_r)
+        pt_list = boundary_index.points[id_line]
+
+        # skip linestrings that fit exactly, they have been found already
+        if min_idx == 0 and max_idx == len(pt_list) - 1:
+            continue
+
+        # extract the points that are covering the width of the lanelet and save them in lines_local
+        lines_local['protruding'] = [id_line, list(pt_list[min_idx:max_idx + 1])]
+        logger.debug(f'Found protrudingly fitting line with ID {id_line}')
 
     # return the dictionary that contains the found points/linestrings. If no linestring met the conditions,
     # the dictionary will contain empty lists
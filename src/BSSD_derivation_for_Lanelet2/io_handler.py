@@ -1,15 +1,34 @@
 import os
+import re
+import heapq
+import shutil
 import logging
 import tempfile as tf
 
 import osmium
 import lanelet2
+from lanelet2.core import ConstPoint2d, ConstPoint3d, ConstLineString2d, ConstLineString3d, ConstPolygon2d, \
+    ConstPolygon3d, registerId
 from lanelet2.projection import UtmProjector
+from osmium.osm import mutable
 
-from .util import make_positive
+from .osm_filter import filter_map
+from .osm_writer import CopyHandler, create_writer, create_patch_writer, format_number
+from .util import split_map_path, open_map_file, is_compressed
 
 logger = logging.getLogger('framework.io_handler')
 
+# Maximum number of bytes at the beginning of a map file that are scanned to detect origin coordinates
+AUTODETECT_PREFIX_SIZE = 1 << 20
+AUTODETECT_CHUNK_SIZE = 1 << 16
+# Number of bytes that are copied at once when a compressed map file is decompressed
+DECOMPRESS_CHUNK_SIZE = 1 << 20
+
+# Patterns to find the first element with coordinates in OSM-XML. Both ' and " can be used for attributes in OSM.
+COORDINATE_ELEMENT_PATTERN = re.compile(rb'<(?:bounds|node)\b[^>]*>')
+LAT_PATTERN = re.compile(rb'\b(?:min)?lat\s*=\s*(["\'])([^"\']*)\1')
+LON_PATTERN = re.compile(rb'\b(?:min)?lon\s*=\s*(["\'])([^"\']*)\1')
+
 
 class IoHandler:
     """
@@ -20,30 +39,36 @@ class IoHandler:
     ----------
         input_path : path
             Path of the input file
+        output_path : path
+            Path of the output file, which is the input path extended by _BSSD. The file format is kept.
+        original_ids : dict
+            For each OSM element type ('n', 'w', 'r') the original IDs of elements whose ID was changed during loading.
+        prefilter : bool
+            True, if elements that are not used by Lanelet2 are removed before the map is loaded.
         origin_coordinates : list
             origin coordinates that are used by the Lanelet2 projector for lat/long - metric conversions as origin
         projector : UtmProjector
-            Storing Reservation elements as values using their ID as the key.
-        _tmp_directory : path
-            Temporarily created directory to store separate files for Lanelet2 and BSSD objects to eventually merge them.
-        _tmp_lanelet_file : path
-            Temporary file path for a file that stores all the Lanelet2 objects after the framework was running.
-        _tmp_bssd_file : path
-            Temporary file path for a file that stores all the BSSD objects after the framework was running.
+            Projector of Lanelet2 that is used for lat/long - metric conversions.
 
     Methods
     -------
-        __init__():
-            Initiates the dictionaries for each layer.
-        add(BssdElement):
-            adds an element to its respective layer and returning the element for further usage
-        create_placeholder(lanelet=None, bdr_alg=None, bdr_agst=None):
-            Creates a placeholder BehaviorSpace and gives the opportunity to add longitudinal boundaries as well as lanelets.
-        create_behavior(leftBdr, rightBdr, longBdr):
-            Creates a placeholder Behavior and aggregates the lateral boundaries and the longitudinal boundary.
-    """
-    def __init__(self, path, origin_coordinates=None):
+        __init__(path, origin_coordinates=None, prefilter=False):
+            Stores the paths and sets up the projector. If no origin coordinates are given, they are detected.
+        load_map():
+            Loads the Lanelet2 map (optionally pre-filtered) with positive IDs.
+        autodetect_coordinates():
+            Detects origin coordinates from the first coordinates in the map file.
+        write_map(map_lanelet, map_bssd, file_path=None):
+            Writes Lanelet2 and BSSD objects in a single pass to the output file.
+        patch_map(new_linestrings, map_bssd, file_path=None):
+            Copies the input file unchanged and only appends new linestrings and BSSD objects.
+    """
+    def __init__(self, path, origin_coordinates=None, prefilter=False):
         self.input_path = path
+        self.prefilter = prefilter
+        stem, extension = split_map_path(path)
+        self.output_path = stem + '_BSSD' + extension
+        self.original_ids = {'n': {}, 'w': {}, 'r': {}}
         if origin_coordinates:
             self.origin_coordinates = origin_coordinates
             logger.debug(f'Using given coordinates {self.origin_coordinates} for origin of the projection.')
@@ -52,148 +77,340 @@ class IoHandler:
             logger.debug(f'Automatically detected coordinates {self.origin_coordinates} for origin of the projection.')
         self.projector = UtmProjector(lanelet2.io.Origin(self.origin_coordinates[0], self.origin_coordinates[1]))
 
-        self._tmp_directory = tf.TemporaryDirectory()
-        self._tmp_lanelet_file = os.path.join(self._tmp_directory.name, "ll2.osm")
-        self._tmp_bssd_file = os.path.join(self._tmp_directory.name, "bssd.osm")
-
     def load_map(self):
         """Load a Lanelet2-map from a given file and create a map for storing its data in a map class.
-        First, check every item of each layer for being negative and assign a positive ID if necessary."""
-        map_lanelet = lanelet2.io.load(self.input_path, self.projector)
-
-        make_positive(map_lanelet.pointLayer)
-        make_positive(map_lanelet.lineStringLayer)
-        make_positive(map_lanelet.polygonLayer)
-        make_positive(map_lanelet.laneletLayer)
-        make_positive(map_lanelet.areaLayer)
-        make_positive(map_lanelet.regulatoryElementLayer)
+        Since Lanelet2 can only read uncompressed OSM-XML files, PBF files are converted to a temporary OSM-XML file by
+        osmium and compressed files are decompressed as a stream into a temporary file.
+        If the pre-filter is activated, the map is streamed through osmium to remove every element that is not used by
+        Lanelet2 and to rewrite negative IDs before the map is loaded. Lanelet2 can't change the IDs of loaded elements,
+        thus maps with negative IDs are always loaded through this stream (without removing elements). The original
+        IDs of rewritten elements are saved to be able to refer to the elements of the original file. OSM-XML files
+        keep the original strings of their coordinates in this stream."""
+        with tf.TemporaryDirectory() as tmp_directory:
+            path = self.input_path
+            if is_compressed(path):
+                path = os.path.join(tmp_directory, 'input.osm')
+                decompress_map(self.input_path, path)
+
+            tmp_file = os.path.join(tmp_directory, 'map.osm')
+            max_id = 0
+            if self.prefilter:
+                self.original_ids, max_id = filter_map(path, tmp_file)
+                path = tmp_file
+            elif is_pbf(path):
+                convert_map(path, tmp_file)
+                path = tmp_file
+            map_lanelet = lanelet2.io.load(path, self.projector)
+
+            if not self.prefilter and has_negative_ids(map_lanelet):
+                logger.debug(f'Map contains negative IDs, reloading the map with positive IDs')
+                tmp_file_positive = os.path.join(tmp_directory, 'map_positive.osm')
+                self.original_ids, max_id = filter_map(path, tmp_file_positive, strip=False)
+                map_lanelet = lanelet2.io.load(tmp_file_positive, self.projector)
+
+        # Lanelet2 only continues the IDs after the largest ID it has loaded. Elements that have been removed by the
+        # pre-filter are still part of the input file, so new elements must not reuse their IDs when it is patched.
+        if max_id:
+            registerId(max_id)
 
         return map_lanelet
 
     def autodetect_coordinates(self):
-        """Automatically detect coordinates of a given lanelet2 map that can be used for coordinate projection."""
-        coordinates = []
-        # open input file
-        with open(self.input_path) as map_file:
-
-            # run for-loop for every line in the OSM-file
-            for line in map_file.readlines():
-
-                # search for both lat and lon in one line. Because both ' and " can be used in OSM take account for that
-                # If found extract the respective lat and lon coordinates and store them in a list
-                if 'lat=\'' in line and 'lon=\'' in line:
-                    coordinates.append(float(line.split("lat=\'", 1)[1].split('\'', 1)[0]))
-                    coordinates.append(float(line.split("lon=\'", 1)[1].split('\'', 1)[0]))
-                    break
-                elif 'lat=\"' in line and 'lon=\"' in line:
-                    coordinates.append(float(line.split("lat=\"", 1)[1].split('\"', 1)[0]))
-                    coordinates.append(float(line.split("lon=\"", 1)[1].split('\"', 1)[0]))
-                    break
+        """
+        Automatically detect coordinates of a given lanelet2 map that can be used for coordinate projection. For
+        OSM-XML files (also compressed ones), the beginning of the file is scanned as a stream for the first element
+        with coordinates, which is either the bounds element or the first node. PBF files are read with osmium.
+        In both cases, only a small prefix of the file is read.
+        """
+        if is_pbf(self.input_path):
+            coordinates = detect_coordinates_pbf(self.input_path)
+        else:
+            coordinates = detect_coordinates_xml(self.input_path)
+
+        if not coordinates:
+            raise ValueError(f'No coordinates found in {self.input_path}. '
+                             f'Please specify the origin coordinates for the projection.')
+
         # store the coordinates in the IoHandler class attributes
         self.origin_coordinates = coordinates
 
-    def save_map(self, map_ll, file_path=None):
+    def write_map(self, map_lanelet, map_bssd, file_path=None):
         """
-        Save the Lanelet2 objects of a map using the Lanelet2 writing function. Map is saved in a temporary file.
-        Optionally, it is possible to give a file path to not store the map temporarly but make it permanently available.
-        Furthermore, this function includes a call to the reverse changes function to remove non-original attributes
-        from lanelet elements.
+        Save the Lanelet2 objects and the BSSD objects of a map in a single pass to the output file. Every element is
+        streamed through one writer directly into the output file, so no intermediate files are created and the
+        serialized map is never held in memory. Depending on the file extension, OSM-XML or PBF is written. Optionally,
+        it is possible to give a file path to which the map is written instead of the output path that is derived from
+        the input path.
 
         Parameters:
-            map_ll (laneletMap):Lanelet map object that contains all the Lanelet2 objects of the map.
+            map_lanelet (laneletMap):Lanelet map object that contains all the Lanelet2 objects of the map.
+            map_bssd (BssdMap):BSSD map object that contains all the BSSD objects of the map.
             file_path (path):Optional file path to save the map to.
-
-        Returns:
-            logger (logging):logger object that contains the different handlers required in the framework.
-            log_file (path):Automatically created path the log file ('{map_name}+_BSSD.log').
         """
         if not file_path:
-            file_path = self._tmp_lanelet_file
-
-        # ---- Reverse Changes ----
-        # Comment this block to keep the lanelet attributes used in this framework in the map
-        map_ll = self.reverse_changes(map_ll)
-        # -------------------------
-
-        lanelet2.io.write(file_path, map_ll, self.projector)
-
-    def write_bssd_elements(self, bssd_map, file_path=None):
+            file_path = self.output_path
+
+        with create_writer(file_path) as writer:
+            # OSM requires the order nodes - ways - relations. The BSSD elements are relations and therefore
+            # written after the relations of Lanelet2.
+            for node in iter_nodes(map_lanelet, self.projector):
+                writer.add_node(node)
+            for way in iter_ways(map_lanelet):
+                writer.add_way(way)
+            for relation in iter_relations(map_lanelet):
+                writer.add_relation(relation)
+            for layer, layerdict in iter(map_bssd):
+                for id_obj, bssd_object in layerdict.items():
+                    writer.add_relation(bssd_object.attributes.get_osmium())
+
+        logger.info(f'Saved file as {file_path}')
+
+    def patch_map(self, new_linestrings, map_bssd, file_path=None):
         """
-        Save the BSSD objects of a map using a SimpleWrite of PyOsmium. Map is saved in a temporary file.
-        Optionally, it is possible to give a file path to not store the map temporarly but make it permanently available.
+        Save the map by copying the input file unchanged and injecting only the elements that have been created within
+        the framework, which are new linestrings and the BSSD objects. In contrast to write_map, the original
+        elements are not reprojected and rewritten, so that their coordinates stay bit-identical and the effort only
+        depends on the number of new elements. PBF files can't be copied byte by byte, instead osmium copies their
+        elements without changes. References to elements whose IDs have been made positive during
+        loading are mapped back to the original IDs. Optionally, it is possible to give a file path to which the map
+        is written instead of the output path that is derived from the input path.
 
         Parameters:
-            bssd_map (laneletMap):Lanelet map object that contains all the Lanelet2 objects of the map.
+            new_linestrings (list):Linestrings that have been created within the framework.
+            map_bssd (BssdMap):BSSD map object that contains all the BSSD objects of the map.
             file_path (path):Optional file path to save the map to.
-
-        Returns:
-            logger (logging):logger object that contains the different handlers required in the framework.
-            log_file (path):Automatically created path the log file ('{map_name}+_BSSD.log').
         """
         if not file_path:
-            file_path = self._tmp_bssd_file
+            file_path = self.output_path
 
-        writer_bssd = osmium.SimpleWriter(file_path)
+        with create_patch_writer(self.input_path, file_path) as writer:
+            for linestring in new_linestrings:
+                writer.add_way(mutable.Way(id=linestring.id, version=1, visible=True,
+                                           nodes=[self.get_original_id('n', point.id) for point in linestring],
+                                           tags=dict(sorted(linestring.attributes.items()))))
+            for layer, layerdict in iter(map_bssd):
+                for id_obj, bssd_object in layerdict.items():
+                    relation = bssd_object.attributes.get_osmium()
+                    writer.add_relation(mutable.Relation(base=relation, members=[
+                        (member_type, self.get_original_id(member_type, ref), role)
+                        for member_type, ref, role in relation.members]))
 
-        for layer, layerdict in iter(bssd_map):
-            for id_obj, bssd_object in layerdict.items():
-                writer_bssd.add_relation(bssd_object.attributes.get_osmium())
+        logger.info(f'Saved file as {file_path}')
 
-        writer_bssd.close()
+    def get_original_id(self, element_type, id_element):
+        """ Returns the ID an element has in the input file. element_type is the OSM type 'n', 'w' or 'r'.  """
+        return self.original_ids[element_type].get(id_element, id_element)
 
-    def merge_files(self, file='map.osm'):
-        """
-        Uses the temporary existing Lanelet2 and BSSD map files to read their contents and merge them in an OSM conform
-        way. The output file is store in the Output folder.
 
-        Parameters:
-            file (path):Filename of the original map file. Output filename is based on it and extended by _BSSD.
-        """
+def iter_nodes(map_lanelet, projector):
+    """
+    Yields every point of a Lanelet2 map as an osmium node in the same way the Lanelet2 writer serializes points. The
+    metric coordinates are projected back to lat/lon and the elevation is stored in the tag 'ele' if it isn't zero.
 
-        # path_output = 'Output/' + file[:-4] + '_BSSD.osm'
-        path_output = file[:-4] + '_BSSD.osm'
+    Parameters:
+        map_lanelet (laneletMap):Lanelet map object that contains all the Lanelet2 objects of the map.
+        projector (UtmProjector):Projector that is used for metric - lat/lon conversion.
 
-        # Reading data from Lanelet2 file except the last line
-        with open(self._tmp_lanelet_file) as fp:
-            map_data_lanelet2 = fp.readlines()[:-1]
+    Yields:
+        node (mutable.Node):Node with location and tags of a point.
+    """
+    for point in sorted_layer(map_lanelet.pointLayer):
+        gps_point = projector.reverse(point.basicPoint())
+        tags = dict(point.attributes.items())
+        if gps_point.ele != 0:
+            tags['ele'] = format_number(gps_point.ele)
+        yield mutable.Node(id=point.id, version=1, visible=True, location=(gps_point.lon, gps_point.lat),
+                           tags=dict(sorted(tags.items())))
 
-        # Reading data from BSSD file expect the first two lines
-        with open(self._tmp_bssd_file) as fp:
-            map_data_bssd = fp.readlines()[2:]
 
-        # Merging both files
-        map_combined = map_data_lanelet2 + map_data_bssd
+def iter_ways(map_lanelet):
+    """
+    Yields every linestring and polygon of a Lanelet2 map as an osmium way ordered by their ID. Polygons are marked
+    with the tag 'area'.
 
-        # Overwrite an existing file with the same name
-        if os.path.isfile(path_output):
-            os.remove(path_output)
-        with open(path_output, 'w') as fp:
-            fp.writelines(map_combined)
+    Parameters:
+        map_lanelet (laneletMap):Lanelet map object that contains all the Lanelet2 objects of the map.
 
-        logger.info(f'Saved file as {path_output}')
+    Yields:
+        way (mutable.Way):Way with node references and tags of a linestring or polygon.
+    """
+    linestrings = ((linestring.id, linestring, {}) for linestring in sorted_layer(map_lanelet.lineStringLayer))
+    polygons = ((polygon.id, polygon, {'area': 'true'}) for polygon in sorted_layer(map_lanelet.polygonLayer))
 
-    @staticmethod
-    def reverse_changes(map_lanelet):
-        """
-        Removes lanelet tags that have been set during the framework for storing data. To keep the original Lanelet2
-        elements as they were, this function deletes the attributes from the lanelets. At the moment data for bicycle
-        lanes and for speed limit are stored in the lanelet attributes.
+    for id_way, element, additional_tags in heapq.merge(linestrings, polygons, key=lambda item: item[0]):
+        tags = dict(element.attributes.items())
+        tags.update(additional_tags)
+        yield mutable.Way(id=id_way, version=1, visible=True, nodes=[point.id for point in element],
+                          tags=dict(sorted(tags.items())))
 
-        Parameters:
-            map_lanelet (laneletMap):Lanelet map object that contains all the Lanelet2 objects of the map.
-        """
-        # Run a for-loop for every lanelet in the map
-        for lanelet in map_lanelet.laneletLayer:
-
-            # Remove the affected attributes
-            del lanelet.attributes['relevant_bicycle_lane']
-            del lanelet.attributes['own_speed_limit']
-            del lanelet.attributes['other_speed_limit']
-            del lanelet.attributes['own_speed_limit_link']
-            del lanelet.attributes['other_speed_limit_link']
-            del lanelet.attributes['along_speed_limit']
-            del lanelet.attributes['against_speed_limit']
-
-        logger.debug(f'All lanelet tags that were added within this framework succesfully removed.')
-        return map_lanelet
 
+def iter_relations(map_lanelet):
+    """
+    Yields every lanelet, area and regulatory element of a Lanelet2 map as an osmium relation ordered by their ID.
+
+    Parameters:
+        map_lanelet (laneletMap):Lanelet map object that contains all the Lanelet2 objects of the map.
+
+    Yields:
+        relation (mutable.Relation):Relation with members and tags of a lanelet, area or regulatory element.
+    """
+    lanelets = ((lanelet.id, lanelet_members(lanelet), lanelet, 'lanelet')
+                for lanelet in sorted_layer(map_lanelet.laneletLayer))
+    areas = ((area.id, area_members(area), area, 'multipolygon')
+             for area in sorted_layer(map_lanelet.areaLayer))
+    regulatory_elements = ((regelem.id, regulatory_element_members(regelem), regelem, 'regulatory_element')
+                           for regelem in sorted_layer(map_lanelet.regulatoryElementLayer))
+
+    for id_relation, members, element, relation_type in \
+            heapq.merge(lanelets, areas, regulatory_elements, key=lambda item: item[0]):
+        tags = dict(element.attributes.items())
+        tags['type'] = relation_type
+        yield mutable.Relation(id=id_relation, version=1, visible=True, members=members,
+                               tags=dict(sorted(tags.items())))
+
+
+def lanelet_members(lanelet):
+    """ Returns the relation members of a lanelet: lateral boundaries, custom centerline and regulatory elements.  """
+    members = [('w', lanelet.leftBound.id, 'left'), ('w', lanelet.rightBound.id, 'right')]
+    # A centerline that is computed by Lanelet2 has the ID 0, only custom centerlines are part of the map
+    if lanelet.centerline.id != 0:
+        members.append(('w', lanelet.centerline.id, 'centerline'))
+    members += [('r', regelem.id, 'regulatory_element') for regelem in lanelet.regulatoryElements]
+    return members
+
+
+def area_members(area):
+    """ Returns the relation members of an area: outer and inner boundaries and regulatory elements.  """
+    members = [('w', linestring.id, 'outer') for linestring in area.outerBound]
+    members += [('w', linestring.id, 'inner') for inner_bound in area.innerBounds for linestring in inner_bound]
+    members += [('r', regelem.id, 'regulatory_element') for regelem in area.regulatoryElements]
+    return members
+
+
+def regulatory_element_members(regulatory_element):
+    """ Returns the relation members of a regulatory element ordered by their role.  """
+    members = []
+    for role, parameters in sorted(regulatory_element.parameters.items()):
+        for parameter in parameters:
+            if isinstance(parameter, (ConstPoint2d, ConstPoint3d)):
+                members.append(('n', parameter.id, role))
+            elif isinstance(parameter, (ConstLineString2d, ConstLineString3d, ConstPolygon2d, ConstPolygon3d)):
+                members.append(('w', parameter.id, role))
+            else:
+                members.append(('r', parameter.id, role))
+    return members
+
+
+def sorted_layer(layer):
+    """ Returns the elements of a Lanelet2 layer ordered by their ID.  """
+    return sorted(layer, key=lambda element: element.id)
+
+
+def convert_map(path, file_path):
+    """
+    Converts a map file into another format (e.g. PBF to OSM-XML) by streaming every element through osmium.
+
+    Parameters:
+        path (path):Path of the map file that is converted.
+        file_path (path):Path of the converted file, its extension determines the format.
+    """
+    with create_writer(file_path) as writer:
+        CopyHandler(writer).apply_file(path)
+
+
+def decompress_map(path, file_path):
+    """
+    Decompresses a map file that is compressed with gzip, bzip2 or xz as a stream into another file.
+
+    Parameters:
+        path (path):Path of the compressed map file.
+        file_path (path):Path of the decompressed file.
+    """
+    with open_map_file(path, 'rb') as compressed_file, open(file_path, 'wb') as file:
+        shutil.copyfileobj(compressed_file, file, DECOMPRESS_CHUNK_SIZE)
+
+
+def has_negative_ids(map_lanelet):
+    """ Returns True if any element of a Lanelet2 map has a negative ID.  """
+    return any(element.id < 0 for layer in [map_lanelet.pointLayer, map_lanelet.lineStringLayer,
+                                             map_lanelet.polygonLayer, map_lanelet.laneletLayer,
+                                             map_lanelet.areaLayer, map_lanelet.regulatoryElementLayer]
+               for element in layer)
+
+
+def is_pbf(path):
+    """ Returns True if the path refers to a file in the binary PBF format of OSM.  """
+    return path.lower().endswith('.pbf')
+
+
+def detect_coordinates_xml(path):
+    """
+    Scans the beginning of an OSM-XML file for the first bounds or node element and extracts its coordinates. The
+    file is read in chunks and the scan stops as soon as coordinates are found or the maximum prefix size is reached.
+
+    Parameters:
+        path (path):Path of the (optionally compressed) OSM-XML file.
+
+    Returns:
+        coordinates (list):Latitude and longitude of the first element with coordinates (empty if none was found).
+    """
+    prefix = b''
+    # Offset in the prefix after the last complete element, from which the search continues with the next chunk
+    position = 0
+    with open_map_file(path) as map_file:
+        while len(prefix) < AUTODETECT_PREFIX_SIZE:
+            chunk = map_file.read(AUTODETECT_CHUNK_SIZE)
+            if not chunk:
+                break
+            prefix += chunk
+
+            # Search every complete element that was read since the last search. For bounds, the minimal coordinates
+            # are used.
+            for element in COORDINATE_ELEMENT_PATTERN.finditer(prefix, position):
+                lat = LAT_PATTERN.search(element.group())
+                lon = LON_PATTERN.search(element.group())
+                if lat and lon:
+                    return [float(lat.group(2)), float(lon.group(2))]
+                position = element.end()
+
+    return []
+
+
+def detect_coordinates_pbf(path):
+    """
+    Reads the coordinates of the bounding box from the header of a PBF file. If the header doesn't contain a bounding
+    box, the location of the first node is used.
+
+    Parameters:
+        path (path):Path of the PBF file.
+
+    Returns:
+        coordinates (list):Latitude and longitude of the bounding box or first node (empty if none was found).
+    """
+    reader = osmium.io.Reader(path, osmium.osm.osm_entity_bits.NOTHING)
+    box = reader.header().box()
+    reader.close()
+    if box.valid():
+        return [box.bottom_left.lat, box.bottom_left.lon]
+
+    handler = FirstNodeHandler()
+    try:
+        handler.apply_file(path)
+    except FirstNodeHandler.NodeFound:
+        pass
+    return handler.coordinates
+
+
+class FirstNodeHandler(osmium.SimpleHandler):
+    """ Osmium handler that stores the coordinates of the first node and stops reading the file afterwards.  """
+
+    class NodeFound(Exception):
+        pass
+
+    def __init__(self):
+        super(FirstNodeHandler, self).__init__()
+        self.coordinates = []
+
+    def node(self, node):
+        self.coordinates = [node.location.lat, node.location.lon]
+        raise self.NodeFound
@@ -0,0 +1,63 @@
+from collections import defaultdict
+
+
+class LaneletData:
+    """
+    This class stores the data that is derived for a lanelet during the framework, but doesn't belong to the lanelet
+    itself. Storing this data in a separate table instead of the attributes of the lanelets keeps the Lanelet2 map
+    unchanged and avoids conversions from and to strings.
+
+    Besides, the classifications of a lanelet that are needed repeatedly during the framework are stored here, so that
+    they are computed only once per lanelet (see preprocessing.classify_lanelets).
+
+    Attributes
+    ----------
+        relevant : bool
+            True, if the lanelet is relevant for the behavior space derivation (see preprocessing).
+        can_pass_vehicle : bool
+            True, if the lanelet can be passed by vehicles according to the traffic rules of Lanelet2.
+        can_pass_pedestrian : bool
+            True, if the lanelet can be passed by pedestrians according to the traffic rules of Lanelet2.
+        can_pass_bicycle : bool
+            True, if the lanelet can be passed by bicycles according to the traffic rules of Lanelet2.
+        relevant_bicycle_lane : bool
+            True, if the lanelet is a bicycle lane that is considered relevant (see preprocessing).
+        segment : int
+            ID of the segment the lanelet belongs to (see segments.SegmentIndex, None if not assigned yet).
+        level : int
+            Lateral level of the lanelet within its segment, increasing to the left.
+        along_speed_limit : int
+            Speed limit along the reference direction of the lanelet (None if not derived yet).
+        along_speed_limit_link : int
+            ID of the regulatory element that indicates the speed limit along the reference direction.
+        against_speed_limit : int
+            Speed limit against the reference direction of the lanelet (None if not derived yet).
+        against_speed_limit_link : int
+            ID of the regulatory element that indicates the speed limit against the reference direction.
+    """
+    __slots__ = ('relevant', 'can_pass_vehicle', 'can_pass_pedestrian', 'can_pass_bicycle', 'relevant_bicycle_lane',
+                 'segment', 'level', 'along_speed_limit', 'along_speed_limit_link', 'against_speed_limit',
+                 'against_speed_limit_link')
+
+    def __init__(self):
+        self.relevant = False
+        self.can_pass_vehicle = False
+        self.can_pass_pedestrian = False
+        self.can_pass_bicycle = False
+        self.relevant_bicycle_lane = False
+        self.segment = None
+        self.level = None
+        self.along_speed_limit = None
+        self.along_speed_limit_link = None
+        self.against_speed_limit = None
+        self.against_speed_limit_link = None
+
+
+def create_lanelet_table():
+    """
+    Creates a table that contains the LaneletData for every lanelet ID. Data for a lanelet is created on first access.
+
+    Returns:
+        lanelet_table (defaultdict):LaneletData for every lanelet ID.
+    """
+    return defaultdict(LaneletData)
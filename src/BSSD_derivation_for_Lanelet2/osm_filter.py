@@ -0,0 +1,304 @@
+import logging
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import quoteattr
+
+import osmium
+from osmium.osm import mutable
+
+from .osm_writer import create_writer
+from .util import open_map_file
+
+logger = logging.getLogger('framework.osm_filter')
+
+# Types of relations that Lanelet2 loads as lanelets, areas and regulatory elements
+LANELET2_RELATION_TYPES = ['lanelet', 'multipolygon', 'regulatory_element']
+
+
+def filter_map(path, file_path, strip=True):
+    """
+    Streams a map file through osmium before it is loaded with Lanelet2. Optionally, every element that is not used by
+    Lanelet2 is removed, so that Lanelet2 only parses and projects the road content of the map. Kept are lanelets,
+    areas and regulatory elements (and every relation they reference), the ways and nodes they reference as well as
+    linestrings and points that are tagged with a type like standalone stop lines. Furthermore, negative IDs are
+    rewritten to a dense range of positive IDs above the largest ID of the map.
+    The file is read three times: Relations first, then ways and nodes to find the referenced elements and the largest
+    ID, and finally every kept element is written. Only the IDs of kept elements are held in memory. OSM-XML is
+    rewritten as XML (see rewrite_xml), so that the coordinates keep their original strings. Osmium would round them
+    to 7 decimals.
+
+    Parameters:
+        path (path):Path of the map file (OSM-XML or PBF).
+        file_path (path):Path of the filtered file, its extension determines the format.
+        strip (bool):True, if elements that are not used by Lanelet2 are removed. Otherwise, only IDs are rewritten.
+
+    Returns:
+        original_ids (dict):For each OSM element type ('n', 'w', 'r') the original ID for every rewritten ID.
+        max_id (int):Largest ID of the map including the rewritten IDs and the IDs of removed elements.
+    """
+    relations = RelationCollector(strip)
+    relations.apply_file(path)
+    ways, nodes = relations.find_kept_relations() if strip else (set(), set())
+    elements = ElementCollector(strip, ways, nodes)
+    elements.apply_file(path)
+    # The nodes of the kept ways are only complete after all ways have been read
+    if strip:
+        elements.negative_nodes = [id_node for id_node in elements.nodes if id_node < 0]
+
+    # Assign the new IDs in the order nodes - ways - relations, each starting with the negative ID closest to zero
+    id_mapping = {'n': {}, 'w': {}, 'r': {}}
+    next_id = max(relations.max_id, elements.max_id, 0) + 1
+    for element_type, negative_ids in [('n', elements.negative_nodes), ('w', elements.negative_ways),
+                                       ('r', relations.negative_ids)]:
+        for id_element in sorted(negative_ids, reverse=True):
+            id_mapping[element_type][id_element] = next_id
+            next_id += 1
+
+    if path.lower().endswith('.pbf') or file_path.lower().endswith('.pbf'):
+        with create_writer(file_path) as writer:
+            FilterHandler(writer, elements, relations, id_mapping).apply_file(path)
+    else:
+        rewrite_xml(path, file_path, elements, relations, id_mapping)
+
+    if strip:
+        logger.info(f'Pre-filter kept {len(elements.nodes)} nodes, {len(elements.ways)} ways and '
+                    f'{len(relations.kept)} relations')
+    if any(id_mapping.values()):
+        logger.info(f'Rewrote {sum(len(mapping) for mapping in id_mapping.values())} negative IDs')
+
+    return {element_type: {new_id: id_element for id_element, new_id in mapping.items()}
+            for element_type, mapping in id_mapping.items()}, next_id - 1
+
+
+def rewrite_xml(path, file_path, elements, relations, id_mapping):
+    """
+    Writes the kept elements of an OSM-XML file as a stream into another OSM-XML file and rewrites negative IDs and
+    every reference to them. In contrast to osmium, the attributes are copied as strings, so that coordinates keep
+    their full precision. Every element is removed from the parsed tree as soon as it has been written.
+
+    Parameters:
+        path (path):Path of the (optionally compressed) OSM-XML file.
+        file_path (path):Path of the filtered OSM-XML file.
+        elements (ElementCollector):Collector of the kept ways and nodes.
+        relations (RelationCollector):Collector of the kept relations.
+        id_mapping (dict):For each OSM element type ('n', 'w', 'r') the new ID for every negative ID.
+    """
+    keep = {'node': elements.keep_node, 'way': elements.keep_way, 'relation': relations.keep_relation}
+    depth = 0
+    root = None
+    with open_map_file(path) as map_file, open_map_file(file_path, 'wt') as file:
+        for event, element in ET.iterparse(map_file, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if depth == 1:
+                    root = element
+                    file.write('<?xml version="1.0" encoding="UTF-8"?>\n<osm')
+                    file.write(''.join(f' {key}={quoteattr(value)}' for key, value in element.items()) + '>\n')
+                continue
+
+            depth -= 1
+            if depth != 1:
+                continue
+            # Elements that aren't nodes, ways or relations (e.g. bounds) are copied unchanged
+            if element.tag not in keep or keep[element.tag](int(element.get('id'))):
+                if element.tag in keep:
+                    rewrite_ids(element, id_mapping)
+                element.tail = None
+                file.write('  ' + ET.tostring(element, encoding='unicode') + '\n')
+            root.clear()
+        file.write('</osm>\n')
+
+
+def rewrite_ids(element, id_mapping):
+    """ Replaces the negative ID of an OSM-XML element and the negative IDs it references by their new IDs.  """
+    element_type = element.tag[0]
+    id_element = int(element.get('id'))
+    if id_element < 0:
+        element.set('id', str(id_mapping[element_type].get(id_element, id_element)))
+    for reference in element:
+        # Nodes of ways are referenced by nd elements, members of relations by member elements with a type
+        if reference.tag in ('nd', 'member') and reference.get('ref', '').startswith('-'):
+            reference_type = reference.get('type', 'node')[0]
+            id_reference = int(reference.get('ref'))
+            reference.set('ref', str(id_mapping[reference_type].get(id_reference, id_reference)))
+
+
+class RelationCollector(osmium.SimpleHandler):
+    """
+    Osmium handler that collects the relations that are kept by the pre-filter. Starting from the relations of
+    Lanelet2, every relation that is referenced by a kept relation is kept as well.
+
+    Attributes
+    ----------
+        strip : bool
+            True, if relations that are not used by Lanelet2 are removed.
+        members : dict
+            Members (type and ID) of every relation, only stored to find the kept relations if elements are removed.
+        kept : set
+            IDs of the kept relations (only if elements are removed).
+        negative_ids : list
+            Negative IDs of the kept relations.
+        max_id : int
+            Largest ID of all relations.
+
+    Methods
+    -------
+        relation(relation):
+            Stores the members of a relation and whether it is a relation of Lanelet2.
+        find_kept_relations():
+            Adds every relation that is referenced by a kept relation and returns the referenced ways and nodes.
+        keep_relation(id_relation):
+            Returns True if a relation is kept.
+    """
+
+    def __init__(self, strip):
+        super(RelationCollector, self).__init__()
+        self.strip = strip
+        self.members = {}
+        self.kept = set()
+        self.negative_ids = []
+        self.max_id = 0
+
+    def relation(self, relation):
+        self.max_id = max(self.max_id, relation.id)
+        if not self.strip:
+            if relation.id < 0:
+                self.negative_ids.append(relation.id)
+            return
+
+        self.members[relation.id] = [(member.type, member.ref) for member in relation.members]
+        if relation.tags.get('type') in LANELET2_RELATION_TYPES:
+            self.kept.add(relation.id)
+
+    def find_kept_relations(self):
+        """
+        Adds every relation that is (directly or indirectly) referenced by a kept relation to the kept relations.
+
+        Returns:
+            references (tuple):IDs of the ways and nodes that are referenced by the kept relations.
+        """
+        ways, nodes = set(), set()
+        stack = list(self.kept)
+        while stack:
+            for member_type, ref in self.members.get(stack.pop(), []):
+                if member_type == 'w':
+                    ways.add(ref)
+                elif member_type == 'n':
+                    nodes.add(ref)
+                elif ref in self.members and ref not in self.kept:
+                    self.kept.add(ref)
+                    stack.append(ref)
+
+        self.negative_ids = [id_relation for id_relation in self.kept if id_relation < 0]
+        self.members.clear()
+        return ways, nodes
+
+    def keep_relation(self, id_relation):
+        """ Returns True if the relation with the given ID is kept.  """
+        return not self.strip or id_relation in self.kept
+
+
+class ElementCollector(osmium.SimpleHandler):
+    """
+    Osmium handler that collects the ways and nodes that are kept by the pre-filter. Ways are kept if they are
+    referenced by a kept relation or tagged with a type of Lanelet2. Nodes are kept if they are referenced by a kept
+    way or relation or tagged with a type. Since nodes precede ways in OSM files, the nodes of kept ways are only
+    known after the file has been read.
+
+    Attributes
+    ----------
+        strip : bool
+            True, if elements that are not used by Lanelet2 are removed.
+        ways : set
+            IDs of the kept ways.
+        nodes : set
+            IDs of the kept nodes.
+        negative_ways : list
+            Negative IDs of the kept ways.
+        negative_nodes : list
+            Negative IDs of the kept nodes.
+        max_id : int
+            Largest ID of all ways and nodes.
+
+    Methods
+    -------
+        node(node):
+            Keeps tagged nodes and updates the largest ID.
+        way(way):
+            Keeps ways and their nodes if they are used by Lanelet2 and updates the largest ID.
+        keep_node(id_node):
+            Returns True if a node is kept.
+        keep_way(id_way):
+            Returns True if a way is kept.
+    """
+
+    def __init__(self, strip, ways, nodes):
+        super(ElementCollector, self).__init__()
+        self.strip = strip
+        self.ways = ways
+        self.nodes = nodes
+        self.negative_ways = []
+        self.negative_nodes = []
+        self.max_id = 0
+
+    def node(self, node):
+        self.max_id = max(self.max_id, node.id)
+        if self.strip and 'type' in node.tags:
+            self.nodes.add(node.id)
+        if node.id < 0 and not self.strip:
+            self.negative_nodes.append(node.id)
+
+    def way(self, way):
+        self.max_id = max(self.max_id, way.id)
+        # Linestrings of Lanelet2 are tagged with a type, polygons with area=true
+        if not self.strip or way.id in self.ways or 'type' in way.tags or way.tags.get('area') == 'true':
+            if self.strip:
+                self.ways.add(way.id)
+                self.nodes.update(node.ref for node in way.nodes)
+            if way.id < 0:
+                self.negative_ways.append(way.id)
+
+    def keep_node(self, id_node):
+        """ Returns True if the node with the given ID is kept.  """
+        return not self.strip or id_node in self.nodes
+
+    def keep_way(self, id_way):
+        """ Returns True if the way with the given ID is kept.  """
+        return not self.strip or id_way in self.ways
+
+
+class FilterHandler(osmium.SimpleHandler):
+    """
+    Osmium handler that writes the kept elements of a file to a writer and rewrites negative IDs and every reference
+    to them. It is used for PBF files, whose coordinates are stored with the precision of osmium anyway.
+    """
+
+    def __init__(self, writer, elements, relations, id_mapping):
+        super(FilterHandler, self).__init__()
+        self.writer = writer
+        self.elements = elements
+        self.relations = relations
+        self.id_mapping = id_mapping
+
+    def node(self, node):
+        if self.elements.keep_node(node.id):
+            if node.id < 0:
+                node = mutable.Node(base=node, id=self.id_mapping['n'][node.id])
+            self.writer.add_node(node)
+
+    def way(self, way):
+        if self.elements.keep_way(way.id):
+            mapping_nodes = self.id_mapping['n']
+            if way.id < 0 or (mapping_nodes and any(node.ref < 0 for node in way.nodes)):
+                way = mutable.Way(base=way, id=self.id_mapping['w'].get(way.id, way.id),
+                                  nodes=[mapping_nodes.get(node.ref, node.ref) for node in way.nodes])
+            self.writer.add_way(way)
+
+    def relation(self, relation):
+        if self.relations.keep_relation(relation.id):
+            if relation.id < 0 or any(member.ref < 0 for member in relation.members):
+                relation = mutable.Relation(base=relation, id=self.id_mapping['r'].get(relation.id, relation.id),
+                                            members=[(member.type,
+                                                      self.id_mapping[member.type].get(member.ref, member.ref),
+                                                      member.role)
+                                                     for member in relation.members])
+            self.writer.add_relation(relation)
@@ -0,0 +1,415 @@
+import os
+import shutil
+import logging
+from xml.sax.saxutils import escape
+
+import osmium
+
+from .util import open_map_file
+
+logger = logging.getLogger('framework.osm_writer')
+
+# Characters that have to be escaped in XML attribute values in addition to &, < and >
+XML_ATTRIBUTE_ENTITIES = {'"': '&quot;', '\n': '&#10;', '\r': '&#13;', '\t': '&#9;'}
+
+# Identifier of the member types in OSM-XML based on the one-letter types used by osmium
+MEMBER_TYPES = {'n': 'node', 'w': 'way', 'r': 'relation'}
+
+# Size of the blocks in which an input file is copied
+CHUNK_SIZE = 1 << 20
+
+
+class OsmXmlWriter:
+    """
+    This class writes OSM elements to an OSM-XML file. Every element is serialized and written to the file as soon as it
+    is added. Thus, the memory usage of this writer doesn't depend on the size of the written map. Files with the
+    extension of a compression (.gz, .bz2, .xz) are compressed as a stream. The elements are
+    expected to be given in the order nodes - ways - relations, as required by the OSM-XML format. Elements can be
+    osmium objects (e.g. from osmium.osm.mutable) or any other objects that provide the same attributes.
+
+    Attributes
+    ----------
+        file_path : path
+            Path of the file that is written.
+        _file : file object
+            Opened text stream the elements are written to.
+
+    Methods
+    -------
+        __init__(file_path):
+            Opens the file and writes the header of the OSM-XML document.
+        add_node(node):
+            Writes a node with its location and tags.
+        add_way(way):
+            Writes a way with its node references and tags.
+        add_relation(relation):
+            Writes a relation with its members and tags.
+        close():
+            Writes the closing tag of the OSM-XML document and closes the file.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._file = open_map_file(file_path, 'wt')
+        self._file.write('<?xml version="1.0"?>\n'
+                         '<osm version="0.6" upload="false" generator="lanelet2-bssd-converter">\n')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_node(self, node):
+        self._file.write(serialize_node(node))
+
+    def add_way(self, way):
+        self._file.write(serialize_way(way))
+
+    def add_relation(self, relation):
+        self._file.write(serialize_relation(relation))
+
+    def close(self):
+        if not self._file.closed:
+            self._file.write('</osm>\n')
+            self._file.close()
+
+
+class OsmPatchWriter:
+    """
+    This class copies an OSM-XML file byte by byte to a new file and injects additional elements. New ways are inserted
+    in front of the first relation of the original file and new relations are inserted in front of its closing tag.
+    Thus, the original elements stay untouched and the effort for writing only depends on the number of new elements.
+    The input file is copied in chunks while the elements are added, so that neither the original file nor the new
+    elements are held in memory. Compressed files are decompressed and compressed as a stream.
+
+    Attributes
+    ----------
+        input_path : path
+            Path of the original OSM-XML file.
+        file_path : path
+            Path of the file that is written.
+        _input : file object
+            Opened binary stream of the original file.
+        _file : file object
+            Opened binary stream of the written file.
+        _buffer : bytes
+            Part of the original file that has been read but not yet been written.
+        _position : str
+            Position in the original file up to which it has been copied ('start', 'relations' or 'end').
+
+    Methods
+    -------
+        __init__(input_path, file_path):
+            Opens the original file and the file that is written.
+        add_way(way):
+            Copies the original file up to its relations (if not done yet) and writes the way.
+        add_relation(relation):
+            Copies the original file up to its closing tag (if not done yet) and writes the relation.
+        close():
+            Copies the remaining part of the original file and closes both files.
+    """
+
+    def __init__(self, input_path, file_path):
+        self.input_path = input_path
+        self.file_path = file_path
+        self._input = open_map_file(input_path, 'rb')
+        self._file = open_map_file(file_path, 'wb')
+        self._buffer = b''
+        self._position = 'start'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_way(self, way):
+        if self._position == 'end':
+            raise ValueError(f'Way {way.id} added after relations have been written to {self.file_path}')
+        if self._position == 'start':
+            # Ways have to be placed in front of the relations or, if the file contains none, in front of the end
+            self._copy_until((b'<relation', b'</osm>'))
+            self._position = 'relations'
+        self._file.write(serialize_way(way).encode('utf-8'))
+
+    def add_relation(self, relation):
+        if not self._position == 'end':
+            self._copy_until((b'</osm>',))
+            self._position = 'end'
+        self._file.write(serialize_relation(relation).encode('utf-8'))
+
+    def close(self):
+        if not self._file.closed:
+            self._file.write(self._buffer)
+            shutil.copyfileobj(self._input, self._file, CHUNK_SIZE)
+            self._input.close()
+            self._file.close()
+
+    def _copy_until(self, tokens):
+        """
+        Copies the original file to the written file until the line that contains the first occurrence of one of the
+        given tokens. The line itself remains in the buffer, so that injected elements are placed in front of it.
+
+        Parameters:
+            tokens (tuple):Byte strings of which the first occurrence is searched.
+        """
+        while True:
+            positions = [position for position in (self._buffer.find(token) for token in tokens) if position >= 0]
+            if positions:
+                position = min(positions)
+                # Start at the beginning of the line to keep the indentation, unless other content precedes the token
+                line_start = self._buffer.rfind(b'\n', 0, position) + 1
+                if self._buffer[line_start:position].strip():
+                    line_start = position
+                self._file.write(self._buffer[:line_start])
+                self._buffer = self._buffer[line_start:]
+                return
+
+            # Write every complete line, since tokens can't span multiple lines. Files without line breaks are
+            # written except for the last bytes that may contain the beginning of a token.
+            split = self._buffer.rfind(b'\n') + 1
+            if len(self._buffer) - split > CHUNK_SIZE:
+                split = len(self._buffer) - max(len(token) for token in tokens) + 1
+            self._file.write(self._buffer[:split])
+            self._buffer = self._buffer[split:]
+
+            chunk = self._input.read(CHUNK_SIZE)
+            if not chunk:
+                raise ValueError(f'No closing tag found in {self.input_path}, file is not a valid OSM-XML file')
+            self._buffer += chunk
+
+
+class OsmPbfWriter:
+    """
+    This class writes OSM elements to a PBF file using the writer of osmium. Osmium encodes and compresses the blocks of
+    the PBF file in a pool of threads while further elements are added. Like for the OsmXmlWriter, the elements have
+    to be given in the order nodes - ways - relations.
+
+    Attributes
+    ----------
+        file_path : path
+            Path of the file that is written.
+        _writer : SimpleWriter
+            Osmium writer that writes the PBF file.
+
+    Methods
+    -------
+        __init__(file_path):
+            Creates the osmium writer for the file.
+        add_node(node):
+            Writes a node with its location and tags.
+        add_way(way):
+            Writes a way with its node references and tags.
+        add_relation(relation):
+            Writes a relation with its members and tags.
+        close():
+            Writes the remaining blocks and closes the file.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        # Osmium refuses to overwrite existing files, while the XML writers replace the output of previous runs
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        self._writer = osmium.SimpleWriter(file_path)
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_node(self, node):
+        self._writer.add_node(node)
+
+    def add_way(self, way):
+        self._writer.add_way(way)
+
+    def add_relation(self, relation):
+        self._writer.add_relation(relation)
+
+    def close(self):
+        if not self._closed:
+            self._writer.close()
+            self._closed = True
+
+
+class OsmPbfPatchWriter:
+    """
+    This class copies the elements of a PBF file to a new PBF file and injects additional elements, similar to the
+    OsmPatchWriter for OSM-XML files. Since PBF files consist of compressed blocks, the original elements are decoded
+    and encoded again by osmium without any changes. Because the original file can only be read in one pass, the new
+    elements are collected and written while the original file is copied when the writer is closed. New ways are
+    inserted in front of the first relation and new relations are appended at the end.
+
+    Attributes
+    ----------
+        input_path : path
+            Path of the original PBF file.
+        file_path : path
+            Path of the file that is written.
+        _ways : list
+            New ways that will be injected.
+        _relations : list
+            New relations that will be injected.
+
+    Methods
+    -------
+        __init__(input_path, file_path):
+            Stores the paths.
+        add_way(way):
+            Adds a way to the elements that are injected.
+        add_relation(relation):
+            Adds a relation to the elements that are injected.
+        close():
+            Copies the original file and injects the new elements.
+    """
+
+    def __init__(self, input_path, file_path):
+        self.input_path = input_path
+        self.file_path = file_path
+        self._ways = []
+        self._relations = []
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_way(self, way):
+        self._ways.append(way)
+
+    def add_relation(self, relation):
+        self._relations.append(relation)
+
+    def close(self):
+        if not self._closed:
+            with OsmPbfWriter(self.file_path) as writer:
+                handler = CopyHandler(writer, self._ways)
+                handler.apply_file(self.input_path)
+                handler.insert_ways()
+                for relation in self._relations:
+                    writer.add_relation(relation)
+            self._closed = True
+
+
+class CopyHandler(osmium.SimpleHandler):
+    """
+    Osmium handler that copies every element of a file to a writer. Optionally, ways can be given that are inserted in
+    front of the first relation.
+    """
+
+    def __init__(self, writer, ways_to_insert=None):
+        super(CopyHandler, self).__init__()
+        self.writer = writer
+        self.ways_to_insert = ways_to_insert or []
+
+    def node(self, node):
+        self.writer.add_node(node)
+
+    def way(self, way):
+        self.writer.add_way(way)
+
+    def relation(self, relation):
+        self.insert_ways()
+        self.writer.add_relation(relation)
+
+    def insert_ways(self):
+        for way in self.ways_to_insert:
+            self.writer.add_way(way)
+        self.ways_to_insert = []
+
+
+def create_writer(file_path):
+    """ Returns a PBF writer or an OSM-XML writer depending on the file extension.  """
+    if file_path.lower().endswith('.pbf'):
+        return OsmPbfWriter(file_path)
+    return OsmXmlWriter(file_path)
+
+
+def create_patch_writer(input_path, file_path):
+    """ Returns a patch writer for PBF files or for OSM-XML files depending on the file extension.  """
+    if file_path.lower().endswith('.pbf'):
+        return OsmPbfPatchWriter(input_path, file_path)
+    return OsmPatchWriter(input_path, file_path)
+
+
+def serialize_node(node):
+    """ Returns the OSM-XML representation of a node. The location is an osmium Location or a tuple (lon, lat).  """
+    if isinstance(node.location, osmium.osm.Location):
+        lon, lat = node.location.lon, node.location.lat
+    else:
+        lon, lat = node.location
+    return serialize_element('node', node, f' lat="{format_number(lat)}" lon="{format_number(lon)}"', [])
+
+
+def serialize_way(way):
+    """ Returns the OSM-XML representation of a way. Node references are IDs or osmium NodeRefs.  """
+    return serialize_element('way', way, '', [f'    <nd ref="{ref if isinstance(ref, int) else ref.ref}" />\n'
+                                              for ref in way.nodes])
+
+
+def serialize_relation(relation):
+    """ Returns the OSM-XML representation of a relation. Members are tuples or osmium RelationMembers.  """
+    members = (member if isinstance(member, tuple) else (member.type, member.ref, member.role)
+               for member in relation.members)
+    return serialize_element('relation', relation, '',
+                             [f'    <member type="{MEMBER_TYPES[member_type]}" ref="{ref}" role={quote(role)} />\n'
+                              for member_type, ref, role in members])
+
+
+def serialize_element(name, element, attributes, children):
+    """
+    Serializes a single OSM element. Elements without children and tags are written as empty XML elements.
+
+    Parameters:
+        name (str):Name of the XML element ('node', 'way' or 'relation').
+        element (OSMObject):Element that is serialized.
+        attributes (str):Additional XML attributes that are specific for the element type.
+        children (list):Lines with the serialized child elements (node references or members).
+
+    Returns:
+        text (str):OSM-XML representation of the element.
+    """
+    header = f'  <{name} id="{element.id}"'
+    if element.visible is not None:
+        header += f' visible="{"true" if element.visible else "false"}"'
+    if element.version is not None:
+        header += f' version="{element.version}"'
+    header += attributes
+
+    children += [f'    <tag k={quote(key)} v={quote(value)} />\n' for key, value in iter_tags(element.tags)]
+    if children:
+        return header + '>\n' + ''.join(children) + f'  </{name}>\n'
+    else:
+        return header + ' />\n'
+
+
+def iter_tags(tags):
+    """ Yields key-value-pairs for dictionaries as well as osmium TagLists.  """
+    if hasattr(tags, 'items'):
+        return iter(tags.items())
+    return ((tag.k, tag.v) for tag in tags)
+
+
+def quote(value):
+    """ Returns the escaped and quoted value of an XML attribute.  """
+    return '"' + escape(str(value), XML_ATTRIBUTE_ENTITIES) + '"'
+
+
+def format_number(value):
+    """
+    Formats a coordinate in the same way as Lanelet2 does: Fixed notation with 11 decimals and without trailing zeros.
+
+    Parameters:
+        value (float):Coordinate or elevation that is formatted.
+
+    Returns:
+        text (str):Formatted number.
+    """
+    text = f'{value:.11f}'.rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
@@ -0,0 +1,222 @@
+import logging
+import multiprocessing
+from collections import deque
+
+from lanelet2.core import LineString3d, getId, registerId
+
+from . import BSSD_elements
+from .topology import endpoint_key
+from .util import MsgCounterHandler
+
+logger = logging.getLogger('framework.parallel')
+
+# Every worker allocates IDs from its own block, so that IDs created in different workers never collide. These IDs
+# are only used temporarily, because the results are renumbered when they are merged.
+ID_BLOCK_BITS = 40
+
+# Data handler of the framework that is inherited by the forked worker processes
+_data_handler = None
+
+
+def derive_parallel(data_handler, jobs):
+    """
+    Derives the behavior spaces of all relevant lanelets in parallel worker processes. The relevant lanelets are split
+    into components that are connected via successor/predecessor relations. Each component is exactly the set of
+    lanelets that one call of DataHandler.loop processes, so that the components can be derived independently. The
+    workers are forked from this process and therefore share the loaded map and its topology without copying them.
+    Afterwards, the results are merged in the order in which the serial loop processes the components and all new
+    elements get their final IDs in the order of their creation. Thus, the result doesn't depend on the number of jobs
+    or on the scheduling of the workers.
+
+    Parameters:
+        data_handler (DataHandler):Data handler that contains the map, its topology and the relevant lanelets.
+        jobs (int):Number of worker processes.
+    """
+    global _data_handler
+
+    # Forking is required to share the map with the workers. Pool workers (e.g. in the batch mode) can't have children.
+    if 'fork' not in multiprocessing.get_all_start_methods() or multiprocessing.current_process().daemon:
+        logger.debug(f'Parallel derivation not possible in this process. Using serial derivation instead.')
+        data_handler.loop_all()
+        return
+
+    map_lanelet = data_handler.map_lanelet
+    components = find_components(data_handler.relevant_lanelets, map_lanelet, data_handler.graph)
+    groups = distribute_components(components, jobs)
+    logger.info(f'Deriving {len(components)} connected components in {len(groups)} worker processes')
+
+    # The ID blocks of the workers start above every ID that exists in the map
+    max_id = max(max((element.id for element in layer), default=0)
+                 for layer in [map_lanelet.pointLayer, map_lanelet.lineStringLayer, map_lanelet.polygonLayer,
+                               map_lanelet.laneletLayer, map_lanelet.areaLayer, map_lanelet.regulatoryElementLayer])
+    first_block = (max_id >> ID_BLOCK_BITS) + 1
+    tasks = [((first_block + index) << ID_BLOCK_BITS, [(i, components[i]) for i in group])
+             for index, group in enumerate(groups)]
+
+    _data_handler = data_handler
+    try:
+        # Every group gets a new process, because the ID counter of Lanelet2 can't be decreased
+        with multiprocessing.get_context('fork').Pool(len(tasks), maxtasksperchild=1) as pool:
+            results = [result for group_results in pool.map(derive_components, tasks, chunksize=1)
+                       for result in group_results]
+    finally:
+        _data_handler = None
+
+    # Merge the results in the order of the components to assign the final IDs deterministically. The final IDs are
+    # shared between the components, because a component can use a linestring of a previous component of its worker.
+    counter = find_message_counter()
+    new_ids = {}
+    for result in sorted(results, key=lambda item: item['component']):
+        merge_component(data_handler, result, new_ids)
+        if counter:
+            for level, count in result['messages'].items():
+                counter.levelcount[level] += count
+    data_handler.pending_lanelets.clear()
+
+
+def find_components(relevant_lanelets, map_lanelet, graph):
+    """
+    Splits the relevant lanelets into components that are connected via successor/predecessor relations. Every
+    component contains the lanelets that are reached by one call of DataHandler.loop.
+
+    Parameters:
+        relevant_lanelets (list):IDs of the relevant lanelets.
+        map_lanelet (LaneletMap):Lanelet2 map that contains the lanelets.
+        graph (TopologyIndex | RoutingGraph):Relations between every lanelet of the map.
+
+    Returns:
+        components (list):Lists of lanelet IDs. Components and their lanelets are ordered like the relevant lanelets.
+    """
+    position = {lanelet_id: index for index, lanelet_id in enumerate(relevant_lanelets)}
+    visited = set()
+    components = []
+
+    for lanelet_id in relevant_lanelets:
+        if lanelet_id in visited:
+            continue
+        visited.add(lanelet_id)
+        component = []
+        queue = deque([lanelet_id])
+        while queue:
+            current_id = queue.popleft()
+            component.append(current_id)
+            lanelet = map_lanelet.laneletLayer[current_id]
+            for neighbor in graph.following(lanelet) + graph.previous(lanelet):
+                if neighbor.id in position and neighbor.id not in visited:
+                    visited.add(neighbor.id)
+                    queue.append(neighbor.id)
+        components.append(sorted(component, key=position.get))
+
+    return components
+
+
+def distribute_components(components, jobs):
+    """
+    Distributes components to a number of groups with a similar number of lanelets. The largest components are
+    assigned first, each to the group with the fewest lanelets so far.
+
+    Parameters:
+        components (list):Lists of lanelet IDs.
+        jobs (int):Maximum number of groups.
+
+    Returns:
+        groups (list):For every group the indices of its components in ascending order.
+    """
+    groups = [[] for _ in range(max(1, min(jobs, len(components))))]
+    sizes = [0] * len(groups)
+    for index in sorted(range(len(components)), key=lambda i: (-len(components[i]), i)):
+        group = sizes.index(min(sizes))
+        groups[group].append(index)
+        sizes[group] += len(components[index])
+
+    return [sorted(group) for group in groups if group]
+
+
+def derive_components(task):
+    """
+    Derives the behavior spaces of a group of components in a worker process. Each component is processed with an
+    empty BSSD map so that its results can be returned separately. Since Lanelet2 objects can't be transferred
+    between processes, the BSSD elements are returned as their BSSD Core attributes and the new linestrings as IDs of
+    their points, their tags and the ID of their reference linestring. The longitudinal boundaries that have been
+    identified are kept for the following components of the worker, like in the serial loop.
+
+    Parameters:
+        task (tuple):First ID of the ID block of this worker and the components with their indices.
+
+    Returns:
+        results (list):For every component a dictionary with its index, elements, linestrings and message counts.
+    """
+    first_id, components = task
+    data_handler = _data_handler
+    registerId(first_id - 1)
+    counter = find_message_counter()
+
+    results = []
+    for index, component in components:
+        messages = dict(counter.levelcount) if counter else {}
+        data_handler.map_bssd = BSSD_elements.BssdMap()
+        data_handler.new_linestrings = []
+        data_handler.relevant_lanelets = component
+        data_handler.pending_lanelets = set(component)
+        data_handler.loop_all()
+
+        ref_lines = {linestring.id: ref_line for linestring, ref_line in data_handler.long_boundaries.values()
+                     if linestring is not None}
+        results.append({
+            'component': index,
+            'elements': [(type(element).__name__, element.attributes)
+                         for _, layer in data_handler.map_bssd for element in layer.values()],
+            'linestrings': [(linestring.id, [point.id for point in linestring], dict(linestring.attributes.items()),
+                             ref_lines[linestring.id]) for linestring in data_handler.new_linestrings],
+            'messages': {level: count - messages[level] for level, count in counter.levelcount.items()}
+            if counter else {}
+        })
+
+    return results
+
+
+def merge_component(data_handler, result, new_ids):
+    """
+    Merges the result of a component into the data handler. All elements that have been created in the worker get
+    new IDs in the order of their creation and every reference to them is updated. New linestrings are added to the
+    Lanelet2 map, its usage index and the identified longitudinal boundaries. If a component of another worker has
+    already identified the longitudinal boundary between the same points, the existing linestring is used instead,
+    like the serial loop does.
+
+    Parameters:
+        data_handler (DataHandler):Data handler of the framework.
+        result (dict):Result of a component as returned by derive_components.
+        new_ids (dict):Final ID for every ID of a worker, which is extended by the elements of this component.
+    """
+    point_layer = data_handler.map_lanelet.pointLayer
+    linestrings = []
+    for id_linestring, point_ids, tags, ref_line in result['linestrings']:
+        points = [point_layer[id_point] for id_point in point_ids]
+        key = endpoint_key(points[0], points[-1])
+        if key in data_handler.long_boundaries:
+            new_ids[id_linestring] = data_handler.long_boundaries[key][0].id
+        else:
+            linestrings.append((id_linestring, points, tags, ref_line, key))
+
+    ids_worker = sorted([attributes.id for _, attributes in result['elements']]
+                        + [id_linestring for id_linestring, _, _, _, _ in linestrings])
+    new_ids.update({id_worker: getId() for id_worker in ids_worker})
+
+    for id_linestring, points, tags, ref_line, key in linestrings:
+        linestring = LineString3d(new_ids[id_linestring], points, tags)
+        data_handler.map_lanelet.add(linestring)
+        data_handler.usages.add_linestring(linestring)
+        data_handler.new_linestrings.append(linestring)
+        data_handler.long_boundaries[key] = (linestring, ref_line)
+
+    for class_name, attributes in result['elements']:
+        attributes.id = new_ids[attributes.id]
+        attributes.members[:] = [member._replace(ref=new_ids.get(member.ref, member.ref))
+                                 for member in attributes.members]
+        data_handler.map_bssd.add(getattr(BSSD_elements, class_name).from_attributes(attributes))
+
+
+def find_message_counter():
+    """ Returns the handler of the framework logger that counts messages per level (None if not set up).  """
+    return next((handler for handler in logging.getLogger('framework').handlers
+                 if isinstance(handler, MsgCounterHandler)), None)
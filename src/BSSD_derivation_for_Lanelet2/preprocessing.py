@@ -4,6 +4,8 @@ import lanelet2
 from lanelet2.core import AttributeMap, Lanelet
 
 from . import constants
+from .lanelet_data import LaneletData, create_lanelet_table
+from .topology import TopologyIndex, UsageIndex
 
 logger = logging.getLogger(__name__)
 
@@ -19,15 +21,25 @@ class Preprocessing:
             Layered lanelet2 map that contains all lanelet2 objects of a loaded map.
         traffic_rules : traffic_rules
             traffic rules object from lanelet2 for participant = vehicle
+        lanelet_table : defaultdict
+            LaneletData for every lanelet ID, which stores the relevance and passability of every lanelet.
+        usages : UsageIndex
+            Inverse index of the map that contains the usages of points and linestrings.
 
     Methods
     -------
         get_routing_graph_all():
             creating RoutingGraph object that contains every lanelet of a map
+        get_topology_index():
+            creating a lightweight TopologyIndex that replaces the RoutingGraph for every lanelet of a map
         find_relevant_lanelets():
             Find for bssd relevant lanelets in lanelet2 map.
         get_relevant_bicycle_lanelets():
             Distinguishes relevance of bicycle lanelets and returns list of relevant bicycle lanelets.
+        get_relevant_lanelets_data(relevant_lanelets):
+            Returns the result of find_relevant_lanelets in a serializable form for caching.
+        restore_relevant_lanelets(relevant_lanelets, relevant_bicycle_lanelets):
+            Restores the result of find_relevant_lanelets from a cached result.
         find_usages_and_remove_self(ll, side):
             Finds direct neighbors on one side of a lanelet.
     """
@@ -36,6 +48,9 @@ class Preprocessing:
         self.map_lanelet = map_lanelet
         self.traffic_rules = lanelet2.traffic_rules.create(lanelet2.traffic_rules.Locations.Germany,
                                                            lanelet2.traffic_rules.Participants.Vehicle)
+        self.lanelet_table = create_lanelet_table()
+        classify_lanelets(map_lanelet, self.lanelet_table)
+        self.usages = UsageIndex(map_lanelet)
 
     def get_routing_graph_all(self):
         """
@@ -55,7 +70,7 @@ class Preprocessing:
         for lanelet in self.map_lanelet.laneletLayer:
             # Check, if a lanelet is passable for vehicles. This way, only the non-passable lanelets will receive
             # override tags
-            if not self.traffic_rules.canPass(lanelet):
+            if not self.lanelet_table[lanelet.id].can_pass_vehicle:
                 # check if the override tag for vehicle is already existing to save its value to the edited dictionary
                 if 'participant:vehicle' in lanelet.attributes:
                     edited[lanelet] = lanelet.attributes['participant:vehicle']
@@ -78,6 +93,17 @@ class Preprocessing:
 
         return graph
 
+    def get_topology_index(self):
+        """
+        Creates a TopologyIndex that provides the relations following, previous and conflicting for every lanelet of
+        the map like the RoutingGraph of get_routing_graph_all. In contrast to the RoutingGraph, neither routing costs
+        nor lane changes are computed and the lanelets don't need to be made passable for vehicles temporarily.
+
+        Returns:
+            topology (TopologyIndex):Index with the relations between the lanelets.
+        """
+        return TopologyIndex(self.map_lanelet, self.traffic_rules)
+
     def find_relevant_lanelets(self) -> list:
         """
         This function is going through every lanelet of the map and checking different criteria to determine whether
@@ -89,7 +115,7 @@ class Preprocessing:
 
         # First, filter lanelets for passability of motorized vehicles
         relevant_lanelets = [lanelet.id for lanelet in self.map_lanelet.laneletLayer
-                             if is_lanelet_relevant(lanelet.attributes)]
+                             if self.lanelet_table[lanelet.id].relevant]
         # Second, add a list of relevant bicycle lanelets and return both lists combined
         return relevant_lanelets + self.get_relevant_bicycle_lanelets()
 
@@ -97,7 +123,8 @@ class Preprocessing:
         """
         This function filters every bicycle lanelet of a Lanelet2 map for relevance. This means that conditions need to
         be met to consider a lanelet part of the roadway. Currently, the conditions are that a bicycle lanelet has
-        neigbors that are generally considered relevant (using the 'is_ll_relevant' function).
+        neigbors that are generally considered relevant (using the 'is_ll_relevant' function). Relevant bicycle lanes
+        are marked in the lanelet table and their relevance is updated.
 
         Returns:
             relevant_bicycle_list (list):List of every relevant bicycle lanelet of a Lanelet2 map.
@@ -120,20 +147,53 @@ class Preprocessing:
             neighbors_right = self.find_usages_and_remove_self(lanelet, 'r')
 
             # Check if the neighbors on one of the sides allow the conclusion that this lanelet is relevant
-            if is_bicycle_lanelet_relevant(neighbors_left, lanelet.leftBound.attributes) \
-                    or is_bicycle_lanelet_relevant(neighbors_right, lanelet.rightBound.attributes):
+            if is_bicycle_lanelet_relevant(neighbors_left, lanelet.leftBound.attributes, self.lanelet_table) \
+                    or is_bicycle_lanelet_relevant(neighbors_right, lanelet.rightBound.attributes, self.lanelet_table):
                 logger.debug(f' Lanelet {lanelet.id} identified as relevant bicycle lane')
-                lanelet.attributes['relevant_bicycle_lane'] = 'yes'
+                mark_relevant_bicycle_lane(lanelet, self.lanelet_table[lanelet.id])
 
                 relevant_bicycle_list.append(lanelet.id)
 
         return relevant_bicycle_list
 
+    def get_relevant_lanelets_data(self, relevant_lanelets: list) -> dict:
+        """
+        Returns the result of the search for relevant lanelets in a JSON-serializable form, so that it can be cached.
+        Besides the IDs of all relevant lanelets, the IDs of relevant bicycle lanelets are stored, because they are
+        marked in the lanelet table during the search.
+
+        Parameters:
+            relevant_lanelets (list):IDs of the relevant lanelets as returned by find_relevant_lanelets.
+
+        Returns:
+            data (dict):IDs of all relevant lanelets and of the relevant bicycle lanelets.
+        """
+        relevant_bicycle_lanelets = [lanelet_id for lanelet_id in relevant_lanelets
+                                     if lanelet_id in self.lanelet_table
+                                     and self.lanelet_table[lanelet_id].relevant_bicycle_lane]
+        return {'relevant_lanelets': relevant_lanelets, 'relevant_bicycle_lanelets': relevant_bicycle_lanelets}
+
+    def restore_relevant_lanelets(self, relevant_lanelets: list, relevant_bicycle_lanelets: list) -> list:
+        """
+        Restores the result of find_relevant_lanelets from a cached result instead of searching the map again. The
+        relevant bicycle lanelets are marked in the lanelet table in the same way as during the search.
+
+        Parameters:
+            relevant_lanelets (list):IDs of all relevant lanelets.
+            relevant_bicycle_lanelets (list):IDs of the relevant bicycle lanelets.
+
+        Returns:
+            relevant_lanelets (list):List of every relevant lanelet of a Lanelet2 map.
+        """
+        for lanelet_id in relevant_bicycle_lanelets:
+            mark_relevant_bicycle_lane(self.map_lanelet.laneletLayer[lanelet_id], self.lanelet_table[lanelet_id])
+
+        return list(relevant_lanelets)
+
     def find_usages_and_remove_self(self, lanelet: Lanelet, side: str) -> list:
         """
         Finds all the direct neighbors of a given lanelet for the left or right side. This is accomplished by using the
-        FindUsages function of the Lanelet2-Framework. This returns a list from which the original lanelet is being
-        removed.
+        usage index of the map. This returns a list from which the original lanelet is being removed.
 
         Parameters:
             lanelet (lanelet):The lanelet that neighbors are being searched for.
@@ -147,9 +207,9 @@ class Preprocessing:
 
         # Distinguish between sites and search for the respective boundary linestring for usages
         if side == 'r':
-            neighbors = self.map_lanelet.laneletLayer.findUsages(lanelet.rightBound)
+            neighbors = self.usages.lanelets_using(lanelet.rightBound)
         elif side == 'l':
-            neighbors = self.map_lanelet.laneletLayer.findUsages(lanelet.leftBound)
+            neighbors = self.usages.lanelets_using(lanelet.leftBound)
 
         # Remove the lanelet from which the search has been started.
         neighbors.remove(lanelet)
@@ -158,22 +218,54 @@ class Preprocessing:
         return neighbors
 
 
-def is_lanelet_relevant(lanelet_attributes: AttributeMap) -> bool:
+def classify_lanelets(map_lanelet, lanelet_table):
+    """
+    Classifies every lanelet of a map once and stores the result in the lanelet table. This includes the relevance
+    for the behavior space derivation and the passability for vehicles, pedestrians and bicycles. Every other function
+    of the framework uses the lanelet table instead of classifying the lanelets again.
+
+        Parameters:
+            map_lanelet (LaneletMap):Lanelet2 map that contains the lanelets.
+            lanelet_table (defaultdict):Lanelet table in which the classifications are stored.
+    """
+
+    # Traffic rules for the participants whose passability is needed in the framework
+    participants = lanelet2.traffic_rules.Participants
+    rules_vehicle, rules_pedestrian, rules_bicycle = \
+        [lanelet2.traffic_rules.create(lanelet2.traffic_rules.Locations.Germany, participant)
+         for participant in [participants.Vehicle, participants.Pedestrian, participants.Bicycle]]
+
+    for lanelet in map_lanelet.laneletLayer:
+        lanelet_data = lanelet_table[lanelet.id]
+        lanelet_data.relevant = is_lanelet_relevant(lanelet.attributes, lanelet_data)
+        lanelet_data.can_pass_vehicle = rules_vehicle.canPass(lanelet)
+        lanelet_data.can_pass_pedestrian = rules_pedestrian.canPass(lanelet)
+        lanelet_data.can_pass_bicycle = rules_bicycle.canPass(lanelet)
+
+
+def mark_relevant_bicycle_lane(lanelet: Lanelet, lanelet_data: LaneletData):
+    """ Marks a lanelet as relevant bicycle lane in the lanelet table and updates its relevance accordingly.  """
+    lanelet_data.relevant_bicycle_lane = True
+    lanelet_data.relevant = is_lanelet_relevant(lanelet.attributes, lanelet_data)
+
+
+def is_lanelet_relevant(lanelet_attributes: AttributeMap, lanelet_data: LaneletData = None) -> bool:
     """
     Determine the relevance of a lanelet by first checking its subtype (for instance: shouldn't be "stairs")
     and second if any overriding 'participant'-tags are being used
 
         Parameters:
             lanelet_attributes (AttributeMap):Attributes of a lanelet.
+            lanelet_data (LaneletData):Optional data of the lanelet table that marks relevant bicycle lanes.
 
         Returns:
             relevant (bool):True if lanelet is relevant according to the selected criteria.
     """
 
     # Check if the lanelet subtype is in the list of subtypes that are considered to be part of the roadway
-    # A second condition is used checks if the tag relevant bicycle lane is set.
+    # A second condition is used checks if the lanelet is marked as relevant bicycle lane.
     if lanelet_attributes['subtype'] in constants.SUBTYPE_TAGS \
-            or ('relevant_bicycle_lane' in lanelet_attributes and lanelet_attributes['relevant_bicycle_lane'] == 'yes'):
+            or (lanelet_data is not None and lanelet_data.relevant_bicycle_lane):
 
         # If overriding tags are set, they override the meaning of the lanelet subtypes. Thus, a check is necessary that
         # makes sure that overriding tags show a passability for vehicles
@@ -195,7 +287,7 @@ def is_lanelet_relevant(lanelet_attributes: AttributeMap) -> bool:
     return relevant
 
 
-def is_bicycle_lanelet_relevant(neighbors: list, linestring_attributes: AttributeMap) -> bool:
+def is_bicycle_lanelet_relevant(neighbors: list, linestring_attributes: AttributeMap, lanelet_table=None) -> bool:
     """
     This function checks for a given lateral linestring of a bicycle lanelet and the neighbors next to that linestring
     whether a bicycle lanelet is relevant.
@@ -203,6 +295,7 @@ def is_bicycle_lanelet_relevant(neighbors: list, linestring_attributes: Attribut
         Parameters:
             neighbors (list):List of lanelets that border the considered bicycle lanelet.
             linestring_attributes (AttributeMap):Attributes of the lateral boundary linestring of a bicycle lanelet.
+            lanelet_table (defaultdict):Optional lanelet table that contains the relevance of the neighbors.
 
         Returns:
             relevant (bool):True if bicycle lanelet is relevant according to the selected criteria.
@@ -213,7 +306,9 @@ def is_bicycle_lanelet_relevant(neighbors: list, linestring_attributes: Attribut
     # lanelet lies next to a walkway lanelet. The third condition is to check the linestring type that divides the
     # bicycle lanelet from its neighbor(s). If this linestring is not making it impossible to cross, a motorized vehicle
     # could theoretically reach the bicycle lanelet and it is therefore considered relevant.
-    if neighbors and any(neighbor for neighbor in neighbors if is_lanelet_relevant(neighbor.attributes))\
+    if neighbors and any(neighbor for neighbor in neighbors
+                         if (lanelet_table[neighbor.id].relevant if lanelet_table is not None
+                             else is_lanelet_relevant(neighbor.attributes)))\
             and linestring_attributes['type'] in constants.RELEVANT_BICYCLE_TAGS:
         return True
     else:
@@ -0,0 +1,172 @@
+import logging
+from collections import defaultdict
+
+logger = logging.getLogger('framework.segments')
+
+
+class Segment:
+    """
+    This class represents a segment of the roadway for one driving direction, i.e. lanelets of the same reference
+    direction that lie next to each other (directly or next to a keepout area).
+
+    Attributes
+    ----------
+        id : int
+            Position of the segment in the list of segments of the SegmentIndex.
+        levels : defaultdict
+            Lanelets of the segment for their lateral level on the roadway. The level increases to the left.
+        opposing : int
+            ID of the segment of the opposing driving direction (None if no opposing lanelet has been found).
+        lanelet_left : Lanelet
+            Outer left lanelet of this segment that borders the opposing driving direction.
+        opposing_lanelet : Lanelet
+            Outer left lanelet of the segment of the opposing driving direction.
+
+    Methods
+    -------
+        __init__(id_segment):
+            Creates an empty segment.
+        outer_left():
+            Returns the lanelets with the highest level of the segment.
+    """
+
+    def __init__(self, id_segment):
+        self.id = id_segment
+        self.levels = defaultdict(list)
+        self.opposing = None
+        self.lanelet_left = None
+        self.opposing_lanelet = None
+
+    def outer_left(self):
+        """ Returns the lanelets of the segment that lie furthest to the left.  """
+        return self.levels[max(self.levels.keys())]
+
+
+class SegmentIndex:
+    """
+    This class decomposes the relevant lanelets of a map into segments in a single pass. Starting at every lanelet that
+    doesn't belong to a segment yet, the lateral neighbors along the reference direction (direct neighbors and
+    neighbors next to keepout areas) are traversed with an explicit stack. Every lanelet is only visited once, so that
+    loops around keepout areas can't revisit lanelets. Each lanelet gets the ID of its segment and its lateral level in
+    the lanelet table. Afterwards, the segment of the opposing driving direction is searched from the outer left
+    lanelets of the segment.
+
+    Attributes
+    ----------
+        lanelet_table : defaultdict
+            LaneletData for every lanelet ID, which stores the segment and level of the lanelets.
+        find_neighbors : function
+            Function that returns the neighbors of a lanelet at a linestring for an orientation ('along' or 'against'),
+            see DataHandler.find_one_sided_neighbors.
+        segments : list
+            Every segment that has been found.
+        searched : set
+            IDs of the segments for which the opposing segment has been searched.
+
+    Methods
+    -------
+        __init__(lanelet_table, find_neighbors):
+            Creates an empty segment index.
+        add_segments(lanelets):
+            Assigns every given lanelet to a segment and searches the opposing segments.
+        segment_of(lanelet):
+            Returns the segment of a lanelet including its opposing segment.
+        add_segment(lanelet):
+            Creates the segment of a lanelet by traversing its lateral neighbors.
+        assign(lanelet, segment, level):
+            Stores the segment and the lateral level of a lanelet in the lanelet table.
+        find_opposing(segment):
+            Searches the segment of the opposing driving direction for a segment.
+    """
+
+    def __init__(self, lanelet_table, find_neighbors):
+        self.lanelet_table = lanelet_table
+        self.find_neighbors = find_neighbors
+        self.segments = []
+        self.searched = set()
+
+    def add_segments(self, lanelets):
+        """
+        Assigns every given lanelet to a segment in the given order and searches the opposing segments.
+
+        Parameters:
+            lanelets (iterable):Lanelets, typically the relevant lanelets of the map.
+        """
+        for lanelet in lanelets:
+            self.segment_of(lanelet)
+        logger.debug(f'Found {len(self.segments)} segments')
+
+    def segment_of(self, lanelet):
+        """
+        Returns the segment of a lanelet. If the lanelet doesn't belong to a segment yet, the segment is created.
+
+        Parameters:
+            lanelet (Lanelet):Lanelet whose segment is requested.
+
+        Returns:
+            segment (Segment):Segment that contains the lanelet, for which the opposing segment has been searched.
+        """
+        lanelet_data = self.lanelet_table[lanelet.id]
+        segment = self.segments[lanelet_data.segment] if lanelet_data.segment is not None else self.add_segment(lanelet)
+        if segment.id not in self.searched:
+            self.find_opposing(segment)
+        return segment
+
+    def add_segment(self, lanelet):
+        """
+        Creates the segment of a lanelet. Every lanelet that can be reached via lateral neighbors of the same reference
+        direction is added, neighbors on the left one level higher and neighbors on the right one level lower than the
+        current lanelet. The given lanelet has the level 0.
+
+        Parameters:
+            lanelet (Lanelet):Lanelet from which the segment is traversed.
+
+        Returns:
+            segment (Segment):New segment.
+        """
+        segment = Segment(len(self.segments))
+        self.segments.append(segment)
+        self.assign(lanelet, segment, 0)
+
+        stack = [(lanelet, 0)]
+        while stack:
+            current_lanelet, level = stack.pop()
+            segment.levels[level].append(current_lanelet)
+            for linestring, offset in [(current_lanelet.leftBound, 1), (current_lanelet.rightBound, -1)]:
+                # Sort the neighbors to get the same segment regardless of the order of sets
+                for neighbor in sorted(self.find_neighbors(current_lanelet, linestring, 'along'), key=lambda ll: ll.id):
+                    if self.lanelet_table[neighbor.id].segment is None:
+                        self.assign(neighbor, segment, level + offset)
+                        stack.append((neighbor, level + offset))
+
+        logger.debug(f'Segment {segment.id}: '
+                     f'{[[level, [ll.id for ll in lanelets]] for level, lanelets in segment.levels.items()]}')
+        return segment
+
+    def assign(self, lanelet, segment, level):
+        """ Stores the segment and the lateral level of a lanelet in the lanelet table.  """
+        lanelet_data = self.lanelet_table[lanelet.id]
+        lanelet_data.segment = segment.id
+        lanelet_data.level = level
+
+    def find_opposing(self, segment):
+        """
+        Searches the segment of the opposing driving direction. For the outer left lanelets of the segment, neighbors
+        at their left lateral boundary with opposing reference direction are searched. The segment of the first
+        neighbor that is found is the opposing segment.
+
+        Parameters:
+            segment (Segment):Segment for which the opposing segment is searched.
+        """
+        self.searched.add(segment.id)
+        for lanelet in segment.outer_left():
+            first_opposing_lanelets = self.find_neighbors(lanelet, lanelet.leftBound.invert(), 'against')
+            if first_opposing_lanelets:
+                start_lanelet = min(first_opposing_lanelets, key=lambda ll: ll.id)
+                start_data = self.lanelet_table[start_lanelet.id]
+                opposing = self.segments[start_data.segment] if start_data.segment is not None \
+                    else self.add_segment(start_lanelet)
+                segment.opposing = opposing.id
+                segment.lanelet_left = lanelet
+                segment.opposing_lanelet = opposing.outer_left()[0]
+                break
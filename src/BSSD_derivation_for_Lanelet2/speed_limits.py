@@ -0,0 +1,68 @@
+import logging
+from collections import defaultdict
+
+from lanelet2.core import SpeedLimit
+
+logger = logging.getLogger('framework.speed_limits')
+
+
+class SpeedLimitResolver:
+    """
+    This class resolves the speed limits of lanelets with the traffic rules of Lanelet2. The speed limit of a lanelet
+    only depends on its attributes (e.g. subtype and location) and its regulatory elements of type SpeedLimit. Thus,
+    the result is stored for every combination of these and the traffic rules are only called once per distinct
+    combination instead of once per lanelet. The regulatory elements of type SpeedLimit are indexed for every lanelet of
+    the map in a single pass, together with the lanelets that reference each of them.
+
+    Attributes
+    ----------
+        traffic_rules : traffic_rules
+            Traffic rules object from Lanelet2 that is used to resolve the speed limits.
+        lanelet_speed_limits : dict
+            IDs of the regulatory elements of type SpeedLimit for every lanelet ID (in the order of the lanelet).
+        regelem_lanelets : defaultdict
+            IDs of the lanelets that reference a regulatory element of type SpeedLimit for every regulatory element ID.
+        resolved : dict
+            Speed limit for every signature of attributes and IDs of regulatory elements.
+
+    Methods
+    -------
+        __init__(map_lanelet, traffic_rules):
+            Indexes the regulatory elements of type SpeedLimit of every lanelet.
+        speed_limit(lanelet):
+            Returns the speed limit of a lanelet and the ID of the regulatory element that indicates it.
+    """
+
+    def __init__(self, map_lanelet, traffic_rules):
+        self.traffic_rules = traffic_rules
+        self.lanelet_speed_limits = {}
+        self.regelem_lanelets = defaultdict(list)
+        self.resolved = {}
+
+        for lanelet in map_lanelet.laneletLayer:
+            regelem_ids = tuple(regelem.id for regelem in lanelet.regulatoryElements if isinstance(regelem, SpeedLimit))
+            self.lanelet_speed_limits[lanelet.id] = regelem_ids
+            for regelem_id in regelem_ids:
+                self.regelem_lanelets[regelem_id].append(lanelet.id)
+
+    def speed_limit(self, lanelet):
+        """
+        Returns the speed limit of a lanelet. The traffic rules are only called for the first lanelet with the same
+        attributes and regulatory elements of type SpeedLimit.
+
+        Parameters:
+            lanelet (Lanelet):Lanelet whose speed limit is requested.
+
+        Returns:
+            speed_limit (int):Rounded speed limit of the lanelet.
+            speed_limit_link (int):ID of the regulatory element that indicates the speed limit (None if not existent).
+        """
+        if lanelet.id not in self.lanelet_speed_limits:
+            self.lanelet_speed_limits[lanelet.id] = \
+                tuple(regelem.id for regelem in lanelet.regulatoryElements if isinstance(regelem, SpeedLimit))
+        regelem_ids = self.lanelet_speed_limits[lanelet.id]
+
+        signature = (tuple(sorted(lanelet.attributes.items())), regelem_ids)
+        if signature not in self.resolved:
+            self.resolved[signature] = round(self.traffic_rules.speedLimit(lanelet).speedLimit)
+        return self.resolved[signature], regelem_ids[0] if regelem_ids else None
@@ -0,0 +1,372 @@
+import logging
+from collections import defaultdict
+
+import numpy as np
+import lanelet2.geometry as geo
+
+from .geometry_derivation import make_orthogonal_bounding_boxes
+from .constants import LONG_BDR_TAGS
+
+logger = logging.getLogger('framework.topology')
+
+
+class TopologyIndex:
+    """
+    This class is a lightweight replacement for the RoutingGraph that contains every lanelet of a map. The framework
+    only needs the relations following, previous and conflicting, which are derived directly from the geometry:
+    A lanelet follows another lanelet if its lateral boundaries start at the points where the lateral boundaries of
+    the other lanelet end. Lanelets that are not one-way for vehicles can also be passed in inverted direction.
+    Lanelets are conflicting if their polygons overlap. Candidates for conflicts are found by a sweep over the
+    bounding boxes of all lanelets and the exact overlap test is only performed when the conflicts of a lanelet are
+    requested.
+
+    Attributes
+    ----------
+        map_lanelet : LaneletMap
+            Layered lanelet2 map that contains all lanelet2 objects of a loaded map.
+        starts : defaultdict
+            Lanelets (in both directions, if not one-way) for the IDs of the first points of their lateral boundaries.
+        ends : defaultdict
+            Lanelets (in both directions, if not one-way) for the IDs of the last points of their lateral boundaries.
+        candidates : defaultdict
+            IDs of lanelets with overlapping bounding boxes for every lanelet ID.
+        conflicts : dict
+            Cached result of the conflicting lanelets for every lanelet ID.
+        positions : dict
+            Position of every lanelet ID in the lanelet layer.
+        one_way : set
+            IDs of the lanelets that can only be passed in their reference direction.
+
+    Methods
+    -------
+        __init__(map_lanelet, traffic_rules):
+            Indexes the start and end points of all lanelets and finds candidates for conflicts.
+        following(lanelet):
+            Returns the lanelets that succeed the given lanelet.
+        previous(lanelet):
+            Returns the lanelets that precede the given lanelet.
+        conflicting(lanelet):
+            Returns the lanelets whose polygons overlap with the given lanelet.
+    """
+
+    def __init__(self, map_lanelet, traffic_rules):
+        self.map_lanelet = map_lanelet
+        self.starts = defaultdict(list)
+        self.ends = defaultdict(list)
+        self.candidates = defaultdict(set)
+        self.conflicts = {}
+        self.one_way = set()
+
+        # The lanelets are indexed in the order of the lanelet layer, which is also the order of the RoutingGraph.
+        # This way, the loop through the lanelets visits them in the same order.
+        lanelets = list(map_lanelet.laneletLayer)
+        self.positions = {lanelet.id: position for position, lanelet in enumerate(lanelets)}
+        for lanelet in lanelets:
+            if traffic_rules.isOneWay(lanelet):
+                self.one_way.add(lanelet.id)
+                directions = [lanelet]
+            else:
+                directions = [lanelet, lanelet.invert()]
+            for directed_lanelet in directions:
+                self.starts[(directed_lanelet.leftBound[0].id, directed_lanelet.rightBound[0].id)]\
+                    .append(directed_lanelet)
+                self.ends[(directed_lanelet.leftBound[-1].id, directed_lanelet.rightBound[-1].id)]\
+                    .append(directed_lanelet)
+
+        self.find_candidates(lanelets)
+        logger.debug(f'Topology index created for {len(lanelets)} lanelets')
+
+    def find_candidates(self, lanelets):
+        """
+        Finds every pair of lanelets whose bounding boxes overlap. The lanelets are sorted by the minimal
+        x-coordinate of their bounding box. Sweeping through this order, only the lanelets that start before the current
+        lanelet ends in x-direction need to be compared in y-direction.
+
+        Parameters:
+            lanelets (list):Every lanelet of the map.
+        """
+        if not lanelets:
+            return
+
+        boxes = [geo.boundingBox2d(lanelet) for lanelet in lanelets]
+        ids = [lanelet.id for lanelet in lanelets]
+        min_x = np.array([box.min.x for box in boxes])
+        min_y = np.array([box.min.y for box in boxes])
+        max_x = np.array([box.max.x for box in boxes])
+        max_y = np.array([box.max.y for box in boxes])
+
+        order = np.argsort(min_x, kind='stable')
+        sorted_min_x = min_x[order]
+        for position, index in enumerate(order.tolist()):
+            # Lanelets that start (in x-direction) before this lanelet ends
+            end = np.searchsorted(sorted_min_x, max_x[index], side='right')
+            others = order[position + 1:end]
+            others = others[(min_y[others] <= max_y[index]) & (max_y[others] >= min_y[index])]
+            for other in others.tolist():
+                self.candidates[ids[index]].add(ids[other])
+                self.candidates[ids[other]].add(ids[index])
+
+    def following(self, lanelet):
+        """ Returns the lanelets whose lateral boundaries start where the ones of the given lanelet end.  """
+        # Like in the RoutingGraph, one-way lanelets in inverted direction have no relations
+        if lanelet.inverted() and lanelet.id in self.one_way:
+            return []
+        return [successor for successor in self.starts.get((lanelet.leftBound[-1].id, lanelet.rightBound[-1].id), [])
+                if successor.id != lanelet.id]
+
+    def previous(self, lanelet):
+        """ Returns the lanelets whose lateral boundaries end where the ones of the given lanelet start.  """
+        if lanelet.inverted() and lanelet.id in self.one_way:
+            return []
+        return [predecessor for predecessor in self.ends.get((lanelet.leftBound[0].id, lanelet.rightBound[0].id), [])
+                if predecessor.id != lanelet.id]
+
+    def conflicting(self, lanelet):
+        """
+        Returns the lanelets whose polygons overlap with the polygon of the given lanelet. The overlapping lanelets
+        are cached for every lanelet. Like in the RoutingGraph, the conflicts contain every direction in which the
+        overlapping lanelets can be passed, including the inverted given lanelet if it isn't one-way. For inverted
+        lanelets, only the overlapping lanelets in reference direction are returned, including the given lanelet
+        itself. Inverted one-way lanelets have no conflicts.
+
+        Parameters:
+            lanelet (Lanelet):Lanelet for which conflicting lanelets are searched.
+
+        Returns:
+            conflicting_lanelets (list):Conflicting lanelets in the order of the lanelet layer, each followed by its
+                                        inverted direction.
+        """
+        if lanelet.inverted() and lanelet.id in self.one_way:
+            return []
+        if lanelet.id not in self.conflicts:
+            lanelet_layer = self.map_lanelet.laneletLayer
+            overlapping = {id_other for id_other in self.candidates[lanelet.id]
+                           if geo.overlaps2d(lanelet_layer[id_other], lanelet)}
+            self.conflicts[lanelet.id] = [lanelet_layer[id_other]
+                                          for id_other in sorted(overlapping | {lanelet.id}, key=self.positions.get)]
+
+        if lanelet.inverted():
+            return list(self.conflicts[lanelet.id])
+        conflicting_lanelets = []
+        for other in self.conflicts[lanelet.id]:
+            if other.id != lanelet.id:
+                conflicting_lanelets.append(other)
+            if other.id not in self.one_way:
+                conflicting_lanelets.append(other.invert())
+        return conflicting_lanelets
+
+
+class UsageIndex:
+    """
+    This class is an inverse index of the map that replaces the findUsages-functions of the layers of Lanelet2. It is
+    built in a single pass through the map and contains for every point the linestrings that use it and for every
+    linestring the lanelets and areas that use it. Since the longitudinal boundaries that are created during the
+    derivation are searched via their points as well, new linestrings are added to the index incrementally.
+
+    Attributes
+    ----------
+        map_lanelet : LaneletMap
+            Layered lanelet2 map that contains all lanelet2 objects of a loaded map.
+        point_linestrings : defaultdict
+            IDs of the linestrings that contain a point for every point ID.
+        endpoint_linestrings : defaultdict
+            IDs of the linestrings for every pair of IDs of their first and last point (ordered by ID).
+        linestring_lanelets : defaultdict
+            Lanelets that use a linestring as lateral boundary for every linestring ID, each together with a flag
+            whether the lanelet uses the linestring in inverted direction.
+        linestring_areas : defaultdict
+            Areas that use a linestring as part of their boundary (in any direction) for every linestring ID.
+        linestring_area_subtypes : defaultdict
+            Areas that use a linestring grouped by their subtype (None if not tagged) for every linestring ID.
+
+    Methods
+    -------
+        __init__(map_lanelet):
+            Indexes the usages of all points and linestrings of the map.
+        add_linestring(linestring):
+            Adds a linestring that has been added to the map to the index of its points.
+        linestrings_using(point):
+            Returns the linestrings that contain the given point.
+        linestrings_between(point_1, point_2):
+            Returns the linestrings whose endpoints are the two given points.
+        lanelets_using(linestring):
+            Returns the lanelets that use the given linestring in the given direction as lateral boundary.
+        areas_using(linestring, subtype=None):
+            Returns the areas (optionally only of a subtype) that use the given linestring in any direction.
+    """
+
+    def __init__(self, map_lanelet):
+        self.map_lanelet = map_lanelet
+        self.point_linestrings = defaultdict(list)
+        self.endpoint_linestrings = defaultdict(list)
+        self.linestring_lanelets = defaultdict(list)
+        self.linestring_areas = defaultdict(list)
+        self.linestring_area_subtypes = defaultdict(dict)
+
+        for linestring in map_lanelet.lineStringLayer:
+            self.add_linestring(linestring)
+        for lanelet in map_lanelet.laneletLayer:
+            for bound in [lanelet.leftBound, lanelet.rightBound]:
+                self.linestring_lanelets[bound.id].append((lanelet, bound.inverted()))
+        for area in map_lanelet.areaLayer:
+            subtype = area.attributes['subtype'] if 'subtype' in area.attributes else None
+            for bound in list(area.outerBound) + [ls for inner in area.innerBounds for ls in inner]:
+                if area not in self.linestring_areas[bound.id]:
+                    self.linestring_areas[bound.id].append(area)
+                    self.linestring_area_subtypes[bound.id].setdefault(subtype, []).append(area)
+        logger.debug(f'Usage index created for {len(self.point_linestrings)} points')
+
+    def add_linestring(self, linestring):
+        """ Adds a linestring to the index of its points. Must be called for every linestring added to the map.  """
+        for point_id in {point.id for point in linestring}:
+            self.point_linestrings[point_id].append(linestring.id)
+        if len(linestring):
+            self.endpoint_linestrings[endpoint_key(linestring[0], linestring[-1])].append(linestring.id)
+
+    def linestrings_using(self, point):
+        """ Returns the linestrings of the map that contain the given point.  """
+        linestring_layer = self.map_lanelet.lineStringLayer
+        return [linestring_layer[linestring_id] for linestring_id in self.point_linestrings.get(point.id, [])]
+
+    def linestrings_between(self, point_1, point_2):
+        """ Returns the linestrings of the map whose endpoints are the given points (in any order).  """
+        linestring_layer = self.map_lanelet.lineStringLayer
+        return [linestring_layer[linestring_id]
+                for linestring_id in self.endpoint_linestrings.get(endpoint_key(point_1, point_2), [])]
+
+    def lanelets_using(self, linestring):
+        """
+        Returns the lanelets that use the given linestring as lateral boundary in the same direction like
+        findUsages of the lanelet layer does. For lanelets that use the linestring in inverted direction, the inverted
+        linestring has to be given.
+
+        Parameters:
+            linestring (LineString2d | LineString3d):Linestring, which might be inverted.
+
+        Returns:
+            lanelets (list):Lanelets that use the linestring in the given direction.
+        """
+        return [lanelet for lanelet, inverted in self.linestring_lanelets.get(linestring.id, [])
+                if inverted == linestring.inverted()]
+
+    def areas_using(self, linestring, subtype=None):
+        """
+        Returns the areas that use the given linestring as part of their boundary in any direction.
+
+        Parameters:
+            linestring (LineString2d | LineString3d):Linestring in any direction.
+            subtype (str):Optional subtype of the areas, e.g. 'parking' or 'keepout'.
+
+        Returns:
+            areas (list):Areas that use the linestring.
+        """
+        if subtype:
+            return list(self.linestring_area_subtypes.get(linestring.id, {}).get(subtype, []))
+        return list(self.linestring_areas.get(linestring.id, []))
+
+
+class BoundaryIndex:
+    """
+    This class indexes the linestrings that can be used to derive longitudinal boundaries (see LONG_BDR_TAGS), e.g.
+    stop lines. For every point, it contains the candidate linestrings that contain the point together with the
+    position of the point within each linestring. The points of every candidate are stored once as tuple. Thus, the
+    search for linestrings that contain one or both start-/endpoints of a lanelet consists of dictionary lookups and
+    doesn't copy any linestring. Since the framework only creates linestrings of type BSSD, the index is not updated
+    during the derivation.
+    Candidates that lie between the start-/endpoints of a lanelet without containing them ("free" lines) are found
+    by a batch join: The orthogonal bounding boxes of all given pairs of endpoints are created at once and the
+    candidates, sorted by the x-coordinate of their first point, are searched for every box. A candidate matches a
+    box if both of its endpoints lie inside the box. The result is stored in a table for every pair of endpoints.
+
+    Attributes
+    ----------
+        points : dict
+            Points of every candidate linestring for its ID.
+        positions : defaultdict
+            Position of a point in every candidate linestring that contains it (ID of linestring to position) for every
+            point ID. Candidates are stored in the order of the linestring layer.
+        ids : list
+            IDs of the candidates in the order of the linestring layer.
+        endpoints : ndarray
+            x- and y-coordinate of the first and the last point of every candidate (shape (n, 4)).
+        free : dict
+            IDs of the candidates that lie between a pair of points for every pair of point IDs (see endpoint_key).
+
+    Methods
+    -------
+        __init__(map_lanelet):
+            Indexes the points of all candidate linestrings of the map.
+        containing(point):
+            Returns the positions of the given point in every candidate linestring that contains it.
+        add_free_candidates(point_pairs):
+            Finds the candidates between every pair of points and adds them to the table.
+        free_candidates(point_1, point_2):
+            Returns the candidates between two points.
+    """
+
+    def __init__(self, map_lanelet):
+        self.points = {}
+        self.positions = defaultdict(dict)
+
+        for linestring in map_lanelet.lineStringLayer:
+            if 'type' not in linestring.attributes or linestring.attributes['type'] not in LONG_BDR_TAGS:
+                continue
+            self.points[linestring.id] = tuple(linestring)
+            for position, point in enumerate(self.points[linestring.id]):
+                # Keep the first position like list.index does
+                self.positions[point.id].setdefault(linestring.id, position)
+
+        self.ids = list(self.points)
+        self.endpoints = np.array([[points[0].x, points[0].y, points[-1].x, points[-1].y]
+                                   for points in self.points.values()], dtype=float).reshape(-1, 4)
+        self.free = {}
+        logger.debug(f'Boundary index created for {len(self.points)} linestrings')
+
+    def containing(self, point):
+        """ Returns a dictionary with the position of the point for every candidate linestring that contains it.  """
+        return self.positions.get(point.id, {})
+
+    def add_free_candidates(self, point_pairs):
+        """
+        Finds the candidates that lie between the points of every given pair, i.e. both endpoints of a candidate lie
+        inside the orthogonal bounding box of the pair (see make_orthogonal_bounding_box) and the candidate doesn't
+        contain both points of the pair. The candidates of every pair are stored in the table of free candidates.
+
+        Parameters:
+            point_pairs (list):Pairs of start-/endpoints of the left and right lateral boundary of lanelets.
+        """
+        point_pairs = [(point_1, point_2) for point_1, point_2 in point_pairs
+                       if endpoint_key(point_1, point_2) not in self.free]
+        if not point_pairs:
+            return
+
+        boxes = make_orthogonal_bounding_boxes(np.array([[pair[0].x, pair[0].y] for pair in point_pairs]),
+                                               np.array([[pair[1].x, pair[1].y] for pair in point_pairs]))
+        # Candidates sorted by the x-coordinate of their first point, the range of every box is found by a binary search
+        order = np.argsort(self.endpoints[:, 0], kind='stable')
+        endpoints = self.endpoints[order]
+        starts = np.searchsorted(endpoints[:, 0], boxes[:, 0], side='left')
+        ends = np.searchsorted(endpoints[:, 0], boxes[:, 2], side='right')
+
+        for (point_1, point_2), box, start, end in zip(point_pairs, boxes, starts.tolist(), ends.tolist()):
+            candidates = []
+            if start < end:
+                inside = order[start:end][(endpoints[start:end, 1] >= box[1]) & (endpoints[start:end, 1] <= box[3]) &
+                                          (endpoints[start:end, 2] >= box[0]) & (endpoints[start:end, 2] <= box[2]) &
+                                          (endpoints[start:end, 3] >= box[1]) & (endpoints[start:end, 3] <= box[3])]
+                positions_2 = self.containing(point_2)
+                candidates = [self.ids[index] for index in sorted(inside.tolist())
+                              if not (self.ids[index] in self.containing(point_1) and self.ids[index] in positions_2)]
+            self.free[endpoint_key(point_1, point_2)] = candidates
+
+    def free_candidates(self, point_1, point_2):
+        """ Returns the IDs of the candidates that lie between two points. Missing pairs are added to the table.  """
+        key = endpoint_key(point_1, point_2)
+        if key not in self.free:
+            self.add_free_candidates([(point_1, point_2)])
+        return self.free[key]
+
+
+def endpoint_key(point_1, point_2):
+    """ Returns the key of a pair of endpoints that doesn't depend on their order.  """
+    return (point_1.id, point_2.id) if point_1.id < point_2.id else (point_2.id, point_1.id)
@@ -1,7 +1,18 @@
+import os
+import bz2
+import gzip
+import lzma
 import math
 import logging
+import operator
 
-import numpy as np
+from .constants import MAP_EXTENSIONS
+
+# Functions of the standard library that open compressed files as a stream based on their file extension
+COMPRESSION_OPENERS = {'.gz': gzip.open,
+                       '.bz2': bz2.open,
+                       '.xz': lzma.open
+                       }
 
 
 class MsgCounterHandler(logging.Handler):
@@ -18,20 +29,28 @@ class MsgCounterHandler(logging.Handler):
         self.levelcount[record.levelname] += 1
 
 
-def unit_vector(vector):
-    """ Returns the unit vector of the vector.  """
-    return vector / np.linalg.norm(vector)
+def coordinates(point):
+    """ Returns the coordinates of a point of Lanelet2 as tuple (x, y, z).  """
+    return point.x, point.y, point.z
+
+
+def distance(coordinates_1, coordinates_2):
+    """ Returns the euclidean distance between two points given as tuples of coordinates.  """
+    return math.dist(coordinates_1, coordinates_2)
 
 
 def linestring_to_vector(ls):
-    """ Creates a numpy vector object by using the first and last point of a linestring.  """
-    v = [ls[-1].x - ls[0].x, ls[-1].y - ls[0].y]
+    """ Creates a 2D vector as tuple by using the first and last point of a linestring.  """
+    return ls[-1].x - ls[0].x, ls[-1].y - ls[0].y
+
 
-    return np.array(v)
+def vector_between(point_1, point_2):
+    """ Returns the 2D vector as tuple from the first to the second point of Lanelet2.  """
+    return point_2.x - point_1.x, point_2.y - point_1.y
 
 
 def angle_between(v1, v2):
-    """ Returns the angle in degree between vectors 'v1' and 'v2'::
+    """ Returns the angle in degree between vectors 'v1' and 'v2' (nan, if one of them has the length zero)::
 
             >> angle_between((1, 0, 0), (0, 1, 0))
             90
@@ -41,12 +60,29 @@ def angle_between(v1, v2):
             180
     """
 
-    v1_u = unit_vector(v1)
-    v2_u = unit_vector(v2)
-    return np.arccos(np.clip(np.dot(v1_u, v2_u), -1.0, 1.0))*360/(2*math.pi)
+    lengths = math.hypot(*v1) * math.hypot(*v2)
+    if not lengths:
+        return math.nan
+    cosine = sum(map(operator.mul, v1, v2)) / lengths
+    return math.degrees(math.acos(max(-1.0, min(1.0, cosine))))
+
+
+def are_vectors_orthogonal(v1, v2, tolerance=10):
+    """
+    Returns True if the angle between two vectors deviates less than the tolerance (in degree) from 90°.
+
+    Parameters:
+        v1 (tuple):The first vector.
+        v2 (tuple):The second vector.
+        tolerance (float):Maximum deviation in degree (exclusive).
+
+    Returns:
+        orthogonal (bool):True if the vectors are orthogonal within the tolerance.
+    """
+    return 90 - tolerance < angle_between(v1, v2) < 90 + tolerance
 
 
-def angle_between_lanelets(lanelet_1, lanelet_2):
+def angle_between_lanelets(lanelet_1, lanelet_2, centerlines=None):
     """
     Returns the angle in degree between two lanelets. Therefore, their centerlines are being used. Their order doesn't
     influence the result, since always the minimal possible, positive angle is being calculated.
@@ -54,10 +90,13 @@ def angle_between_lanelets(lanelet_1, lanelet_2):
     Parameters:
         lanelet_1 (lanelet):The first lanelet.
         lanelet_2 (lanelet):The second lanelet.
+        centerlines (CenterlineIndex):Optional index from which the directions of the centerlines are read.
 
     Returns:
         angle (float):Angle between lanelets in degree.
     """
+    if centerlines is not None:
+        return angle_between(centerlines.direction(lanelet_1), centerlines.direction(lanelet_2))
     v1 = linestring_to_vector(lanelet_1.centerline)
     v2 = linestring_to_vector(lanelet_2.centerline)
     return angle_between(v1, v2)
@@ -80,31 +119,14 @@ def angle_between_linestrings(linestring_1, linestring_2):
     return angle_between(v1, v2)
 
 
-def join_dictionaries(dict_a, dict_b):
-    '''
-    Joins two dictionaries. Intended for dictionaries with partially mutual keys. This way the values of
-    the two dictionaries for the same key are being combined in a list. This function is used for the segment search.
-
-    Parameters:
-        dict_a (defaultdict):First dictionary.
-        dict_b (defaultdict):Second dictionary.
-
-    Returns:
-        dict (defaultdict):Combined defaultdict.
-    '''
-    for d in (dict_a, dict_b):
-        for key, value in d.items():
-            dict_a[key].update(value)
-
-    return dict_a
-
-
-def setup_logger(file):
+def setup_logger(file, stream=True):
     """
     Sets up the logger. Requires the filepath of the Lanelet2/BSSD output map to store the log-file at the same location.
+    Handlers of a previous setup are replaced, so that the logger can be set up for several maps in one process.
 
     Parameters:
         file (path):Path where the output map is written.
+        stream (bool):If True, messages of level INFO and higher are streamed to the terminal.
 
     Returns:
         logger (logging):logger object that contains the different handlers required in the framework.
@@ -112,13 +134,16 @@ def setup_logger(file):
     """
     # Creating file path for the log file based on the output filename of the map
     # log_file = 'Output/' + file[4:-4] + '_BSSD_derivation.log'
-    log_file = file[:-4] + '_BSSD_derivation.log'
+    log_file = split_map_path(file)[0] + '_BSSD_derivation.log'
     # setting up the basicconfig for the logging module to save log messages to file
     logging.basicConfig(filename=log_file,
                         level=logging.DEBUG,
                         filemode='w',
-                        format='[%(asctime)s] %(levelname)s %(message)s')
+                        format='[%(asctime)s] %(levelname)s %(message)s',
+                        force=True)
     logger = logging.getLogger('framework')
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
 
     # add the handler that counts messages per level
     msg_counter = MsgCounterHandler()
@@ -126,11 +151,12 @@ def setup_logger(file):
     logger.addHandler(msg_counter)
 
     # add the streamhandler that streams messages of INFO and higher to the terminal
-    stream = logging.StreamHandler()
-    stream.setLevel(logging.INFO)
-    streamformat = logging.Formatter("%(levelname)s:%(message)s")
-    stream.setFormatter(streamformat)
-    logger.addHandler(stream)
+    if stream:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setLevel(logging.INFO)
+        streamformat = logging.Formatter("%(levelname)s:%(message)s")
+        stream_handler.setFormatter(streamformat)
+        logger.addHandler(stream_handler)
 
     return logger, log_file
 
@@ -161,13 +187,41 @@ def edit_log_file(log_file):
         file.writelines(contents[:-nr-2])
 
 
-def make_positive(layer):
+def split_map_path(file):
     """
-    For every element of a layer, check if their ID is negative. If yes, assign a positive ID.
+    Splits the path of a map file into the path without extension and the extension. Extensions that consist of
+    multiple parts, such as '.osm.pbf', are recognized as one extension.
 
     Parameters:
-        layer (layer):Layer of a Lanelet2 map.
+        file (path):Path of a map file.
+
+    Returns:
+        stem (path):Path without extension.
+        extension (str):Extension of the map file.
+    """
+    for extension in MAP_EXTENSIONS:
+        if file.lower().endswith(extension):
+            return file[:-len(extension)], file[-len(extension):]
+    return os.path.splitext(file)
+
+
+def open_map_file(file, mode='rb'):
     """
-    for elem in layer:
-        if elem.id < 0:
-            elem.id = layer.uniqueId()
+    Opens a map file. Files that are compressed with gzip, bzip2 or xz are (de)compressed as a stream.
+
+    Parameters:
+        file (path):Path of the map file.
+        mode (str):Mode in which the file is opened.
+
+    Returns:
+        file_object (file object):Opened file.
+    """
+    opener = COMPRESSION_OPENERS.get(os.path.splitext(file)[1].lower(), open)
+    if 't' in mode or 'b' not in mode:
+        return opener(file, mode, encoding='utf-8')
+    return opener(file, mode)
+
+
+def is_compressed(file):
+    """ Returns True if the extension of the file indicates a compression with gzip, bzip2 or xz.  """
+    return os.path.splitext(file)[1].lower() in COMPRESSION_OPENERS
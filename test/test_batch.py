@@ -0,0 +1,39 @@
+import argparse
+
+from BSSD_derivation_for_Lanelet2 import batch
+
+
+def fake_framework(args, stream=True):
+    """ Replaces the framework in the tests. Fails for maps whose name contains 'broken'.  """
+    if 'broken' in args.filepath:
+        raise ValueError('broken map')
+    return {'Behavior Spaces': len(args.filepath), 'Warnings': 0, 'Errors': 0}
+
+
+def test_find_maps(tmp_path):
+    """
+    Check, if map files are found in directories and for glob patterns while output maps are skipped.
+    """
+    for name in ['a.osm', 'a_BSSD.osm', 'b.osm.pbf', 'c.osm.gz', 'c_BSSD.osm.gz', 'notes.txt']:
+        (tmp_path / name).write_text('')
+
+    assert batch.find_maps(str(tmp_path)) == [str(tmp_path / name) for name in ['a.osm', 'b.osm.pbf', 'c.osm.gz']]
+    assert batch.find_maps(str(tmp_path / '*.osm')) == [str(tmp_path / 'a.osm')]
+
+
+def test_run_batch(tmp_path):
+    """
+    Check, if every map is processed in a worker process and failures are reported without stopping the batch.
+    """
+    paths = [str(tmp_path / name) for name in ['map_1.osm', 'broken.osm', 'map_22.osm']]
+    for path in paths:
+        with open(path, 'w') as file:
+            file.write('<osm></osm>\n')
+    args = argparse.Namespace(filepath=None, workers=2)
+    results = batch.run_batch(fake_framework, args, paths)
+
+    assert [result['map'] for result in results] == paths
+    assert results[0]['statistics']['Behavior Spaces'] == len(paths[0])
+    assert results[1]['error'] == 'ValueError: broken map'
+    assert results[1]['statistics'] == {}
+    assert results[2]['error'] is None
@@ -0,0 +1,107 @@
+import os
+import threading
+
+from BSSD_derivation_for_Lanelet2.cache import DerivationCache
+
+
+def test_store_and_load(tmp_path):
+    """
+    Check, if intermediate results are stored in an entry that is only found again for an unchanged input file.
+    """
+    path_map = str(tmp_path / 'map.osm')
+    with open(path_map, 'w') as file:
+        file.write('<osm></osm>\n')
+    cache = DerivationCache(str(tmp_path / 'cache'), path_map)
+    assert cache.load('preprocessing') is None
+
+    cache.store('preprocessing', {'relevant_lanelets': [1, 2, 3]})
+    assert DerivationCache(str(tmp_path / 'cache'), path_map).load('preprocessing') == {'relevant_lanelets': [1, 2, 3]}
+
+    # A changed input file gets a new entry
+    with open(path_map, 'a') as file:
+        file.write('\n')
+    assert DerivationCache(str(tmp_path / 'cache'), path_map).load('preprocessing') is None
+
+
+def test_output(tmp_path):
+    """
+    Check, if output maps are restored for the same options only.
+    """
+    path_map = str(tmp_path / 'map.osm')
+    path_output = str(tmp_path / 'map_BSSD.osm')
+    for path in (path_map, path_output):
+        with open(path, 'w') as file:
+            file.write(f'<osm>{path}</osm>\n')
+    cache = DerivationCache(str(tmp_path / 'cache'), path_map)
+    cache.store_output(path_output, {'patch': False}, {'Behavior Spaces': 5})
+    os.remove(path_output)
+
+    assert cache.restore_output(path_output, {'patch': True}) is None
+    assert cache.restore_output(path_output, {'patch': False}) == {'Behavior Spaces': 5}
+    with open(path_output, 'r') as file:
+        assert file.read() == f'<osm>{path_output}</osm>\n'
+
+
+def test_evict(tmp_path):
+    """
+    Check, if the least recently used entries are removed when the cache exceeds its maximum size.
+    """
+    paths = []
+    for i in range(3):
+        paths.append(str(tmp_path / f'map_{i}.osm'))
+        with open(paths[-1], 'w') as file:
+            file.write(f'<osm>{i}</osm>\n')
+
+    caches = []
+    for i, path in enumerate(paths):
+        caches.append(DerivationCache(str(tmp_path / 'cache'), path))
+        caches[-1].store('data', {'values': list(range(300))})
+    # Set the time of the last usage explicitly, since the resolution of timestamps depends on the file system
+    for i, used in enumerate([1, 0, 2]):
+        os.utime(caches[i].entry, (used, used))
+
+    # Two of the three entries fit into the cache. The entry of map 1 is the least recently used one and is removed.
+    size_entry = sum(os.path.getsize(os.path.join(caches[0].entry, name)) for name in os.listdir(caches[0].entry))
+    caches[0].max_size = 2 * size_entry
+    caches[0].evict()
+    assert os.path.exists(caches[0].entry)
+    assert not os.path.exists(caches[1].entry)
+    assert os.path.exists(caches[2].entry)
+
+    # The current entry is never removed, even if it is the least recently used one
+    caches[0].max_size = 0
+    caches[0].evict()
+    assert os.path.exists(caches[0].entry)
+    assert not os.path.exists(caches[2].entry)
+
+
+def test_shared_directory(tmp_path):
+    """
+    Check, if two caches can use the same directory: An entry that is evicted by the other cache is created again when
+    results are stored, and no entry is evicted while the other cache holds its lock.
+    """
+    paths = []
+    for i in range(2):
+        paths.append(str(tmp_path / f'map_{i}.osm'))
+        with open(paths[-1], 'w') as file:
+            file.write(f'<osm>{i}</osm>\n')
+    cache_0 = DerivationCache(str(tmp_path / 'cache'), paths[0], max_size=0)
+    cache_1 = DerivationCache(str(tmp_path / 'cache'), paths[1])
+
+    cache_1.store('data', {'values': [1]})
+    cache_0.evict()
+    assert not os.path.exists(cache_1.entry)
+    assert cache_1.restore_output(paths[1], {'patch': False}) is None
+    cache_1.store('data', {'values': [2]})
+    cache_1.store_output(paths[1], {'patch': False}, {'Behavior Spaces': 1})
+    assert cache_1.load('data') == {'values': [2]}
+    assert cache_1.restore_output(str(tmp_path / 'restored.osm'), {'patch': False}) == {'Behavior Spaces': 1}
+
+    # While the entry is written or restored by the other cache, the eviction waits for the lock
+    with cache_1.lock():
+        eviction = threading.Thread(target=cache_0.evict)
+        eviction.start()
+        eviction.join(0.2)
+        assert eviction.is_alive() and os.path.exists(cache_1.entry)
+    eviction.join()
+    assert not os.path.exists(cache_1.entry)
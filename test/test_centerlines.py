@@ -0,0 +1,25 @@
+import numpy as np
+
+from BSSD_derivation_for_Lanelet2 import io_handler
+from BSSD_derivation_for_Lanelet2 import util
+from BSSD_derivation_for_Lanelet2.centerlines import CenterlineIndex
+
+io = io_handler.IoHandler('test/DA_Nieder-Ramst-Mühlstr-Hochstr.osm')
+map_lanelet = io.load_map()
+
+
+def test_direction():
+    """
+    Check, if the directions of the index result in the same angles between lanelets as their centerlines.
+    """
+    lanelets = list(map_lanelet.laneletLayer)
+    centerlines = CenterlineIndex()
+    centerlines.add_headings(lanelets[:10])
+    assert len(centerlines.positions) == len(centerlines.endpoints) == len(centerlines.directions) == 10
+
+    for lanelet in lanelets:
+        for other in [lanelets[0], lanelets[-1].invert()]:
+            assert np.isclose(util.angle_between_lanelets(lanelet, other, centerlines),
+                              util.angle_between_lanelets(lanelet, other))
+    assert len(centerlines.positions) == len(lanelets)
+    assert np.allclose(centerlines.direction(lanelets[0].invert()), np.negative(centerlines.direction(lanelets[0])))
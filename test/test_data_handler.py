@@ -1,6 +1,9 @@
+from lanelet2.core import LaneletMap, Lanelet, Area, LineString3d, Point3d, getId
+
 from BSSD_derivation_for_Lanelet2 import io_handler
 from BSSD_derivation_for_Lanelet2 import data_handler
 from BSSD_derivation_for_Lanelet2 import BSSD_elements
+from BSSD_derivation_for_Lanelet2.preprocessing import Preprocessing
 
 io = io_handler.IoHandler('test/DA_Nieder-Ramst-Mühlstr-Hochstr.osm')
 map_lanelet = io.load_map()
@@ -27,6 +30,16 @@ def test_identify_longitudinal_boundary():
     assert point_1 in linestring and point_2 in linestring
     assert len(linestring) == 2
 
+    # The same boundary is reused and referenced for the points in inverted order without creating another linestring
+    new_linestrings = len(data.new_linestrings)
+    assert data.identify_longitudinal_boundary(point_2, point_1, False, None) == (linestring, linestring.id)
+    assert len(data.new_linestrings) == new_linestrings
+
+    # A linestring of the previous lanelet is used even if a boundary has been identified for the points
+    previous_linestring = map_lanelet.lineStringLayer[1344]
+    assert data.identify_longitudinal_boundary(point_1, point_2, True, previous_linestring) == \
+        (previous_linestring, previous_linestring.id)
+
 
 def test_derive_behavior_boundary_lateral():
     """
@@ -47,11 +60,145 @@ def test_derive_behavior_boundary_lateral():
     assert behavior_1.rightBound.attributes.crossing == 'prohibited'
 
 
-def test_find_adjacent():
+def test_segments():
     """
     Check, if lanelets of a segment are identified correctly.
     """
-    lanelets = data.find_adjacent(map_lanelet.laneletLayer[1450], 0, None)
+    segment = data.segments.segment_of(map_lanelet.laneletLayer[1450])
+    level = data.lanelet_table[1450].level
+
+    assert len(segment.levels[level + 1]) == 2
+    for lanelets in segment.levels.values():
+        for lanelet in lanelets:
+            assert data.lanelet_table[lanelet.id].segment == segment.id
+
+
+def test_derive_segment_speed_limit():
+    """
+    Check, if speed limits of a segment are stored in the lanelet table without changing the lanelets.
+    """
+    lanelet = map_lanelet.laneletLayer[1450]
+    attributes = dict(lanelet.attributes.items())
+    data.derive_segment_speed_limit(lanelet)
+
+    lanelet_data = data.lanelet_table[1450]
+    assert isinstance(lanelet_data.along_speed_limit, int)
+    assert lanelet_data.against_speed_limit is not None
+    for neighbor in data.segments.segment_of(lanelet).levels[data.lanelet_table[1450].level + 1]:
+        assert data.lanelet_table[neighbor.id].along_speed_limit is not None
+    assert dict(lanelet.attributes.items()) == attributes
+
+
+def test_loop():
+    """
+    Check, if the loop processes the lanelets in the order of a recursive depth-first traversal and hands over the
+    longitudinal boundaries.
+    """
+    preprocessor = Preprocessing(io_handler.IoHandler('test/DA_Nieder-Ramst-Mühlstr-Hochstr.osm').load_map())
+    relevant_lanelets = preprocessor.find_relevant_lanelets()
+    data_loop = data_handler.DataHandler(preprocessor.map_lanelet, relevant_lanelets,
+                                         preprocessor.get_topology_index())
+
+    # Expected order of a recursive traversal
+    expected = []
+    pending = set(relevant_lanelets)
+
+    def visit(lanelet_id):
+        pending.remove(lanelet_id)
+        expected.append(lanelet_id)
+        lanelet = data_loop.map_lanelet.laneletLayer[lanelet_id]
+        for neighbor in data_loop.graph.following(lanelet) + data_loop.graph.previous(lanelet):
+            if neighbor.id in pending:
+                visit(neighbor.id)
+
+    for lanelet_id in relevant_lanelets:
+        if lanelet_id in pending:
+            visit(lanelet_id)
+
+    processed = []
+    process_lanelet = data_loop.process_lanelet
+
+    def record(lanelet_id, direction=None, linestring=None):
+        processed.append((lanelet_id, direction, linestring))
+        return process_lanelet(lanelet_id, direction, linestring)
 
-    assert len(lanelets[1]) == 2
+    data_loop.process_lanelet = record
+    data_loop.loop_all()
 
+    assert [lanelet_id for lanelet_id, _, _ in processed] == expected
+    assert not data_loop.pending_lanelets
+    # Lanelets that are reached from another lanelet get its longitudinal boundary
+    assert all(linestring is not None for _, direction, linestring in processed if direction)
+
+
+def test_keepout_area_surroundings():
+    """
+    Check, if lanelets next to a keepout area are found as neighbors of the same segment and the verdict is cached.
+    """
+    def linestring(*coordinates):
+        return LineString3d(getId(), [Point3d(getId(), x, y, 0) for x, y in coordinates], {'type': 'line_thin'})
+
+    # Two lanelets of the same direction with a keepout area inbetween
+    left_a, right_a = linestring((0, 3), (10, 3)), linestring((0, 0), (10, 0))
+    left_b, right_b = linestring((0, 8), (10, 8)), linestring((0, 5), (10, 5))
+    lanelet_a = Lanelet(getId(), left_a, right_a, {'type': 'lanelet', 'subtype': 'road'})
+    lanelet_b = Lanelet(getId(), left_b, right_b, {'type': 'lanelet', 'subtype': 'road'})
+    closing_1 = LineString3d(getId(), [left_a[-1], right_b[-1]], {'type': 'line_thin'})
+    closing_2 = LineString3d(getId(), [right_b[0], left_a[0]], {'type': 'line_thin'})
+    area = Area(getId(), [left_a, closing_1, right_b.invert(), closing_2], [],
+                {'type': 'multipolygon', 'subtype': 'keepout'})
+    map_keepout = LaneletMap()
+    map_keepout.add(lanelet_a)
+    map_keepout.add(lanelet_b)
+    map_keepout.add(area)
+
+    data_keepout = data_handler.DataHandler(map_keepout, [lanelet_a.id, lanelet_b.id], None)
+    assert {lanelet.id for lanelet, _ in data_keepout.area_surroundings[area.id]} == {lanelet_a.id, lanelet_b.id}
+    assert data_keepout.find_one_sided_neighbors(lanelet_a, lanelet_a.leftBound, 'along') == {lanelet_b}
+    assert 'member' in data_keepout.segment_memberships.values()
+
+    segment = data_keepout.segments.segment_of(lanelet_a)
+    assert data_keepout.lanelet_table[lanelet_b.id].segment == segment.id
+    assert data_keepout.lanelet_table[lanelet_b.id].level == data_keepout.lanelet_table[lanelet_a.id].level + 1
+
+
+def test_derive_conflicts():
+    """
+    Check, if the lanelets and areas next to a zebra crossing are linked in the reservation of the crossing lanelets.
+    """
+    def linestring(coordinates, type_linestring='line_thin'):
+        return LineString3d(getId(), [Point3d(getId(), x, y, 0) for x, y in coordinates], {'type': type_linestring})
+
+    # Two lanes of opposing directions crossed by a zebra crossing that leads to a walkway lanelet
+    left_a, right_a = linestring([(0, 3), (20, 3)]), linestring([(0, 0), (20, 0)])
+    left_b = linestring([(20, 6), (0, 6)])
+    lanelet_a = Lanelet(getId(), left_a, right_a, {'type': 'lanelet', 'subtype': 'road'})
+    lanelet_b = Lanelet(getId(), left_b, left_a.invert(), {'type': 'lanelet', 'subtype': 'road'})
+    left_zebra = linestring([(11, -1), (11, 7)], 'zebra_marking')
+    right_zebra = linestring([(9, -1), (9, 7)], 'zebra_marking')
+    zebra = Lanelet(getId(), left_zebra, right_zebra, {'type': 'lanelet', 'subtype': 'crosswalk'})
+    left_walkway = LineString3d(getId(), [left_zebra[-1], Point3d(getId(), 11, 9, 0)], {'type': 'curbstone'})
+    right_walkway = LineString3d(getId(), [right_zebra[-1], Point3d(getId(), 9, 9, 0)], {'type': 'curbstone'})
+    walkway = Lanelet(getId(), left_walkway, right_walkway, {'type': 'lanelet', 'subtype': 'walkway'})
+    # Walkway area next to the left boundary of lanelet b
+    area = Area(getId(), [left_b, linestring([(0, 6), (0, 10)]), linestring([(0, 10), (20, 10)]),
+                          linestring([(20, 10), (20, 6)])], [], {'type': 'multipolygon', 'subtype': 'walkway'})
+    map_zebra = LaneletMap()
+    for element in [lanelet_a, lanelet_b, zebra, walkway, area]:
+        map_zebra.add(element)
+
+    preprocessor = Preprocessing(map_zebra)
+    data_zebra = data_handler.DataHandler(map_zebra, preprocessor.find_relevant_lanelets(),
+                                          preprocessor.get_topology_index())
+    data_zebra.loop_all()
+
+    crossing = data_zebra.crossings.crossing(zebra)
+    assert crossing.zebra and crossing.road_lanelet_ids == {lanelet_a.id, lanelet_b.id}
+    assert crossing.walkway_areas[lanelet_b.id] == [area.id]
+    assert [lanelet.id for lanelet in crossing.walkway_lanelets] == [walkway.id]
+    for behavior_space in data_zebra.map_bssd.BehaviorSpaceLayer.values():
+        other_lanelet = lanelet_b if behavior_space.ref_lanelet.id == lanelet_a.id else lanelet_a
+        for behavior in [behavior_space.alongBehavior, behavior_space.againstBehavior]:
+            reservation = behavior.reservation[0].attributes
+            assert reservation.pedestrian
+            assert {member.ref for member in reservation.members} == {other_lanelet.id, area.id, walkway.id}
@@ -1,4 +1,13 @@
+import gzip
+import lzma
+
+import osmium
+import lanelet2
+from lanelet2.core import LineString3d, getId
+
 from BSSD_derivation_for_Lanelet2 import io_handler
+from BSSD_derivation_for_Lanelet2 import osm_filter
+from BSSD_derivation_for_Lanelet2 import BSSD_elements
 
 
 def test_autodetect_coordinates():
@@ -9,4 +18,270 @@ def test_autodetect_coordinates():
     map_lanelet = io.load_map()
 
     assert io.origin_coordinates[0] == 49.86963758435
-    assert io.origin_coordinates[1] == 8.65871449566
\ No newline at end of file
+    assert io.origin_coordinates[1] == 8.65871449566
+
+
+def test_autodetect_coordinates_formats(tmp_path):
+    """
+    Check, if coordinates are detected for single quotes, bounds, compressed files and PBF files.
+    """
+    path = str(tmp_path / 'single_quotes.osm')
+    with open(path, 'w') as file:
+        file.write("<?xml version='1.0'?>\n<osm version='0.6'>\n"
+                   "  <node id='1' visible='true' lat='49.5' lon='8.25'/>\n</osm>\n")
+    assert io_handler.IoHandler(path).origin_coordinates == [49.5, 8.25]
+
+    path = str(tmp_path / 'bounds.osm.gz')
+    with gzip.open(path, 'wt') as file:
+        file.write('<?xml version="1.0"?>\n<osm version="0.6">\n'
+                   '  <bounds minlat="49.1" minlon="8.1" maxlat="49.2" maxlon="8.2"/>\n'
+                   '  <node id="1" lat="49.5" lon="8.25"/>\n</osm>\n')
+    assert io_handler.IoHandler(path).origin_coordinates == [49.1, 8.1]
+
+    path = str(tmp_path / 'map.osm.pbf')
+    writer = osmium.SimpleWriter(path)
+    writer.add_node(osmium.osm.mutable.Node(id=1, location=(8.25, 49.5)))
+    writer.add_node(osmium.osm.mutable.Node(id=2, location=(9.25, 50.5)))
+    writer.close()
+    assert io_handler.IoHandler(path).origin_coordinates == [49.5, 8.25]
+
+
+def test_autodetect_coordinates_chunks(tmp_path, monkeypatch):
+    """
+    Check, if elements that are split between chunks are found when the scan continues after the last element.
+    """
+    path = str(tmp_path / 'chunks.osm')
+    with open(path, 'w') as file:
+        file.write('<?xml version="1.0"?>\n<osm version="0.6">\n  <node id="1"/>\n'
+                   '  <node id="2" visible="true" lat="49.5" lon="8.25"/>\n</osm>\n')
+    monkeypatch.setattr(io_handler, 'AUTODETECT_CHUNK_SIZE', 7)
+    assert io_handler.detect_coordinates_xml(path) == [49.5, 8.25]
+    monkeypatch.setattr(io_handler, 'AUTODETECT_PREFIX_SIZE', 60)
+    assert io_handler.detect_coordinates_xml(path) == []
+
+
+def test_write_map(tmp_path):
+    """
+    Check, if the single pass writer serializes Lanelet2 elements like Lanelet2 and appends the BSSD elements.
+    """
+    io = io_handler.IoHandler('test/DA_Nieder-Ramst-Mühlstr-Hochstr.osm')
+    map_lanelet = io.load_map()
+    map_bssd = BSSD_elements.BssdMap()
+    behavior_space = map_bssd.create_placeholder(map_lanelet.laneletLayer[1450])
+
+    lanelet2.io.write(str(tmp_path / 'lanelet2.osm'), map_lanelet, io.projector)
+    io.write_map(map_lanelet, map_bssd, str(tmp_path / 'bssd.osm'))
+
+    with open(tmp_path / 'lanelet2.osm') as file:
+        lines_lanelet2 = file.readlines()
+    with open(tmp_path / 'bssd.osm') as file:
+        lines_bssd = file.readlines()
+
+    # Header lines differ in the generator, the lanelet2 elements have to be identical
+    assert lines_bssd[2:len(lines_lanelet2) - 1] == lines_lanelet2[2:-1]
+    assert f'  <relation id="{behavior_space.id}" visible="true" version="1">\n' in lines_bssd
+    assert lines_bssd[-1] == '</osm>\n'
+
+
+def test_patch_map(tmp_path):
+    """
+    Check, if the patch writer copies the original file unchanged and injects new ways and relations.
+    """
+    path_input = 'test/DA_Nieder-Ramst-Mühlstr-Hochstr.osm'
+    io = io_handler.IoHandler(path_input)
+    map_lanelet = io.load_map()
+    # Pretend that a point had a negative ID in the original file
+    io.original_ids['n'][1246] = -1246
+    linestring = LineString3d(getId(), [map_lanelet.pointLayer[1246], map_lanelet.pointLayer[1248]],
+                              {'type': 'BSSD', 'subtype': 'boundary'})
+    map_bssd = BSSD_elements.BssdMap()
+    behavior_space = map_bssd.create_placeholder(map_lanelet.laneletLayer[1450], linestring)
+
+    io.patch_map([linestring], map_bssd, str(tmp_path / 'patched.osm'))
+
+    with open(path_input) as file:
+        lines_input = file.readlines()
+    with open(tmp_path / 'patched.osm') as file:
+        lines_patched = file.readlines()
+
+    # Every line of the original file is kept in the same order
+    index_relation = next(nr for nr, line in enumerate(lines_input) if '<relation' in line)
+    assert lines_patched[:index_relation] == lines_input[:index_relation]
+    assert lines_patched[index_relation:index_relation + 5] == [
+        f'  <way id="{linestring.id}" visible="true" version="1">\n',
+        '    <nd ref="-1246" />\n',
+        '    <nd ref="1248" />\n',
+        '    <tag k="subtype" v="boundary" />\n',
+        '    <tag k="type" v="BSSD" />\n']
+    # The relations of the original file follow the six lines of the new way
+    index_end = index_relation + 6 + len(lines_input) - 1 - index_relation
+    assert lines_patched[index_relation + 6:index_end] == lines_input[index_relation:-1]
+    assert f'  <relation id="{behavior_space.id}" visible="true" version="1">\n' in lines_patched
+    assert lines_patched[-1] == lines_input[-1]
+
+
+def test_pbf_input_output(tmp_path):
+    """
+    Check, if PBF maps are loaded and the map is written as PBF for a PBF output path.
+    """
+    path_pbf = str(tmp_path / 'map.osm.pbf')
+    io_handler.convert_map('test/DA_Nieder-Ramst-Mühlstr-Hochstr.osm', path_pbf)
+    io = io_handler.IoHandler(path_pbf)
+    map_lanelet = io.load_map()
+
+    assert io.output_path == str(tmp_path / 'map_BSSD.osm.pbf')
+    assert len(map_lanelet.laneletLayer) == 85
+
+    map_bssd = BSSD_elements.BssdMap()
+    map_bssd.create_placeholder(map_lanelet.laneletLayer[1450])
+    io.write_map(map_lanelet, map_bssd)
+    # Osmium doesn't overwrite files, but the output of previous runs has to be replaced like for OSM-XML
+    io.patch_map([], map_bssd)
+    io.write_map(map_lanelet, map_bssd)
+
+    io_written = io_handler.IoHandler(io.output_path)
+    map_written = io_written.load_map()
+    assert len(map_written.laneletLayer) == 85
+    assert len(map_written.lineStringLayer) == len(map_lanelet.lineStringLayer)
+
+
+def test_compressed_input_output(tmp_path):
+    """
+    Check, if compressed maps are loaded and the output is compressed in the same way as the input.
+    """
+    path_gz = str(tmp_path / 'map.osm.gz')
+    with open('test/DA_Nieder-Ramst-Mühlstr-Hochstr.osm', 'rb') as file, gzip.open(path_gz, 'wb') as file_gz:
+        file_gz.write(file.read())
+    io = io_handler.IoHandler(path_gz)
+    map_lanelet = io.load_map()
+
+    assert io.output_path == str(tmp_path / 'map_BSSD.osm.gz')
+    assert len(map_lanelet.laneletLayer) == 85
+
+    map_bssd = BSSD_elements.BssdMap()
+    map_bssd.create_placeholder(map_lanelet.laneletLayer[1450])
+    io.write_map(map_lanelet, map_bssd)
+    with gzip.open(io.output_path, 'rt', encoding='utf-8') as file:
+        assert file.readline() == '<?xml version="1.0"?>\n'
+
+    # Patching a compressed file yields the same content as patching the uncompressed file
+    path_xz = str(tmp_path / 'map.osm.xz')
+    io.patch_map([], map_bssd, path_xz)
+    path_osm = str(tmp_path / 'patched.osm')
+    io.patch_map([], map_bssd, path_osm)
+    with lzma.open(path_xz, 'rb') as file_xz, open(path_osm, 'rb') as file:
+        assert file_xz.read() == file.read()
+
+
+def test_filter_map(tmp_path):
+    """
+    Check, if the pre-filter removes elements that are not used by Lanelet2 and rewrites negative IDs.
+    """
+    path = str(tmp_path / 'filter.osm')
+    with open(path, 'w') as file:
+        file.write('<?xml version="1.0"?>\n<osm version="0.6">\n'
+                   '  <node id="-1" lat="49.0" lon="8.0"/>\n  <node id="-2" lat="49.001" lon="8.0"/>\n'
+                   '  <node id="-3" lat="49.0" lon="8.0001"/>\n  <node id="-4" lat="49.001" lon="8.0001"/>\n'
+                   '  <node id="5" lat="49.0" lon="8.001"><tag k="amenity" v="cafe"/></node>\n'
+                   '  <node id="6" lat="49.0" lon="8.002"/>\n  <node id="7" lat="49.001" lon="8.002"/>\n'
+                   '  <way id="-10"><nd ref="-1"/><nd ref="-2"/><tag k="type" v="line_thin"/></way>\n'
+                   '  <way id="11"><nd ref="-3"/><nd ref="-4"/><tag k="type" v="line_thin"/></way>\n'
+                   '  <way id="12"><nd ref="6"/><nd ref="7"/><nd ref="6"/><tag k="building" v="yes"/></way>\n'
+                   '  <relation id="-20"><member type="way" ref="-10" role="left"/>'
+                   '<member type="way" ref="11" role="right"/><tag k="type" v="lanelet"/>'
+                   '<tag k="subtype" v="road"/></relation>\n'
+                   '  <relation id="21"><member type="way" ref="12" role=""/><tag k="type" v="route"/></relation>\n'
+                   '</osm>\n')
+
+    original_ids, max_id = osm_filter.filter_map(path, str(tmp_path / 'filtered.osm'))
+    assert original_ids == {'n': {22: -1, 23: -2, 24: -3, 25: -4}, 'w': {26: -10}, 'r': {27: -20}}
+    assert max_id == 27
+
+    elements = {'n': {}, 'w': {}, 'r': {}}
+    for element in osmium.FileProcessor(str(tmp_path / 'filtered.osm')):
+        if element.is_node():
+            elements['n'][element.id] = None
+        elif element.is_way():
+            elements['w'][element.id] = [node.ref for node in element.nodes]
+        else:
+            elements['r'][element.id] = [(member.type, member.ref) for member in element.members]
+    assert elements == {'n': {22: None, 23: None, 24: None, 25: None},
+                        'w': {26: [22, 23], 11: [24, 25]},
+                        'r': {27: [('w', 26), ('w', 11)]}}
+
+    # Maps with negative IDs are loaded with positive IDs with and without the pre-filter
+    io = io_handler.IoHandler(path, prefilter=True)
+    map_lanelet = io.load_map()
+    assert [lanelet.id for lanelet in map_lanelet.laneletLayer] == [27]
+    assert len(map_lanelet.lineStringLayer) == 2
+    assert io.get_original_id('n', 22) == -1 and io.get_original_id('r', 27) == -20
+
+    io = io_handler.IoHandler(path)
+    map_lanelet = io.load_map()
+    assert [lanelet.id for lanelet in map_lanelet.laneletLayer] == [27]
+    assert len(map_lanelet.lineStringLayer) == 3
+    assert io.get_original_id('w', 26) == -10
+
+
+def test_filter_map_precision(tmp_path):
+    """
+    Check, if coordinates keep their original strings when negative IDs are rewritten with and without pre-filter.
+    """
+    path = str(tmp_path / 'precision.osm')
+    with open(path, 'w') as file:
+        file.write('<?xml version="1.0"?>\n<osm version="0.6">\n'
+                   '  <node id="-1" lat="49.0000000123456" lon="8.40000001234567"/>\n'
+                   '  <node id="-2" lat="49.0001000123456" lon="8.40000001234567"/>\n'
+                   '  <node id="-3" lat="49.0000000123456" lon="8.40010001234567"/>\n'
+                   '  <node id="-4" lat="49.0001000123456" lon="8.40010001234567"/>\n'
+                   '  <way id="-10"><nd ref="-1"/><nd ref="-2"/><tag k="type" v="line_thin"/></way>\n'
+                   '  <way id="-11"><nd ref="-3"/><nd ref="-4"/><tag k="type" v="line_thin"/></way>\n'
+                   '  <relation id="-20"><member type="way" ref="-10" role="left"/>'
+                   '<member type="way" ref="-11" role="right"/><tag k="type" v="lanelet"/></relation>\n'
+                   '</osm>\n')
+
+    for strip in [True, False]:
+        file_path = str(tmp_path / 'rewritten.osm')
+        osm_filter.filter_map(path, file_path, strip)
+        with open(file_path) as file:
+            content = file.read()
+        assert '<node id="1" lat="49.0000000123456" lon="8.40000001234567" />' in content
+        assert '<nd ref="1" />' in content and '<member type="way" ref="5" role="left" />' in content
+
+    # The coordinates of the loaded points are projected from the original strings
+    io = io_handler.IoHandler(path)
+    map_lanelet = io.load_map()
+    point = map_lanelet.pointLayer[1]
+    expected = io.projector.forward(lanelet2.core.GPSPoint(49.0000000123456, 8.40000001234567))
+    assert io.get_original_id('n', 1) == -1
+    assert abs(point.x - expected.x) < 1e-6 and abs(point.y - expected.y) < 1e-6
+
+
+def test_patch_filtered_map(tmp_path):
+    """
+    Check, if new elements don't reuse the IDs of elements that have been removed by the pre-filter when the input
+    file is patched.
+    """
+    with open('test/DA_Nieder-Ramst-Mühlstr-Hochstr.osm') as file:
+        content = file.read()
+    # Building with an ID above every ID of Lanelet2, which is removed by the pre-filter
+    id_building = 10 ** 12
+    building = f' <way id="{id_building}"><nd ref="{{}}"/><tag k="building" v="yes"/></way>\n'
+    id_node = content.split('<node id="')[1].split('"')[0]
+    path = str(tmp_path / 'map.osm')
+    with open(path, 'w') as file:
+        file.write(content.replace('</osm>', building.format(id_node) + '</osm>'))
+
+    io = io_handler.IoHandler(path, prefilter=True)
+    map_lanelet = io.load_map()
+    linestring = LineString3d(getId(), [map_lanelet.pointLayer[int(id_node)]], {'type': 'BSSD'})
+    assert linestring.id > id_building
+
+    map_bssd = BSSD_elements.BssdMap()
+    map_bssd.create_placeholder(next(iter(map_lanelet.laneletLayer)))
+    io.patch_map([linestring], map_bssd)
+    ids = {'n': [], 'w': [], 'r': []}
+    for element in osmium.FileProcessor(io.output_path):
+        ids[element.type_str()].append(element.id)
+    assert all(len(set(id_elements)) == len(id_elements) for id_elements in ids.values())
+    assert id_building in ids['w'] and linestring.id in ids['w']
@@ -0,0 +1,87 @@
+from collections import Counter
+
+from BSSD_derivation_for_Lanelet2 import io_handler
+from BSSD_derivation_for_Lanelet2 import parallel
+from BSSD_derivation_for_Lanelet2.data_handler import DataHandler
+from BSSD_derivation_for_Lanelet2.preprocessing import Preprocessing
+
+
+def setup_data_handler():
+    """ Loads the test map and returns a data handler that is ready for the derivation.  """
+    io = io_handler.IoHandler('test/DA_Nieder-Ramst-Mühlstr-Hochstr.osm')
+    preprocessor = Preprocessing(io.load_map())
+    relevant_lanelets = preprocessor.find_relevant_lanelets()
+    return DataHandler(preprocessor.map_lanelet, relevant_lanelets, preprocessor.get_routing_graph_all())
+
+
+def test_find_components():
+    """
+    Check, if the components contain every relevant lanelet exactly once and are connected via successors.
+    """
+    data = setup_data_handler()
+    components = parallel.find_components(data.relevant_lanelets, data.map_lanelet, data.graph)
+
+    assert sorted(lanelet_id for component in components for lanelet_id in component) == \
+        sorted(data.relevant_lanelets)
+    assert components[0][0] == data.relevant_lanelets[0]
+
+    # One call of the loop processes exactly the first component
+    data.loop(data.relevant_lanelets[0])
+    assert sorted(data.pending_lanelets) == sorted(lanelet_id for component in components[1:]
+                                                    for lanelet_id in component)
+
+
+def test_distribute_components():
+    """
+    Check, if components are distributed to groups with a similar number of lanelets.
+    """
+    components = [[1, 2, 3, 4], [5], [6, 7], [8, 9]]
+
+    assert parallel.distribute_components(components, 2) == [[0, 1], [2, 3]]
+    assert parallel.distribute_components(components, 10) == [[0], [2], [3], [1]]
+
+
+def test_derive_parallel():
+    """
+    Check, if the parallel derivation creates the same elements as the serial derivation.
+    """
+    data_serial = setup_data_handler()
+    data_serial.loop_all()
+    data_parallel = setup_data_handler()
+    parallel.derive_parallel(data_parallel, 2)
+
+    def tags(data):
+        return Counter(tuple(sorted(element.attributes.tags.items()))
+                       for _, layer in data.map_bssd for element in layer.values())
+
+    assert not data_parallel.pending_lanelets
+    assert len(data_parallel.new_linestrings) == len(data_serial.new_linestrings)
+    for (name, layer_serial), (_, layer_parallel) in zip(data_serial.map_bssd, data_parallel.map_bssd):
+        assert len(layer_serial) == len(layer_parallel)
+    assert tags(data_parallel) == tags(data_serial)
+
+    # Every reference to a new element points to an element of the merged result
+    new_ids = set().union(*(layer.keys() for _, layer in data_parallel.map_bssd))
+    new_ids.update(linestring.id for linestring in data_parallel.new_linestrings)
+    for _, layer in data_parallel.map_bssd:
+        for element in layer.values():
+            for member in element.attributes.members:
+                assert member.ref in new_ids or member.ref < min(new_ids)
+
+
+def test_merge_component_existing_boundary():
+    """
+    Check, if a longitudinal boundary that has been identified by another component is not added a second time.
+    """
+    data = setup_data_handler()
+    point_1 = data.map_lanelet.pointLayer[1136]
+    point_2 = data.map_lanelet.pointLayer[1171]
+    linestring, _ = data.identify_longitudinal_boundary(point_1, point_2, False, None)
+
+    new_ids = {}
+    result = {'elements': [], 'linestrings': [(1 << parallel.ID_BLOCK_BITS, [point_2.id, point_1.id],
+                                               {'type': 'BSSD', 'subtype': 'boundary'}, None)]}
+    parallel.merge_component(data, result, new_ids)
+
+    assert new_ids == {1 << parallel.ID_BLOCK_BITS: linestring.id}
+    assert data.new_linestrings == [linestring]
@@ -54,3 +54,24 @@ def test_routing_graph_all():
 
     assert len(routing_graph.following(map_lanelet.laneletLayer[1480])) > 0
     assert len(routing_graph.following(map_lanelet.laneletLayer[1479])) > 0
+
+
+def test_classify_lanelets():
+    """
+    Check, if the lanelet table contains the relevance and the passability of every lanelet.
+    """
+    preprocessor = preprocessing.Preprocessing(map_lanelet)
+    relevant_lanelets = preprocessor.find_relevant_lanelets()
+
+    for lanelet in map_lanelet.laneletLayer:
+        lanelet_data = preprocessor.lanelet_table[lanelet.id]
+        assert lanelet_data.relevant == preprocessing.is_lanelet_relevant(lanelet.attributes, lanelet_data)
+        assert lanelet_data.can_pass_vehicle == preprocessor.traffic_rules.canPass(lanelet)
+        if lanelet_data.relevant:
+            assert lanelet.id in relevant_lanelets
+
+    # Crosswalks can be passed by pedestrians, but not by vehicles
+    crosswalks = [lanelet for lanelet in map_lanelet.laneletLayer if lanelet.attributes['subtype'] == 'crosswalk']
+    assert crosswalks
+    assert all(preprocessor.lanelet_table[lanelet.id].can_pass_pedestrian for lanelet in crosswalks)
+    assert not any(preprocessor.lanelet_table[lanelet.id].can_pass_vehicle for lanelet in crosswalks)
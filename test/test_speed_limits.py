@@ -0,0 +1,24 @@
+from lanelet2 import traffic_rules
+from lanelet2.core import SpeedLimit
+
+from BSSD_derivation_for_Lanelet2 import io_handler
+from BSSD_derivation_for_Lanelet2.speed_limits import SpeedLimitResolver
+
+io = io_handler.IoHandler('test/DA_Nieder-Ramst-Mühlstr-Hochstr.osm')
+map_lanelet = io.load_map()
+rules = traffic_rules.create(traffic_rules.Locations.Germany, traffic_rules.Participants.Vehicle)
+resolver = SpeedLimitResolver(map_lanelet, rules)
+
+
+def test_speed_limit():
+    """
+    Check, if the resolver returns the speed limits of the traffic rules and the regulatory elements for every lanelet.
+    """
+    for lanelet in map_lanelet.laneletLayer:
+        regelems = [regelem.id for regelem in lanelet.regulatoryElements if isinstance(regelem, SpeedLimit)]
+        assert resolver.speed_limit(lanelet) == (round(rules.speedLimit(lanelet).speedLimit),
+                                                 regelems[0] if regelems else None)
+        for regelem_id in regelems:
+            assert lanelet.id in resolver.regelem_lanelets[regelem_id]
+
+    assert len(resolver.resolved) < len(map_lanelet.laneletLayer)
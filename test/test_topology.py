@@ -0,0 +1,103 @@
+from lanelet2.core import LineString3d, Point3d, getId
+
+from BSSD_derivation_for_Lanelet2 import io_handler
+from BSSD_derivation_for_Lanelet2.preprocessing import Preprocessing
+from BSSD_derivation_for_Lanelet2.topology import BoundaryIndex
+from BSSD_derivation_for_Lanelet2.constants import LONG_BDR_TAGS
+
+file_path = 'test/DA_Nieder-Ramst-Mühlstr-Hochstr.osm'
+io = io_handler.IoHandler(file_path)
+preprocessor = Preprocessing(io.load_map())
+topology = preprocessor.get_topology_index()
+graph = preprocessor.get_routing_graph_all()
+
+
+def test_following_previous():
+    """
+    Check, if successors and predecessors are identical to the ones of the RoutingGraph (including their order).
+    """
+    for lanelet in preprocessor.map_lanelet.laneletLayer:
+        for directed_lanelet in [lanelet, lanelet.invert()]:
+            assert [(ll.id, ll.inverted()) for ll in topology.following(directed_lanelet)] == \
+                   [(ll.id, ll.inverted()) for ll in graph.following(directed_lanelet)]
+            assert [(ll.id, ll.inverted()) for ll in topology.previous(directed_lanelet)] == \
+                   [(ll.id, ll.inverted()) for ll in graph.previous(directed_lanelet)]
+
+
+def test_conflicting():
+    """
+    Check, if conflicting lanelets are identical to the ones of the RoutingGraph including their direction, the
+    inverted lanelet itself and both directions of bidirectional lanelets. The example map contains bidirectional
+    lanelets that overlap.
+    """
+    preprocessor_example = Preprocessing(io_handler.IoHandler('res/mapping_example.osm').load_map())
+    for preprocessing, topology_index, routing_graph in [
+            (preprocessor, topology, graph),
+            (preprocessor_example, preprocessor_example.get_topology_index(),
+             preprocessor_example.get_routing_graph_all())]:
+        for lanelet in preprocessing.map_lanelet.laneletLayer:
+            for directed_lanelet in [lanelet, lanelet.invert()]:
+                assert sorted((ll.id, ll.inverted()) for ll in topology_index.conflicting(directed_lanelet)) == \
+                       sorted((ll.id, ll.inverted()) for ll in routing_graph.conflicting(directed_lanelet))
+
+
+def test_usage_index():
+    """
+    Check, if the usage index returns the same usages as findUsages of Lanelet2 and contains new linestrings.
+    """
+    map_lanelet = preprocessor.map_lanelet
+    usages = preprocessor.usages
+    for linestring in map_lanelet.lineStringLayer:
+        for directed_linestring in [linestring, linestring.invert()]:
+            assert {ll.id for ll in usages.lanelets_using(directed_linestring)} == \
+                   {ll.id for ll in map_lanelet.laneletLayer.findUsages(directed_linestring)}
+        assert {area.id for area in usages.areas_using(linestring)} == \
+               {area.id for area in map_lanelet.areaLayer.findUsages(linestring)} | \
+               {area.id for area in map_lanelet.areaLayer.findUsages(linestring.invert())}
+        for subtype in {area.attributes['subtype'] for area in usages.areas_using(linestring)}:
+            assert {area.id for area in usages.areas_using(linestring, subtype)} == \
+                   {area.id for area in usages.areas_using(linestring) if area.attributes['subtype'] == subtype}
+
+    point_1 = map_lanelet.pointLayer[1246]
+    point_2 = map_lanelet.pointLayer[1248]
+    assert {ls.id for ls in usages.linestrings_using(point_1)} == \
+           {ls.id for ls in map_lanelet.lineStringLayer.findUsages(point_1)}
+
+    linestring = LineString3d(getId(), [point_1, point_2], {'type': 'BSSD', 'subtype': 'boundary'})
+    map_lanelet.add(linestring)
+    usages.add_linestring(linestring)
+    assert linestring in usages.linestrings_using(point_1) and linestring in usages.linestrings_using(point_2)
+    assert linestring in usages.linestrings_between(point_2, point_1)
+
+
+def test_boundary_index():
+    """
+    Check, if the boundary index contains the position of every point in every potential longitudinal boundary.
+    """
+    map_lanelet = preprocessor.map_lanelet
+    boundaries = BoundaryIndex(map_lanelet)
+    candidates = [ls for ls in map_lanelet.lineStringLayer
+                  if 'type' in ls.attributes and ls.attributes['type'] in LONG_BDR_TAGS]
+    assert candidates and set(boundaries.points) == {ls.id for ls in candidates}
+    for linestring in candidates:
+        points = list(linestring)
+        for point in points:
+            assert boundaries.containing(point)[linestring.id] == points.index(point)
+
+
+def test_free_candidates():
+    """
+    Check, if a linestring between the endpoints of a lanelet is found as free candidate for its longitudinal boundary.
+    """
+    map_lanelet = preprocessor.map_lanelet
+    lanelet = map_lanelet.laneletLayer[preprocessor.find_relevant_lanelets()[0]]
+    point_left, point_right = lanelet.leftBound[0], lanelet.rightBound[0]
+    points = [Point3d(getId(), point_left.x + (point_right.x - point_left.x) * share,
+                      point_left.y + (point_right.y - point_left.y) * share, 0) for share in [0.2, 0.8]]
+    linestring = LineString3d(getId(), points, {'type': 'stop_line'})
+    map_lanelet.add(linestring)
+
+    boundaries = BoundaryIndex(map_lanelet)
+    boundaries.add_free_candidates([(point_left, point_right), (lanelet.leftBound[-1], lanelet.rightBound[-1])])
+    assert linestring.id in boundaries.free_candidates(point_right, point_left)
+    assert linestring.id not in boundaries.free_candidates(lanelet.leftBound[-1], lanelet.rightBound[-1])
@@ -1,5 +1,9 @@
+import math
+
+import numpy as np
 from lanelet2.core import Lanelet, LineString3d, Point3d
 from BSSD_derivation_for_Lanelet2 import util
+from BSSD_derivation_for_Lanelet2.geometry_derivation import orthogonal_box, make_orthogonal_bounding_boxes
 
 
 def test_angle_between_lanelets():
@@ -33,3 +37,23 @@ def test_angle_between_linestrings():
     assert round(util.angle_between_linestrings(linestring_1, linestring_2)) == 90
     linestring_3 = LineString3d(6, [p3, p2])
     assert round(util.angle_between_linestrings(linestring_1, linestring_3)) == 45
+
+
+def test_scalar_kernels():
+    """
+    Check, if the scalar kernels for angles, orthogonality, distances and orthogonal boxes work on tuples.
+    """
+    assert round(util.angle_between((1, 0), (0, 2))) == 90
+    assert round(util.angle_between((1, 0, 0), (-1, 0, 0))) == 180
+    assert math.isnan(util.angle_between((0, 0), (1, 0)))
+    assert util.are_vectors_orthogonal((1, 0), (0.1, 1)) and not util.are_vectors_orthogonal((1, 0), (1, 1))
+
+    p1 = Point3d(2, 1, 0, 0)
+    p2 = Point3d(3, 4, 4, 12)
+    assert util.coordinates(p2) == (4, 4, 12)
+    assert util.distance(util.coordinates(p1), util.coordinates(p2)) == 13
+    assert util.vector_between(p1, p2) == (3, 4)
+
+    box = orthogonal_box((0, 0), (0, -2))
+    assert np.allclose(box, make_orthogonal_bounding_boxes(np.array([[0., 0.]]), np.array([[0., -2.]]))[0])
+    assert np.allclose(box, (-1, -2, 1, 0))